@@ -3,42 +3,27 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 
+from xor_stream import decode_cstring, map_binary
+
 BINARY_PATH = Path("AwesomeCleaner.app/Contents/MacOS/AwesomeCleaner")
 KEY_EVEN = 0x41
 KEY_ODD = 0x20
+KEY = bytes((KEY_EVEN, KEY_ODD))
 CONFIG_START = 0x1CD90
 CONFIG_END = 0x1D1F0
 
 
-def _decode_byte(byte: int, index: int) -> int:
-    key = KEY_EVEN if index % 2 == 0 else KEY_ODD
-    return byte ^ key
-
-
-def decode_cstring(data: bytes, start: int) -> str:
-    chars: list[str] = []
-    index = 0
-    while (start + index) < len(data):
-        decoded = _decode_byte(data[start + index], index)
-        if decoded == 0 or not (32 <= decoded <= 126):
-            break
-        chars.append(chr(decoded))
-        index += 1
-    return ''.join(chars)
-
-
 def clean(text: str) -> str:
     return text.split(' A')[0].strip()
 
 
 def main() -> None:
-    data = BINARY_PATH.read_bytes()
-
-    raw_base = decode_cstring(data, 0x1CD90)
-    raw_profile = decode_cstring(data, 0x1CE78)
-    raw_cache = decode_cstring(data, 0x1CEA0)
-    raw_archive = decode_cstring(data, 0x1CF10)
-    raw_keychain_path = decode_cstring(data, 0x1D000)
+    with map_binary(BINARY_PATH) as data:
+        raw_base = decode_cstring(data, 0x1CD90, KEY)
+        raw_profile = decode_cstring(data, 0x1CE78, KEY)
+        raw_cache = decode_cstring(data, 0x1CEA0, KEY)
+        raw_archive = decode_cstring(data, 0x1CF10, KEY)
+        raw_keychain_path = decode_cstring(data, 0x1D000, KEY)
 
     base_url = clean(raw_base)
     profile_name = clean(raw_profile)
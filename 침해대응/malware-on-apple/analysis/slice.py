@@ -1,21 +1,18 @@
 from pathlib import Path
+from xor_stream import map_binary, xor_decode
 BINARY_PATH = Path('AwesomeCleaner.app/Contents/MacOS/AwesomeCleaner')
 KEY_EVEN = 0x41
 KEY_ODD = 0x20
 
 def decode_bytes(data,start,length):
-    out = []
-    for idx in range(length):
-        key = KEY_EVEN if idx % 2 == 0 else KEY_ODD
-        out.append(data[start+idx] ^ key)
-    return bytes(out)
+    return xor_decode(data, bytes((KEY_EVEN, KEY_ODD)), start, start+length)
 
 def main():
-    data = BINARY_PATH.read_bytes()
-    start = 0x1CE68
-    for length in range(1, 40):
-        s = decode_bytes(data,start,length)
-        print(length, s)
+    with map_binary(BINARY_PATH) as data:
+        start = 0x1CE68
+        for length in range(1, 40):
+            s = decode_bytes(data,start,length)
+            print(length, s)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,143 @@
+"""Repeating-key XOR decoding for AwesomeCleaner's obfuscated strings and config.
+
+The sample XORs its config with a repeating key (0x41, 0x20: even bytes ^ 'A', odd bytes
+^ ' '), restarting the key at each string. Everything here decodes whole regions at once
+instead of byte by byte:
+
+- with NumPy, the input is viewed in place (np.frombuffer, so an mmap'd binary is never
+  copied) and XORed 8 bytes at a time against the key tiled to a whole number of uint64
+  words;
+- without it, each of the len(key) interleaved byte lanes goes through one
+  bytes.translate table (this path copies the region once).
+
+xor_decode(..., backend="numpy" | "translate") forces one of them (benchmarks, tests);
+the default picks NumPy when it is installed.
+
+`phase` is the key index applied to the first decoded byte, so decoding from the middle of
+a string is xor_decode(data, key, addr, end, phase=(addr - string_start) % len(key)).
+"""
+from __future__ import annotations
+
+import mmap
+import re
+from contextlib import contextmanager
+from math import gcd
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # optional, stdlib fallback below
+    np = None
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+BACKENDS = ("numpy", "translate")
+_PRINTABLE_RE = re.compile(rb"[\x20-\x7e]*")
+CSTRING_BLOCK = 256
+
+
+def _rotate(key: bytes, phase: int) -> bytes:
+    phase %= len(key)
+    return key[phase:] + key[:phase]
+
+
+def _xor_numpy(view: memoryview, key: bytes) -> bytes:
+    data = np.frombuffer(view, dtype=np.uint8)
+    out = np.empty(len(data), dtype=np.uint8)
+    # Tile the key to a multiple of 8 bytes so the bulk is XORed as uint64 words
+    tiled = key * (8 // gcd(len(key), 8))
+    bulk = len(data) // len(tiled) * len(tiled)
+    if bulk:
+        words = np.frombuffer(tiled, dtype=np.uint64)
+        np.bitwise_xor(data[:bulk].view(np.uint64).reshape(-1, len(words)), words,
+                       out=out[:bulk].view(np.uint64).reshape(-1, len(words)))
+    tail = len(data) - bulk
+    if tail:
+        np.bitwise_xor(data[bulk:], np.frombuffer(tiled[:tail], dtype=np.uint8), out=out[bulk:])
+    return out.tobytes()
+
+
+def _xor_translate(view: memoryview, key: bytes) -> bytes:
+    # One contiguous copy first: strided slices of bytes are far cheaper than of a memoryview
+    raw = view.tobytes()
+    out = bytearray(len(raw))
+    for lane, value in enumerate(key):
+        table = bytes(byte ^ value for byte in range(256))
+        out[lane::len(key)] = raw[lane::len(key)].translate(table)
+    return bytes(out)
+
+
+def xor_decode(data: Buffer, key: bytes, start: int = 0, end: Optional[int] = None, phase: int = 0,
+               backend: Optional[str] = None) -> bytes:
+    """XOR data[start:end] with the repeating key, key[phase] applied to data[start]."""
+    if not key:
+        raise ValueError("empty XOR key")
+    if backend is None:
+        backend = "numpy" if np is not None else "translate"
+    elif backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+    elif backend == "numpy" and np is None:
+        raise ValueError("the numpy backend needs numpy installed")
+    key = _rotate(bytes(key), phase)
+    # Released on the way out so a caller's mmap can still be closed
+    with memoryview(data) as whole, whole[start:end] as view:
+        if backend == "numpy":
+            return _xor_numpy(view, key)
+        return _xor_translate(view, key)
+
+
+def decode_cstring(data: Buffer, start: int, key: bytes, phase: int = 0) -> str:
+    """Decode from start until a NUL or non-printable byte, the way the sample's strings end."""
+    chunks = []
+    position = start
+    while position < len(data):
+        block = xor_decode(data, key, position, position + CSTRING_BLOCK, phase + position - start)
+        run = _PRINTABLE_RE.match(block).end()
+        chunks.append(block[:run])
+        if run < len(block):
+            break
+        position += len(block)
+    return b"".join(chunks).decode("ascii")
+
+
+def scan_cstrings(data: Buffer, start: int, end: int, key: bytes,
+                  min_length: int = 4) -> Iterator[Tuple[int, str]]:
+    """(address, string) for every start address in [start, end), key restarting at each.
+
+    The region (plus CSTRING_BLOCK bytes of slack) is decoded once per key phase. Addresses
+    inside the same printable run of the same phase share its end, so each run is matched
+    once, and a run still going at the end of the window is finished with decode_cstring
+    once; strings may run past end as before.
+    """
+    if not key:
+        raise ValueError("empty XOR key")
+    end = min(end, len(data))
+    window_end = min(len(data), end + CSTRING_BLOCK)
+    decoded = [xor_decode(data, key, start, window_end, phase=lane) for lane in range(len(key))]
+    run_ends = [0] * len(key)
+    tails = {}
+    for address in range(start, end):
+        offset = address - start
+        # key[0] must land on `address`, i.e. phase p with (p + offset) % len(key) == 0
+        lane = -offset % len(key)
+        text = decoded[lane]
+        if offset >= run_ends[lane]:
+            run_ends[lane] = _PRINTABLE_RE.match(text, offset).end()
+        run = run_ends[lane]
+        if run - offset < min_length and run < len(text):
+            continue
+        string = text[offset:run].decode("ascii")
+        if run == len(text) and window_end < len(data):
+            if lane not in tails:
+                tails[lane] = decode_cstring(data, window_end, key, lane + window_end - start)
+            string += tails[lane]
+        if len(string) >= min_length:
+            yield address, string
+
+
+@contextmanager
+def map_binary(path: Path) -> Iterator[mmap.mmap]:
+    """Read-only mmap of a sample; pass it straight to the functions above."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
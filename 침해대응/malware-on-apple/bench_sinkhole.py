@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Beacon-flood benchmark for sinkhole_server.py: per-request log writes vs batched writer.
+
+Starts the sinkhole in a subprocess for each mode, floods it with small POST beacons from
+--connections concurrent clients (keep-alive, or a new connection per beacon with
+--reconnect), then stops it and checks that every beacon reached the log.
+
+    python3 bench_sinkhole.py --requests 20000 --connections 200
+    python3 bench_sinkhole.py --reconnect --modes batched
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+MODES = {
+    "direct": ["--no-batching"],
+    "batched": [],
+}
+
+
+async def flood(port: int, requests: int, connections: int, reconnect: bool, body_size: int) -> float:
+    body = b"A" * body_size
+    request = (b"POST /beacon HTTP/1.1\r\nHost: sinkhole\r\nUser-Agent: AwesomeCleaner\r\n"
+               b"Content-Type: application/octet-stream\r\nContent-Length: %d\r\n\r\n" % len(body)) + body
+    per_client = [requests // connections + (1 if i < requests % connections else 0) for i in range(connections)]
+
+    async def client(count: int) -> None:
+        reader = writer = None
+        for _ in range(count):
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(request)
+            await writer.drain()
+            await reader.readuntil(b"\r\n\r\n")
+            await reader.readexactly(len(b'{"status": "captured"}'))
+            if reconnect:
+                writer.close()
+                writer = None
+        if writer is not None:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(count) for count in per_client))
+    return time.perf_counter() - started
+
+
+def run_mode(mode: str, args, directory: Path, port: int) -> None:
+    log_path = directory / f"{mode}.log"
+    server = subprocess.Popen(
+        [sys.executable, str(HERE / "sinkhole_server.py"), "--host", "127.0.0.1", "--port", str(port),
+         "--log", str(log_path), "--no-bodies", *MODES[mode]],
+        stdout=subprocess.PIPE, text=True, cwd=directory,
+    )
+    try:
+        server.stdout.readline()  # "Sinkhole listening ..."
+        elapsed = asyncio.run(flood(port, args.requests, args.connections, args.reconnect, args.body_size))
+    finally:
+        server.send_signal(signal.SIGINT)
+        # wait4 also reports the server's own CPU time, separate from the load generator's
+        _, _, usage = os.wait4(server.pid, 0)
+        server.returncode = 0
+    with log_path.open("rb") as f:
+        logged = sum(1 for _ in f)
+    cpu = usage.ru_utime + usage.ru_stime
+    print(f"{mode:<8} {args.requests / elapsed:9.0f} req/s   {elapsed:6.2f} s   "
+          f"server cpu {cpu * 1e6 / args.requests:6.1f} us/req (sys {usage.ru_stime * 1e6 / args.requests:5.1f})   "
+          f"logged {logged}/{args.requests}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--body-size", type=int, default=256)
+    parser.add_argument("--reconnect", action="store_true", help="open a new connection for every beacon")
+    parser.add_argument("--modes", default="direct,batched")
+    parser.add_argument("--port", type=int, default=23283)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="sinkhole_bench_") as directory:
+        print(f"{args.requests} beacons, {args.connections} clients, "
+              f"{'new connection per beacon' if args.reconnect else 'keep-alive'}\n")
+        for mode in args.modes.split(","):
+            run_mode(mode, args, Path(directory), args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Benchmark for analysis/xor_stream.py against the per-byte loops it replaced.
+
+Writes --size-mb of random data to a temp file, maps it, and decodes the whole mapping
+with the original byte loop (on a --loop-mb prefix, it is that slow), the stdlib
+bytes.translate lanes and the NumPy uint64 path, checking all of them agree. Then times
+scan_cstrings against the old decode-every-address loop from tmp_scan.py on the sample
+(--scan-start/--scan-end; long "A A A" padding runs make the old loop quadratic there).
+
+    python3 bench_xor_stream.py --size-mb 64
+    python3 bench_xor_stream.py --key 4b3f9e11d2 --phase 3
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from analysis import xor_stream
+
+BINARY_PATH = Path("AwesomeCleaner.app/Contents/MacOS/AwesomeCleaner")
+
+
+def loop_decode(data, key: bytes, start: int, end: int, phase: int) -> bytes:
+    decoded = bytearray()
+    for idx in range(end - start):
+        decoded.append(data[start + idx] ^ key[(idx + phase) % len(key)])
+    return bytes(decoded)
+
+
+def loop_scan(data, start: int, end: int, key: bytes, min_length: int = 4):
+    for addr in range(start, end):
+        chars = []
+        idx = 0
+        while addr + idx < len(data):
+            decoded = data[addr + idx] ^ key[idx % len(key)]
+            if not 32 <= decoded <= 126:
+                break
+            chars.append(chr(decoded))
+            idx += 1
+        if len(chars) >= min_length:
+            yield addr, "".join(chars)
+
+
+def timed(label: str, size: int, fn, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"  {label:<22} {best * 1e3:9.2f} ms   {size / best / 1e6:9.1f} MB/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=32)
+    parser.add_argument("--loop-mb", type=float, default=1, help="prefix decoded with the per-byte loop")
+    parser.add_argument("--sample", type=Path, default=BINARY_PATH, help="binary for the C-string scan")
+    parser.add_argument("--scan-start", type=lambda value: int(value, 0), default=0x1C000)
+    parser.add_argument("--scan-end", type=lambda value: int(value, 0), default=0x1E000)
+    parser.add_argument("--key", default="4120", help="hex key (default: AwesomeCleaner's 0x41 0x20)")
+    parser.add_argument("--phase", type=int, default=0)
+    args = parser.parse_args()
+
+    key = bytes.fromhex(args.key)
+    size = int(args.size_mb * 1024 * 1024)
+    loop_size = min(size, int(args.loop_mb * 1024 * 1024))
+    with tempfile.TemporaryDirectory(prefix="xor_bench_") as directory:
+        path = Path(directory) / "sample.bin"
+        # ~90% printable plaintext, so the C-string scan has runs to follow
+        plain = os.urandom(size).translate(bytes(32 + b % 95 if b < 230 else 0 for b in range(256)))
+        path.write_bytes(xor_stream.xor_decode(plain, key))
+        with xor_stream.map_binary(path) as data:
+            print(f"xor decode, key {key.hex()} phase {args.phase}, mmap of {size / 1e6:.1f} MB")
+            expected = timed("per-byte loop", loop_size,
+                             lambda: loop_decode(data, key, 0, loop_size, args.phase), repeat=1)
+            translated = timed("bytes.translate lanes", size,
+                               lambda: xor_stream.xor_decode(data, key, phase=args.phase, backend="translate"))
+            assert translated[:loop_size] == expected
+            if xor_stream.np is not None:
+                words = timed("numpy uint64", size,
+                              lambda: xor_stream.xor_decode(data, key, phase=args.phase, backend="numpy"))
+                assert words == translated
+            else:
+                print("  numpy uint64           (numpy not installed)")
+
+    if not args.sample.exists():
+        print(f"\n{args.sample} not found, skipping the C-string scan")
+        return
+    with xor_stream.map_binary(args.sample) as data:
+        start, end = args.scan_start, min(args.scan_end, len(data))
+        print(f"\nC-string scan of {args.sample.name} {start:#x}-{end:#x}, key {key.hex()} (every start address)")
+        expected = timed("per-byte loop", end - start, lambda: list(loop_scan(data, start, end, key)), repeat=1)
+        found = timed("scan_cstrings", end - start, lambda: list(xor_stream.scan_cstrings(data, start, end, key)))
+        assert found == expected, "scan results differ"
+        print(f"  {len(found)} strings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Content-addressed blob store for captured exfiltration bodies.
+
+Blobs live at <root>/<sha256[:2]>/<sha256[2:4]>/<sha256>[.zst], keyed by the SHA-256 of
+the uncompressed body. A BlobWriter hashes (and optionally zstd-compresses) chunks into
+a temp file as they arrive, so a body is never held whole in memory; commit() renames it
+into place, or drops it when that digest is already stored, so a beacon that re-sends
+the same keychain or cache archive costs no extra disk.
+
+A body the client cut off is committed with incomplete=True and lands under
+<root>/incomplete/ instead. find(), open() and dedup of complete blobs never look there,
+so a truncated upload cannot stand in for the real payload with that digest.
+
+zstd needs the optional `zstandard` package; without it, blobs are stored raw.
+
+    python3 blob_store.py cat <sha256> > body.bin
+    python3 blob_store.py cat --incomplete <sha256> > partial.bin
+    python3 blob_store.py stats
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+BLOB_DIR = Path("sinkhole_blobs")
+INCOMPLETE_DIR = "incomplete"
+
+
+class BlobWriter:
+    def __init__(self, store: "BlobStore"):
+        self.store = store
+        self.size = 0
+        self._hash = hashlib.sha256()
+        store.root.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(prefix=".part-", dir=store.root)
+        self._raw = os.fdopen(fd, "wb")
+        self._sink = self._raw
+        if store.compress:
+            self._sink = zstandard.ZstdCompressor(level=store.level).stream_writer(self._raw, closefd=False)
+
+    def write(self, chunk: bytes) -> None:
+        self._hash.update(chunk)
+        self._sink.write(chunk)
+        self.size += len(chunk)
+
+    def abort(self) -> None:
+        self._close()
+        os.unlink(self._tmp_path)
+
+    def _close(self) -> None:
+        if self._sink is not self._raw:
+            self._sink.close()
+        self._raw.close()
+
+    def commit(self, incomplete: bool = False) -> Dict:
+        """Move the blob into place (or drop it if already stored) and describe it.
+
+        incomplete=True files a truncated body in the separate incomplete namespace.
+        """
+        self._close()
+        digest = self._hash.hexdigest()
+        path = self.store.find(digest, incomplete)
+        deduplicated = path is not None
+        if deduplicated:
+            os.unlink(self._tmp_path)
+        else:
+            path = self.store.path(digest, incomplete)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self._tmp_path, path)
+        self.store.note(deduplicated, self.size, path, incomplete)
+        return {
+            "sha256": digest,
+            "path": str(path),
+            "size": self.size,
+            "stored_size": path.stat().st_size,
+            "compression": "zstd" if path.suffix == ".zst" else None,
+            "deduplicated": deduplicated,
+            "incomplete": incomplete,
+        }
+
+
+class BlobStore:
+    def __init__(self, root: Path = BLOB_DIR, compress: bool = False, level: int = 3):
+        if compress and zstandard is None:
+            raise RuntimeError("zstd compression needs the zstandard package (pip install zstandard)")
+        self.root = Path(root)
+        self.compress = compress
+        self.level = level
+        self.stored = 0
+        self.incomplete = 0
+        self.deduplicated = 0
+        self.bytes_saved = 0
+
+    def _dir(self, digest: str, incomplete: bool = False) -> Path:
+        root = self.root / INCOMPLETE_DIR if incomplete else self.root
+        return root / digest[:2] / digest[2:4]
+
+    def path(self, digest: str, incomplete: bool = False) -> Path:
+        suffix = ".zst" if self.compress else ""
+        return self._dir(digest, incomplete) / f"{digest}{suffix}"
+
+    def writer(self) -> BlobWriter:
+        return BlobWriter(self)
+
+    def note(self, deduplicated: bool, size: int, path: Path, incomplete: bool = False) -> None:
+        if deduplicated:
+            self.deduplicated += 1
+            self.bytes_saved += size
+        elif incomplete:
+            self.incomplete += 1
+        else:
+            self.stored += 1
+
+    def find(self, digest: str, incomplete: bool = False) -> Optional[Path]:
+        """Stored path for a digest, whichever compression it was written with."""
+        for suffix in ("", ".zst"):
+            path = self._dir(digest, incomplete) / f"{digest}{suffix}"
+            if path.exists():
+                return path
+        return None
+
+    def open(self, digest: str, incomplete: bool = False) -> BinaryIO:
+        """Readable stream of the original (uncompressed) body."""
+        path = self.find(digest, incomplete)
+        if path is None:
+            raise KeyError(digest)
+        raw = path.open("rb")
+        if path.suffix == ".zst":
+            if zstandard is None:
+                raw.close()
+                raise RuntimeError("reading .zst blobs needs the zstandard package")
+            return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return raw
+
+    def stats(self) -> Dict:
+        return {"stored": self.stored, "incomplete": self.incomplete, "deduplicated": self.deduplicated,
+                "bytes_saved": self.bytes_saved}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["cat", "stats"])
+    parser.add_argument("digest", nargs="?")
+    parser.add_argument("--root", type=Path, default=BLOB_DIR)
+    parser.add_argument("--incomplete", action="store_true", help="read from the truncated-body namespace")
+    args = parser.parse_args()
+
+    store = BlobStore(args.root)
+    if args.command == "cat":
+        if not args.digest:
+            parser.error("cat needs a sha256 digest")
+        with store.open(args.digest, args.incomplete) as body:
+            shutil.copyfileobj(body, sys.stdout.buffer, 1 << 20)
+        return
+
+    for label, root in (("blobs", args.root), ("incomplete blobs", args.root / INCOMPLETE_DIR)):
+        blobs = stored = 0
+        for path in root.glob("??/??/*"):
+            blobs += 1
+            stored += path.stat().st_size
+        print(f"{blobs} {label}, {stored / 1024 / 1024:.1f} MiB on disk under {root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""Incremental SQLite index over the sinkhole's NDJSON log.
+
+`sync` reads only what was appended since the last run: every log file is identified by a
+fingerprint of its first line and the index remembers how many bytes of it were consumed,
+so a run picks up where the previous one stopped, finishes files that were rotated away
+since (c2_sinkhole.log.N, gzipped or not) and starts the fresh log from byte 0. A
+half-written last line is left for the next run. Beacons are indexed by time, client
+address, path and header (name, value); queries return the original log lines.
+
+    python3 sinkhole_index.py sync [--follow]
+    python3 sinkhole_index.py query --client 175.210.85.133 --path /beacon \\
+        --since 2025-09-28T13:00 --until 2025-09-28T14:00
+    python3 sinkhole_index.py query --header User-Agent=AwesomeCleaner --path '/upload*' --count
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+LOG_PATH = Path("c2_sinkhole.log")
+INDEX_PATH = Path("c2_sinkhole.db")
+BATCH_LINES = 20000
+READ_SIZE = 4 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS beacons (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    client TEXT NOT NULL,
+    path TEXT NOT NULL,
+    method TEXT NOT NULL,
+    body_length INTEGER NOT NULL,
+    body_sha256 TEXT,
+    line TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS beacons_client_path_ts ON beacons (client, path, ts);
+CREATE INDEX IF NOT EXISTS beacons_path_ts ON beacons (path, ts);
+CREATE INDEX IF NOT EXISTS beacons_ts ON beacons (ts);
+CREATE TABLE IF NOT EXISTS header_values (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    beacons INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (name, value)
+);
+CREATE TABLE IF NOT EXISTS beacon_headers (
+    value_id INTEGER NOT NULL,
+    beacon_id INTEGER NOT NULL,
+    PRIMARY KEY (value_id, beacon_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS log_files (
+    fingerprint TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_RELATIVE_RE = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_time(value: str, now: Optional[float] = None) -> float:
+    """ISO timestamp (naive = UTC, as the sinkhole logs) or a relative age like 15m / 2h / 7d."""
+    match = _RELATIVE_RE.match(value)
+    if match:
+        return (now if now is not None else time.time()) - float(match.group(1)) * _UNITS[match.group(2)]
+    parsed = datetime.fromisoformat(value[:-1] if value.endswith("Z") else value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def log_files(log_path: Path) -> List[Path]:
+    """Rotated backups oldest first, then the live log."""
+    backups = []
+    for path in log_path.parent.glob(log_path.name + ".*"):
+        suffix = path.name[len(log_path.name) + 1:]
+        number = suffix[:-3] if suffix.endswith(".gz") else suffix
+        if number.isdigit():
+            backups.append((int(number), path))
+    return [path for _, path in sorted(backups, reverse=True)] + [log_path]
+
+
+def _open_log(path: Path):
+    return gzip.open(path, "rb") if path.suffix == ".gz" else path.open("rb")
+
+
+def fingerprint(path: Path) -> Optional[str]:
+    """Hash of the first complete line; None while the file has no complete line yet."""
+    try:
+        with _open_log(path) as f:
+            first = f.readline()
+    except FileNotFoundError:
+        return None
+    if not first.endswith(b"\n"):
+        return None
+    return hashlib.sha1(first).hexdigest()
+
+
+class SinkholeIndex:
+    def __init__(self, index_path: Path = INDEX_PATH):
+        self.db = sqlite3.connect(str(index_path))
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA cache_size=-262144")  # 256 MiB: keeps index pages hot during backfill
+        self.db.executescript(SCHEMA)
+        self._header_ids: Dict[Tuple[str, str], int] = {}
+
+    def close(self) -> None:
+        self.db.close()
+
+    # -- indexing -------------------------------------------------------------------
+
+    def sync(self, log_path: Path = LOG_PATH) -> int:
+        """Index everything appended since the last sync; returns the number of new beacons."""
+        added = 0
+        files = log_files(Path(log_path))
+        for position, path in enumerate(files):
+            key = fingerprint(path)
+            if key is None:
+                continue
+            row = self.db.execute("SELECT offset, complete FROM log_files WHERE fingerprint = ?", (key,)).fetchone()
+            offset, complete = row if row else (0, 0)
+            if complete:
+                continue
+            rotated = position < len(files) - 1
+            added += self._index_file(path, key, offset, rotated)
+        if added:
+            self.db.execute("PRAGMA optimize")
+        return added
+
+    def _index_file(self, path: Path, key: str, offset: int, rotated: bool) -> int:
+        added = 0
+        with _open_log(path) as f:
+            f.seek(offset)
+            pending = b""
+            while True:
+                data = f.read(READ_SIZE)
+                if not data:
+                    break
+                data = pending + data
+                end = data.rfind(b"\n") + 1
+                pending = data[end:]
+                lines = data[:end].split(b"\n")[:-1]
+                for start in range(0, len(lines), BATCH_LINES):
+                    batch = lines[start:start + BATCH_LINES]
+                    offset += sum(len(line) + 1 for line in batch)
+                    added += self._insert(batch)
+                    self._save_offset(key, path, offset, False)
+                    self.db.commit()
+        # A rotated file never grows again; the live log keeps its partial last line for later
+        if rotated:
+            self._save_offset(key, path, offset, True)
+            self.db.commit()
+        return added
+
+    def _save_offset(self, key: str, path: Path, offset: int, complete: bool) -> None:
+        self.db.execute(
+            "INSERT INTO log_files (fingerprint, name, offset, complete) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (fingerprint) DO UPDATE SET name = excluded.name, offset = excluded.offset, "
+            "complete = excluded.complete",
+            (key, path.name, offset, int(complete)),
+        )
+
+    def _header_id(self, name: str, value: str) -> int:
+        key = (name, value)
+        value_id = self._header_ids.get(key)
+        if value_id is None:
+            self.db.execute("INSERT OR IGNORE INTO header_values (name, value) VALUES (?, ?)", key)
+            value_id = self.db.execute(
+                "SELECT id FROM header_values WHERE name = ? AND value = ?", key).fetchone()[0]
+            self._header_ids[key] = value_id
+        return value_id
+
+    def _insert(self, lines: List[bytes]) -> int:
+        next_id = (self.db.execute("SELECT MAX(id) FROM beacons").fetchone()[0] or 0) + 1
+        beacons = []
+        headers = []
+        header_counts: Dict[int, int] = {}
+        for raw in lines:
+            try:
+                line = raw.decode("utf-8")
+                entry = json.loads(line)
+                ts = parse_time(entry["timestamp"])
+            except (UnicodeDecodeError, ValueError, KeyError, TypeError):
+                continue
+            beacon_id = next_id + len(beacons)
+            beacons.append((beacon_id, ts, entry.get("client_address", ""), entry.get("path", ""),
+                            entry.get("method", ""), entry.get("body_length", 0), entry.get("body_sha256"), line))
+            value_ids = {self._header_id(name.lower(), str(value))
+                         for name, value in (entry.get("headers") or {}).items()}
+            for value_id in value_ids:
+                headers.append((value_id, beacon_id))
+                header_counts[value_id] = header_counts.get(value_id, 0) + 1
+        self.db.executemany("INSERT INTO beacons VALUES (?, ?, ?, ?, ?, ?, ?, ?)", beacons)
+        self.db.executemany("INSERT INTO beacon_headers VALUES (?, ?)", headers)
+        self.db.executemany("UPDATE header_values SET beacons = beacons + ? WHERE id = ?",
+                            [(count, value_id) for value_id, count in header_counts.items()])
+        return len(beacons)
+
+    # -- queries --------------------------------------------------------------------
+
+    def _where(self, client: Optional[str], path: Optional[str], since: Optional[float],
+               until: Optional[float], headers: Dict[str, str], method: Optional[str]) -> Tuple[str, list]:
+        clauses, params = [], []
+        if client:
+            clauses.append("client = ?")
+            params.append(client)
+        if path and path.endswith("*"):
+            # Prefix as a range so the (path, ts) index still applies; LIKE would scan
+            prefix = path[:-1]
+            clauses.append("path >= ? AND path < ?")
+            params += [prefix, prefix + "\U0010ffff"]
+        elif path:
+            clauses.append("path = ?")
+            params.append(path)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        if method:
+            clauses.append("method = ?")
+            params.append(method.upper())
+        if headers:
+            matches = []
+            for name, value in headers.items():
+                row = self.db.execute("SELECT beacons, id FROM header_values WHERE name = ? AND value = ?",
+                                      (name.lower(), value)).fetchone()
+                if row is None:
+                    return " WHERE 0", []
+                matches.append(row)
+            matches.sort()
+            # Drive the query from the rarest header's posting list when it is smaller than
+            # what the beacons indexes would visit; other headers become per-row probes.
+            rarest, rarest_id = matches[0]
+            if not client and rarest < self._estimate_rows(path, since, until):
+                clauses.append("id IN (SELECT beacon_id FROM beacon_headers WHERE value_id = ?)")
+                params.append(rarest_id)
+                matches = matches[1:]
+            for _, value_id in matches:
+                clauses.append("EXISTS (SELECT 1 FROM beacon_headers WHERE value_id = ? AND beacon_id = beacons.id)")
+                params.append(value_id)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _estimate_rows(self, path: Optional[str], since: Optional[float], until: Optional[float]) -> float:
+        """Rough number of beacons the path/time indexes would visit, assuming an even spread over time."""
+        # ids are dense, so MAX(id) stands in for COUNT(*) (which would scan a whole index); SQLite
+        # only answers MIN/MAX from an index when each is the sole aggregate of its query
+        total, first, last = self.db.execute(
+            "SELECT (SELECT MAX(id) FROM beacons), (SELECT MIN(ts) FROM beacons), (SELECT MAX(ts) FROM beacons)"
+        ).fetchone()
+        if not total:
+            return 0
+        if path and not path.endswith("*"):
+            total = self.db.execute("SELECT COUNT(*) FROM (SELECT 1 FROM beacons WHERE path = ? LIMIT 10000)",
+                                    (path,)).fetchone()[0] * (total / 10000 if total > 10000 else 1)
+        if last > first and (since is not None or until is not None):
+            start = max(first, since if since is not None else first)
+            end = min(last, until if until is not None else last)
+            total *= max(0.0, end - start) / (last - first)
+        return total
+
+    def query(self, client: Optional[str] = None, path: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None, headers: Optional[Dict[str, str]] = None,
+              method: Optional[str] = None, limit: Optional[int] = 100) -> Iterator[str]:
+        """Matching log lines, oldest first. path may end in * for a prefix match."""
+        where, params = self._where(client, path, since, until, headers or {}, method)
+        sql = f"SELECT line FROM beacons{where} ORDER BY ts, id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for (line,) in self.db.execute(sql, params):
+            yield line
+
+    def count(self, client: Optional[str] = None, path: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None, headers: Optional[Dict[str, str]] = None,
+              method: Optional[str] = None) -> int:
+        where, params = self._where(client, path, since, until, headers or {}, method)
+        return self.db.execute(f"SELECT COUNT(*) FROM beacons{where}", params).fetchone()[0]
+
+    def stats(self) -> Dict:
+        beacons, first, last = self.db.execute(
+            "SELECT (SELECT COUNT(*) FROM beacons), (SELECT MIN(ts) FROM beacons), (SELECT MAX(ts) FROM beacons)"
+        ).fetchone()
+        files = self.db.execute("SELECT name, offset, complete FROM log_files ORDER BY rowid").fetchall()
+        return {
+            "beacons": beacons,
+            "first": datetime.fromtimestamp(first, timezone.utc).isoformat() if first else None,
+            "last": datetime.fromtimestamp(last, timezone.utc).isoformat() if last else None,
+            "clients": self.db.execute("SELECT COUNT(DISTINCT client) FROM beacons").fetchone()[0],
+            "header_values": self.db.execute("SELECT COUNT(*) FROM header_values").fetchone()[0],
+            "files": [{"name": name, "offset": offset, "complete": bool(complete)} for name, offset, complete in files],
+        }
+
+
+def parse_headers(values: List[str], parser: argparse.ArgumentParser) -> Dict[str, str]:
+    headers = {}
+    for value in values:
+        name, sep, header_value = value.partition("=")
+        if not sep:
+            parser.error(f"--header needs NAME=VALUE, got {value!r}")
+        headers[name] = header_value
+    return headers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index", type=Path, default=INDEX_PATH, help="SQLite index file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = commands.add_parser("sync", help="index entries appended since the last sync")
+    sync_parser.add_argument("--log", type=Path, default=LOG_PATH)
+    sync_parser.add_argument("--follow", action="store_true", help="keep tailing the log")
+    sync_parser.add_argument("--interval", type=float, default=2.0, help="seconds between polls with --follow")
+
+    query_parser = commands.add_parser("query", help="print matching log lines (NDJSON)")
+    query_parser.add_argument("--client", help="client address")
+    query_parser.add_argument("--path", help="request path; a trailing * matches a prefix")
+    query_parser.add_argument("--method")
+    query_parser.add_argument("--since", help="ISO time (UTC) or age such as 30m, 6h, 7d")
+    query_parser.add_argument("--until", help="ISO time (UTC) or age such as 30m, 6h, 7d")
+    query_parser.add_argument("--header", action="append", default=[], metavar="NAME=VALUE",
+                              help="exact header value (repeatable, names are case-insensitive)")
+    query_parser.add_argument("--limit", type=int, default=100, help="0 for no limit")
+    query_parser.add_argument("--count", action="store_true", help="print only the number of matches")
+
+    commands.add_parser("stats", help="summarise the index")
+    args = parser.parse_args()
+
+    index = SinkholeIndex(args.index)
+    try:
+        if args.command == "sync":
+            while True:
+                started = time.perf_counter()
+                added = index.sync(args.log)
+                if added or not args.follow:
+                    print(f"indexed {added} beacons in {time.perf_counter() - started:.2f} s", file=sys.stderr)
+                if not args.follow:
+                    break
+                time.sleep(args.interval)
+        elif args.command == "query":
+            filters = {
+                "client": args.client,
+                "path": args.path,
+                "method": args.method,
+                "since": parse_time(args.since) if args.since else None,
+                "until": parse_time(args.until) if args.until else None,
+                "headers": parse_headers(args.header, query_parser),
+            }
+            if args.count:
+                print(index.count(**filters))
+            else:
+                out = sys.stdout
+                for line in index.query(limit=args.limit, **filters):
+                    out.write(line + "\n")
+        else:
+            print(json.dumps(index.stats(), indent=2))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
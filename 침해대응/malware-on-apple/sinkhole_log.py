@@ -0,0 +1,187 @@
+"""Buffered, rotating NDJSON log writer for the sinkhole.
+
+write() only serialises the entry and puts it on an in-memory queue; a background thread
+appends queued lines in one write() per batch, flushing when max_batch lines or
+max_batch_bytes are pending or flush_interval seconds have passed. When the file would
+grow past max_bytes it is rotated like logging.handlers.RotatingFileHandler
+(c2_sinkhole.log.1, .2, ... up to backup_count), optionally gzip-compressed. close()
+(also registered with atexit) drains the queue, so nothing accepted is lost on shutdown.
+
+The queue holds at most max_queue lines; write() never blocks the event loop, so when the
+disk cannot keep up further entries are dropped and counted. A batch whose write fails
+(disk full, log directory removed, ...) is retried write_retries times with the file
+reopened, then dropped and counted; the writer thread keeps running either way.
+"""
+from __future__ import annotations
+
+import atexit
+import gzip
+import json
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+_STOP = object()
+
+
+class BatchedLogWriter:
+    def __init__(self, path: Path, max_batch: int = 1000, max_batch_bytes: int = 1 << 20,
+                 flush_interval: float = 0.5, max_bytes: int = 0, backup_count: int = 5,
+                 compress: bool = False, max_queue: int = 100_000, write_retries: int = 3):
+        self.path = Path(path)
+        self.max_batch = max_batch
+        self.max_batch_bytes = max_batch_bytes
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.write_retries = write_retries
+        self.entries = 0
+        self.batches = 0
+        self.rotations = 0
+        self.dropped = 0
+        self.failed_entries = 0
+        self.failed_batches = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._file = None
+        self._size = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="sinkhole-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, entry: dict) -> None:
+        if self._closed:
+            raise RuntimeError("log writer is closed")
+        try:
+            self._queue.put_nowait(json.dumps(entry, ensure_ascii=False) + "\n")
+        except queue.Full:
+            if not self.dropped:
+                print(f"sinkhole log queue full ({self._queue.maxsize} lines), dropping entries",
+                      file=sys.stderr)
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Flush everything queued so far and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def stats(self) -> dict:
+        return {"entries": self.entries, "batches": self.batches, "rotations": self.rotations,
+                "queued": self._queue.qsize(), "dropped": self.dropped,
+                "failed_entries": self.failed_entries, "failed_batches": self.failed_batches}
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            size = len(item)
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch and size < self.max_batch_bytes:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                size += len(item)
+            self._write_with_retry("".join(batch), len(batch))
+        self._close_file()
+
+    def _write_with_retry(self, data: str, count: int) -> None:
+        for attempt in range(self.write_retries + 1):
+            try:
+                self._write_batch(data, count)
+                return
+            except OSError as exc:
+                print(f"sinkhole log write failed (attempt {attempt + 1}): {exc}", file=sys.stderr)
+                # Reopen on the next attempt, the handle may be stale (rotated away, ENOSPC, ...)
+                self._close_file()
+                if attempt < self.write_retries:
+                    time.sleep(min(0.1 * 2 ** attempt, 2.0))
+        self.failed_entries += count
+        self.failed_batches += 1
+        print(f"dropped a batch of {count} log entries ({self.failed_entries} so far)", file=sys.stderr)
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _write_batch(self, data: str, count: int) -> None:
+        encoded = data.encode("utf-8")
+        if self._file is None:
+            self._open()
+        if self.max_bytes and self._size and self._size + len(encoded) > self.max_bytes:
+            self._rotate()
+        self._file.write(encoded)
+        self._file.flush()
+        self._size += len(encoded)
+        self.entries += count
+        self.batches += 1
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("ab")
+        self._size = self._file.tell()
+
+    def _backup_name(self, index: int) -> Path:
+        return self.path.with_name(f"{self.path.name}.{index}{'.gz' if self.compress else ''}")
+
+    def _rotate(self) -> None:
+        self._file.close()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = self._backup_name(index)
+                if source.exists():
+                    os.replace(source, self._backup_name(index + 1))
+            target = self._backup_name(1)
+            if self.compress:
+                tmp_path = target.with_name(target.name + ".tmp")
+                with self.path.open("rb") as source, gzip.open(tmp_path, "wb") as sink:
+                    shutil.copyfileobj(source, sink, 1 << 20)
+                os.replace(tmp_path, target)
+                self.path.unlink()
+            else:
+                os.replace(self.path, target)
+        else:
+            self.path.unlink()
+        self.rotations += 1
+        self._open()
+
+
+class DirectLogWriter:
+    """Open/append/close per entry (the original behaviour), for comparison and --no-batching."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries = 0
+
+    def write(self, entry: dict) -> None:
+        with self.path.open("a", encoding="utf-8") as log_file:
+            log_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.entries += 1
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"entries": self.entries}
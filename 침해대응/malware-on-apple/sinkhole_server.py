@@ -1,56 +1,375 @@
 #!/usr/bin/env python3
-"""Simple sinkhole HTTP server for AwesomeCleaner C2 endpoint."""
-from http.server import HTTPServer, BaseHTTPRequestHandler
+"""Asyncio sinkhole HTTP server for AwesomeCleaner C2 endpoint.
+
+Every connection is served by its own coroutine, so a slow or stalled implant only
+holds its own socket (and is dropped after --idle-timeout) instead of blocking every
+other beacon. Request bodies are streamed in CHUNK_SIZE pieces into a content-addressed
+blob store (blob_store.py, --blob-dir) while the first PREVIEW_BYTES are kept for the log
+entry, so large exfil uploads never sit in memory and repeated uploads of the same data
+are stored once. Log entries keep the original record format; a stored body adds
+"body_sha256" and "body_blob". A body cut short by the client adds "incomplete": true and
+is stored in the blob store's incomplete namespace, logged as "partial_body_sha256" so it
+is never taken for the complete payload with that digest.
+Entries go through a BatchedLogWriter (sinkhole_log.py) that appends them in batches from
+a background thread and rotates the log by size; --no-batching restores
+open/append/close per request.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import signal
+import threading
 from datetime import datetime
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler
 from pathlib import Path
-import json
+from typing import Dict, List, Optional, Tuple, Union
+
+from blob_store import BLOB_DIR, BlobStore
+from sinkhole_log import BatchedLogWriter, DirectLogWriter
 
 LOG_PATH = Path("c2_sinkhole.log")
+HOST = "0.0.0.0"
+PORT = 23282
+CHUNK_SIZE = 64 * 1024
+PREVIEW_BYTES = 2048
+MAX_HEADER_BYTES = 64 * 1024
+IDLE_TIMEOUT = 30.0
+MAX_CONNECTIONS = 10000
+# Same banner http.server sent, so implants see no difference
+SERVER_HEADER = f"{BaseHTTPRequestHandler.server_version} {BaseHTTPRequestHandler.sys_version}"
+
+
+class BadRequest(Exception):
+    pass
+
+
+class ClientGone(Exception):
+    """Connection closed or idle for too long part-way through a request."""
+
+
+class RequestHead:
+    __slots__ = ("method", "path", "version", "header_list")
+
+    def __init__(self, method: str, path: str, version: str, header_list: List[Tuple[str, str]]):
+        self.method = method
+        self.path = path
+        self.version = version
+        self.header_list = header_list
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        # Later duplicates win, like {k: v for k, v in self.headers.items()} did
+        return {name: value for name, value in self.header_list}
+
+    def header(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        name = name.lower()
+        for key, value in reversed(self.header_list):
+            if key.lower() == name:
+                return value
+        return default
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = (self.header("Connection") or "").lower()
+        if self.version == "HTTP/1.1":
+            return connection != "close"
+        return connection == "keep-alive"
+
+
+def parse_head(raw: bytes) -> RequestHead:
+    lines = raw.decode("latin1").split("\r\n")
+    parts = lines[0].split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        raise BadRequest(f"bad request line {lines[0][:100]!r}")
+    header_list = []
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep or not name.strip():
+            raise BadRequest(f"bad header line {line[:100]!r}")
+        header_list.append((name.strip(), value.strip()))
+    return RequestHead(parts[0], parts[1], parts[2], header_list)
+
+
+class BodySpool:
+    """Streams a request body into the blob store while keeping the first PREVIEW_BYTES in memory.
+
+    Blob file writes (and compression) run in worker threads so a slow disk never stalls
+    the event loop; the lock keeps abort() from racing a write still running there.
+    """
+
+    def __init__(self, blobs: Optional[BlobStore]):
+        self.blobs = blobs
+        self.preview = bytearray()
+        self.length = 0
+        self._writer = None
+        self._aborted = False
+        self._lock = threading.Lock()
 
-class SinkholeHandler(BaseHTTPRequestHandler):
-    def _log_request(self, body: bytes):
-        entry = {
+    async def write(self, chunk: bytes) -> None:
+        if len(self.preview) < PREVIEW_BYTES:
+            self.preview += chunk[:PREVIEW_BYTES - len(self.preview)]
+        self.length += len(chunk)
+        if self.blobs is not None:
+            await asyncio.to_thread(self._write_blob, chunk)
+
+    def _write_blob(self, chunk: bytes) -> None:
+        with self._lock:
+            if self._aborted:
+                return
+            if self._writer is None:
+                self._writer = self.blobs.writer()
+            self._writer.write(chunk)
+
+    async def finish(self, incomplete: bool = False) -> Optional[dict]:
+        """Commit the body to the blob store; returns the blob description or None."""
+        return await asyncio.to_thread(self._commit, incomplete)
+
+    def _commit(self, incomplete: bool) -> Optional[dict]:
+        with self._lock:
+            if self._writer is None:
+                return None
+            blob, self._writer = self._writer.commit(incomplete), None
+            return blob
+
+    def abort(self) -> None:
+        with self._lock:
+            self._aborted = True
+            if self._writer is not None:
+                self._writer.abort()
+                self._writer = None
+
+
+class SinkholeServer:
+    def __init__(self, log_writer: Optional[Union[BatchedLogWriter, DirectLogWriter]] = None,
+                 blobs: Optional[BlobStore] = None, idle_timeout: float = IDLE_TIMEOUT,
+                 max_connections: int = MAX_CONNECTIONS):
+        self.log_writer = log_writer or BatchedLogWriter(LOG_PATH)
+        self.blobs = blobs
+        self.idle_timeout = idle_timeout
+        self.max_connections = max_connections
+        self.active = 0
+        self.requests = 0
+        self.rejected = 0
+        self._handlers: set = set()
+        self._stop: Optional[asyncio.Event] = None
+
+    def build_entry(self, head: RequestHead, peer: Tuple[str, int], spool: BodySpool) -> dict:
+        return {
             "timestamp": datetime.utcnow().isoformat() + "Z",
-            "client_address": self.client_address[0],
-            "client_port": self.client_address[1],
-            "method": self.command,
-            "path": self.path,
-            "headers": {k: v for k, v in self.headers.items()},
-            "body_preview": body[:2048].decode("latin1", errors="replace"),
-            "body_length": len(body),
+            "client_address": peer[0],
+            "client_port": peer[1],
+            "method": head.method,
+            "path": head.path,
+            "headers": head.headers,
+            "body_preview": bytes(spool.preview).decode("latin1", errors="replace"),
+            "body_length": spool.length,
         }
-        with LOG_PATH.open("a", encoding="utf-8") as log_file:
-            log_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
-
-    def do_POST(self):
-        length = int(self.headers.get('Content-Length', '0'))
-        body = self.rfile.read(length) if length else b''
-        self._log_request(body)
-        self.send_response(200)
-        self.send_header("Content-Type", "application/json")
-        self.end_headers()
-        self.wfile.write(b'{"status": "captured"}')
-
-    def do_GET(self):
-        self._log_request(b"")
-        self.send_response(200)
-        self.send_header("Content-Type", "text/plain")
-        self.end_headers()
-        self.wfile.write(b"Sinkhole active")
-
-    def log_message(self, format, *args):
-        # Suppress default stdout logging
-        pass
+
+    def log_entry(self, entry: dict) -> None:
+        self.log_writer.write(entry)
+
+    async def _read(self, coro):
+        try:
+            return await asyncio.wait_for(coro, self.idle_timeout)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError) as e:
+            raise ClientGone(str(e) or type(e).__name__) from e
+
+    async def _read_exact(self, reader: asyncio.StreamReader, length: int, spool: Optional[BodySpool]) -> None:
+        remaining = length
+        while remaining:
+            chunk = await self._read(reader.read(min(remaining, CHUNK_SIZE)))
+            if not chunk:
+                raise ClientGone("eof")
+            remaining -= len(chunk)
+            if spool is not None:
+                await spool.write(chunk)
+
+    async def _read_line(self, reader: asyncio.StreamReader) -> bytes:
+        try:
+            return await self._read(reader.readuntil(b"\r\n"))
+        except asyncio.LimitOverrunError:
+            raise BadRequest("chunk size or trailer line too long")
+
+    async def read_body(self, reader: asyncio.StreamReader, head: RequestHead, spool: Optional[BodySpool]) -> None:
+        """Stream the body into spool (None discards it) without buffering it whole."""
+        if "chunked" in (head.header("Transfer-Encoding") or "").lower():
+            while True:
+                size_line = await self._read_line(reader)
+                try:
+                    size = int(size_line.split(b";", 1)[0].strip(), 16)
+                except ValueError:
+                    raise BadRequest(f"bad chunk size {size_line[:40]!r}")
+                if size == 0:
+                    # Trailer headers up to the blank line
+                    while await self._read_line(reader) != b"\r\n":
+                        pass
+                    return
+                await self._read_exact(reader, size, spool)
+                await self._read(reader.readexactly(2))
+        try:
+            length = int(head.header("Content-Length", "0"))
+        except ValueError:
+            raise BadRequest("bad Content-Length")
+        if length < 0:
+            raise BadRequest("bad Content-Length")
+        await self._read_exact(reader, length, spool)
+
+    async def respond(self, writer: asyncio.StreamWriter, status: int, reason: str, content_type: str,
+                      body: bytes, keep_alive: bool) -> None:
+        head = (
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Server: {SERVER_HEADER}\r\n"
+            f"Date: {formatdate(usegmt=True)}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin1") + body)
+        await self._read(writer.drain())
+
+    async def handle_request(self, reader, writer, head: RequestHead, peer) -> bool:
+        """Serve one request; returns whether the connection can be reused."""
+        keep_alive = head.keep_alive
+        if head.method == "POST":
+            spool = BodySpool(self.blobs)
+            incomplete = False
+            try:
+                await self.read_body(reader, head, spool)
+            except ClientGone:
+                incomplete = True
+            except BaseException:
+                spool.abort()
+                raise
+            entry = self.build_entry(head, peer, spool)
+            blob = await spool.finish(incomplete)
+            if blob:
+                entry["partial_body_sha256" if incomplete else "body_sha256"] = blob["sha256"]
+                entry["body_blob"] = blob["path"]
+            if incomplete:
+                entry["incomplete"] = True
+            self.log_entry(entry)
+            self.requests += 1
+            if incomplete:
+                return False
+            await self.respond(writer, 200, "OK", "application/json", b'{"status": "captured"}', keep_alive)
+        elif head.method == "GET":
+            # Like do_GET, the body (if any) is not captured, only drained to keep framing
+            await self.read_body(reader, head, None)
+            self.log_entry(self.build_entry(head, peer, BodySpool(None)))
+            self.requests += 1
+            await self.respond(writer, 200, "OK", "text/plain", b"Sinkhole active", keep_alive)
+        else:
+            await self.respond(writer, 501, "Unsupported method", "text/plain",
+                               f"Unsupported method ({head.method!r})".encode("latin1", "replace"), False)
+            return False
+        return keep_alive
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info("peername") or ("", 0)
+        if self.active >= self.max_connections:
+            self.rejected += 1
+            writer.close()
+            return
+        self.active += 1
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                try:
+                    raw = await self._read(reader.readuntil(b"\r\n\r\n"))
+                except ClientGone:
+                    break
+                except asyncio.LimitOverrunError:
+                    await self.respond(writer, 431, "Request Header Fields Too Large", "text/plain", b"", False)
+                    break
+                try:
+                    head = parse_head(raw)
+                    if not await self.handle_request(reader, writer, head, peer[:2]):
+                        break
+                except BadRequest as e:
+                    await self.respond(writer, 400, "Bad Request", "text/plain", str(e).encode("latin1", "replace"), False)
+                    break
+        except (ClientGone, ConnectionError):
+            pass
+        finally:
+            self.active -= 1
+            self._handlers.discard(task)
+            writer.close()
+
+    async def serve(self, host: str = HOST, port: int = PORT, ready: Optional[asyncio.Event] = None) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES,
+                                            backlog=4096)
+        print(f"Sinkhole listening on http://{host}:{port} ...")
+        self._stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await self._stop.wait()
+                print("\nSinkhole shutting down")
+                server.close()
+                # Let in-flight uploads finish for a moment, then drop them
+                if self._handlers:
+                    _, pending = await asyncio.wait(list(self._handlers), timeout=5)
+                    for task in pending:
+                        task.cancel()
+                    if pending:
+                        await asyncio.wait(pending)
+        finally:
+            # Everything logged so far reaches the file before we return
+            self.log_writer.close()
+        print(f"captured {self.requests} requests")
+        lost = {key: value for key, value in self.log_writer.stats().items()
+                if key in ("dropped", "failed_entries") and value}
+        if lost:
+            print(f"log entries lost: {lost}")
+        if self.blobs is not None:
+            print(f"bodies: {self.blobs.stats()}")
+
+    def stop(self) -> None:
+        self._stop.set()
 
 
 def main():
-    server_address = ("0.0.0.0", 23282)
-    httpd = HTTPServer(server_address, SinkholeHandler)
-    print("Sinkhole listening on http://0.0.0.0:23282 ...")
-    try:
-        httpd.serve_forever()
-    except KeyboardInterrupt:
-        print("\nSinkhole shutting down")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--log", type=Path, default=LOG_PATH, help="NDJSON log file")
+    parser.add_argument("--blob-dir", type=Path, default=BLOB_DIR, help="content-addressed store for POST bodies")
+    parser.add_argument("--zstd-bodies", action="store_true", help="zstd-compress stored bodies (needs zstandard)")
+    parser.add_argument("--no-bodies", action="store_true", help="keep only body_preview/body_length")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT,
+                        help="drop connections that send nothing for this many seconds")
+    parser.add_argument("--max-connections", type=int, default=MAX_CONNECTIONS)
+    parser.add_argument("--no-batching", action="store_true", help="open/append/close the log per request")
+    parser.add_argument("--flush-interval", type=float, default=0.5, help="max seconds an entry waits in memory")
+    parser.add_argument("--batch-size", type=int, default=1000, help="max entries per write")
+    parser.add_argument("--rotate-bytes", type=int, default=256 * 1024 * 1024, help="rotate the log past this size (0 = never)")
+    parser.add_argument("--backup-count", type=int, default=10)
+    parser.add_argument("--max-queue", type=int, default=100_000,
+                        help="entries waiting for the writer before new ones are dropped")
+    parser.add_argument("--compress", action="store_true", help="gzip rotated logs")
+    args = parser.parse_args()
+
+    if args.no_batching:
+        log_writer = DirectLogWriter(args.log)
+    else:
+        log_writer = BatchedLogWriter(args.log, max_batch=args.batch_size, flush_interval=args.flush_interval,
+                                      max_bytes=args.rotate_bytes, backup_count=args.backup_count,
+                                      compress=args.compress, max_queue=args.max_queue)
+    blobs = None if args.no_bodies else BlobStore(args.blob_dir, compress=args.zstd_bodies)
+    server = SinkholeServer(log_writer, blobs, args.idle_timeout, args.max_connections)
+    asyncio.run(server.serve(args.host, args.port))
 
 
 if __name__ == "__main__":
@@ -1,29 +1,14 @@
 from pathlib import Path
+from analysis.xor_stream import map_binary, scan_cstrings
 BINARY_PATH = Path('AwesomeCleaner.app/Contents/MacOS/AwesomeCleaner')
 KEY_EVEN = 0x41
 KEY_ODD = 0x20
 CONFIG_START = 0x1CD90
 CONFIG_END = 0x1D1F0
 
-def decode_string(data: bytes, start: int) -> str:
-    chars = []
-    idx = 0
-    while (start + idx) < len(data):
-        key = KEY_EVEN if idx % 2 == 0 else KEY_ODD
-        decoded = data[start + idx] ^ key
-        if decoded == 0:
-            break
-        if 32 <= decoded <= 126:
-            chars.append(chr(decoded))
-        else:
-            break
-        idx += 1
-    return ''.join(chars)
-
-data = BINARY_PATH.read_bytes()
 seen = set()
-for addr in range(CONFIG_START, CONFIG_END):
-    s = decode_string(data, addr)
-    if len(s) >= 4 and s not in seen:
-        seen.add(s)
-        print(hex(addr), s)
+with map_binary(BINARY_PATH) as data:
+    for addr, s in scan_cstrings(data, CONFIG_START, CONFIG_END, bytes((KEY_EVEN, KEY_ODD))):
+        if s not in seen:
+            seen.add(s)
+            print(hex(addr), s)
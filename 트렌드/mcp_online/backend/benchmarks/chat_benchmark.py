@@ -0,0 +1,160 @@
+"""/chat 요청당 오버헤드 벤치마크: 매 요청 MCP 클라이언트/에이전트 생성 vs ChatAgent 재사용
+
+로컬 스텁 MCP 서버와 가짜 채팅 모델을 사용하므로 네트워크/API 키 없이 실행된다.
+--stream 을 주면 /chat/stream 이벤트 스트림의 첫 토큰 지연(TTFB)과 이벤트 순서도 확인한다.
+
+사용법 (backend 디렉터리에서):
+    python -m benchmarks.chat_benchmark --requests 50
+    python -m benchmarks.chat_benchmark --stream
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import re
+import statistics
+import threading
+import time
+
+import uvicorn
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from langgraph.prebuilt import create_react_agent
+from mcp.server.fastmcp import FastMCP
+
+from chat_agent import ChatAgent, stream_chat_events
+
+SYSTEM_PROMPT = "당신은 금융정보도서관의 AI 어시스턴트입니다."
+
+
+class FakeToolChatModel(GenericFakeChatModel):
+    """도구 바인딩을 무시하고 미리 정한 답변(도구 호출 포함)을 토큰 단위로 돌려주는 모델"""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self._generate(messages, stop=stop, run_manager=run_manager, **kwargs).generations[0].message
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", id=message.id, tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                for i, call in enumerate(message.tool_calls)
+            ]))
+            return
+        for token in re.split(r"(\s)", message.content):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token, id=message.id))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+def fake_model(reply="기준금리는 3.5%입니다."):
+    return FakeToolChatModel(messages=itertools.cycle([AIMessage(content=reply)]))
+
+
+def fake_tool_calling_model(reply="한국은행은 2024년 기준금리를 3.5%로 유지했습니다."):
+    """검색 도구를 한 번 호출한 뒤 답변하는 모델"""
+    tool_call = AIMessage(content="", tool_calls=[
+        {"name": "search_financial_documents", "args": {"query": "기준금리"}, "id": "call_1"}
+    ])
+    return FakeToolChatModel(messages=itertools.cycle([tool_call, AIMessage(content=reply)]))
+
+
+def start_stub_mcp_server(port):
+    stub = FastMCP("stub")
+
+    @stub.tool()
+    def search_financial_documents(query: str, limit: int = 10) -> list:
+        """금융 정보 문서 검색"""
+        return [{"id": 1, "title": f"{query} 문서"}]
+
+    @stub.tool()
+    def get_recent_documents(limit: int = 10) -> list:
+        """최신 금융 정보 문서 조회"""
+        return []
+
+    server = uvicorn.Server(uvicorn.Config(stub.streamable_http_app(), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<28} mean {statistics.mean(timings):8.2f} ms   p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+async def main_async(args):
+    server = start_stub_mcp_server(args.port)
+    connections = {"stub": {"url": f"http://127.0.0.1:{args.port}/mcp/", "transport": "streamable_http"}}
+    messages = {"messages": [HumanMessage(content="기준금리 알려줘")]}
+    model = fake_model()
+
+    per_request = []
+    for _ in range(args.requests):
+        started = time.perf_counter()
+        client = MultiServerMCPClient(connections)
+        tools = await client.get_tools()
+        agent = create_react_agent(model, tools, prompt=SYSTEM_PROMPT)
+        await agent.ainvoke(messages)
+        per_request.append((time.perf_counter() - started) * 1000)
+
+    chat_agent = ChatAgent(model, connections, SYSTEM_PROMPT)
+    await chat_agent.refresh()
+    reused = []
+    for _ in range(args.requests):
+        started = time.perf_counter()
+        agent = await chat_agent.get()
+        await agent.ainvoke(messages)
+        reused.append((time.perf_counter() - started) * 1000)
+
+    print(f"{args.requests} requests against stub MCP server, fake chat model\n")
+    report("rebuild client+agent", per_request)
+    report("reuse ChatAgent", reused)
+
+    if args.stream:
+        await stream_check(connections, messages, args.requests)
+    server.should_exit = True
+
+
+async def stream_check(connections, messages, requests):
+    chat_agent = ChatAgent(fake_tool_calling_model(), connections, SYSTEM_PROMPT)
+    agent = await chat_agent.get()
+
+    full, first_token = [], []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await agent.ainvoke(messages)
+        full.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        events = []
+        async for event in stream_chat_events(agent, messages["messages"]):
+            if event["type"] == "token" and not any(e["type"] == "token" for e in events):
+                first_token.append((time.perf_counter() - started) * 1000)
+            events.append(event)
+
+    kinds = [event["type"] for event in events]
+    tokens = "".join(event["content"] for event in events if event["type"] == "token")
+    assert kinds[0] == "tool_start" and kinds.index("tool_end") < kinds.index("token") and kinds[-1] == "done", kinds
+    assert events[-1]["reply"] == tokens, (events[-1], tokens)
+    print(f"\nstream events: {' '.join(dict.fromkeys(kinds))}")
+    report("ainvoke (full reply)", full)
+    report("stream (first token)", first_token)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--port", type=int, default=18001)
+    parser.add_argument("--stream", action="store_true", help="스트리밍 이벤트 순서와 첫 토큰 지연 측정")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""동기 세션 vs 비동기 세션 동시 처리량 벤치마크
+
+엔드포인트가 이벤트 루프 안에서 동기 SessionLocal 을 쓰면 쿼리마다 루프가 멈춰
+동시 요청이 직렬화된다. 같은 목록 쿼리를 두 경로로 동시에 실행해 처리량을 비교한다.
+SQLite 대체 DB는 네트워크 왕복이 없어 차이가 작게 나오므로 실제 수치는 MySQL에서 측정한다.
+
+사용법 (backend 디렉터리에서, SQLite 로 실행하려면 pip install -r requirements-dev.txt):
+    python -m benchmarks.concurrency_benchmark --requests 1000 --concurrency 50
+    DATABASE_URL=sqlite:///bench.db ASYNC_DATABASE_URL=sqlite+aiosqlite:///bench.db \\
+        python -m benchmarks.concurrency_benchmark --seed 10000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from database import SessionLocal, AsyncSessionLocal, async_engine, execute_with_retry, async_execute_with_retry
+from benchmarks.search_benchmark import seed
+
+LIST_QUERY = """SELECT fd.*, c.name as category_name
+    FROM financial_documents fd
+    LEFT JOIN categories c ON fd.category_id = c.id
+    WHERE fd.category_id = :category_id
+    ORDER BY fd.created_at DESC LIMIT 20"""
+
+
+async def sync_call(i):
+    session = SessionLocal()
+    try:
+        execute_with_retry(session, LIST_QUERY, {"category_id": i % 10 + 1}).fetchall()
+    finally:
+        session.close()
+
+
+async def async_call(i):
+    async with AsyncSessionLocal() as session:
+        (await async_execute_with_retry(session, LIST_QUERY, {"category_id": i % 10 + 1})).fetchall()
+
+
+async def run(label, call, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def worker(i):
+        async with semaphore:
+            started = time.perf_counter()
+            await call(i)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<8} {requests / elapsed:9.1f} req/s   p50 {statistics.median(latencies):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+async def main_async(args):
+    # 커넥션 풀 워밍업
+    await sync_call(0)
+    await async_call(0)
+    print(f"{args.requests} queries, concurrency {args.concurrency}\n")
+    await run("sync", sync_call, args.requests, args.concurrency)
+    await run("async", async_call, args.requests, args.concurrency)
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0, help="측정 전에 생성할 합성 문서 수")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
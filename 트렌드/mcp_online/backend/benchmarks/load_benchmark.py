@@ -0,0 +1,264 @@
+"""백엔드 API 부하 벤치마크
+
+시드된 로컬 DB(기본 SQLite)에 FastAPI 앱을 프로세스 안에서(ASGI) 띄우고 시나리오별로
+동시 요청을 보내 처리량과 p50/p95/p99 지연을 출력한다. --url 을 주면 이미 떠 있는 서버
+(예: docker compose 의 MySQL 백엔드)를 대상으로 같은 시나리오를 실행한다.
+
+시나리오: list, search, filter, deep_page, cursor, document, categories, pdf, pdf_range, pdf_revalidate
+/pdfs 시나리오는 /pdfs 에 쓸 수 있을 때만 합성 PDF(bench_*.pdf)를 만들어 실행하고 끝나면 지운다.
+앱의 읽기 캐시가 켜진 상태로 측정하며, --cold 를 주면 요청마다 캐시를 비운다.
+
+사용법 (backend 디렉터리에서, SQLite 로 실행하려면 pip install -r requirements-dev.txt):
+    python -m benchmarks.load_benchmark --rows 20000 --requests 500 --concurrency 20
+    python -m benchmarks.load_benchmark --scenarios search,deep_page --cold
+    python -m benchmarks.load_benchmark --url http://localhost:8000 --scenarios list,document
+"""
+import os
+import tempfile
+
+# database 모듈이 import 시점에 URL을 읽으므로 앱 import 전에 기본 DB를 정한다
+_DEFAULT_DB = os.path.join(tempfile.gettempdir(), "financial_library_load.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DEFAULT_DB}")
+os.environ.setdefault("ASYNC_DATABASE_URL", f"sqlite+aiosqlite:///{_DEFAULT_DB}")
+os.environ.setdefault("API_KEY", "offline-benchmark")
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+
+import httpx
+from sqlalchemy import func, insert, select
+
+from benchmarks.search_benchmark import QUERIES, WORDS, seed
+from cache import cache_stats, get_cache
+from database import Base, SessionLocal, engine
+from models import CategoryTable, FinancialDocumentTable
+from pagination import count_cache
+from tags import migrate
+
+CATEGORY_NAMES = ["금융정책", "은행업", "증권업", "보험업", "핀테크", "금융투자", "부동산금융", "기업금융", "소비자금융", "국제금융"]
+PDF_DIR = "/pdfs"
+PDF_SIZES_KB = (64, 1024, 8192)
+
+
+def seed_database(rows):
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        if not session.execute(select(func.count()).select_from(CategoryTable)).scalar():
+            session.execute(insert(CategoryTable), [
+                {"id": i + 1, "name": name, "description": f"{name} 관련 문서", "created_at": datetime.now()}
+                for i, name in enumerate(CATEGORY_NAMES)
+            ])
+            session.commit()
+        existing = session.execute(select(func.count()).select_from(FinancialDocumentTable)).scalar()
+        max_id = session.execute(select(func.max(FinancialDocumentTable.id))).scalar() or 0
+    finally:
+        session.close()
+    if existing < rows:
+        print(f"Seeding {rows - existing} synthetic documents ...")
+        seed(rows - existing)
+        max_id += rows - existing
+        # seed() 는 태그 색인을 채우지 않음
+        migrate()
+    return max(existing, rows), max_id
+
+
+def create_pdfs():
+    """/pdfs 에 크기별 합성 PDF 생성, 쓸 수 없으면 빈 목록"""
+    names = []
+    try:
+        os.makedirs(PDF_DIR, exist_ok=True)
+        for size_kb in PDF_SIZES_KB:
+            name = f"bench_{size_kb}kb.pdf"
+            with open(os.path.join(PDF_DIR, name), "wb") as f:
+                f.write(b"%PDF-1.4\n% financial library load benchmark\n")
+                f.write(os.urandom(size_kb * 1024))
+                f.write(b"\n%%EOF\n")
+            names.append(name)
+    except OSError as e:
+        print(f"  /pdfs 시나리오 건너뜀: {e}")
+        return []
+    return names
+
+
+def remove_pdfs(names):
+    for name in names:
+        try:
+            os.remove(os.path.join(PDF_DIR, name))
+        except OSError:
+            pass
+
+
+def build_scenarios(max_id, total_rows, pdfs, limit):
+    """시나리오 이름 -> (요청 번호, 난수) 를 받아 (경로, 헤더) 를 돌려주는 함수"""
+    deepest_page = max(total_rows // limit - 1, 1)
+    pdf_etags = {}
+
+    def pdf_headers(name):
+        return {"If-None-Match": pdf_etags[name]} if name in pdf_etags else {}
+
+    scenarios = {
+        "list": lambda i, rng: (f"/documents?limit={limit}&page={rng.randint(1, 5)}", {}),
+        "search": lambda i, rng: (f"/documents?query={rng.choice(QUERIES)}&limit={limit}", {}),
+        "filter": lambda i, rng: (
+            f"/documents?category_id={rng.randint(1, 10)}&is_featured={str(rng.random() < 0.5).lower()}"
+            f"&tags={rng.choice(WORDS)}&limit={limit}", {}),
+        "deep_page": lambda i, rng: (f"/documents?limit={limit}&page={rng.randint(deepest_page // 2, deepest_page)}", {}),
+        "cursor": None,
+        "document": lambda i, rng: (f"/documents/{rng.randint(1, max_id)}", {}),
+        "categories": lambda i, rng: ("/categories", {}),
+    }
+    if pdfs:
+        scenarios["pdf"] = lambda i, rng: (f"/pdfs/{pdfs[i % len(pdfs)]}", {})
+        scenarios["pdf_range"] = lambda i, rng: (f"/pdfs/{pdfs[-1]}", {"Range": f"bytes={rng.randrange(0, 1024 * 1024)}-{rng.randrange(1024 * 1024, 2 * 1024 * 1024)}"})
+        scenarios["pdf_revalidate"] = lambda i, rng: (f"/pdfs/{pdfs[i % len(pdfs)]}", pdf_headers(pdfs[i % len(pdfs)]))
+    return scenarios, pdf_etags
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def report(label, latencies, elapsed, errors, received):
+    latencies.sort()
+    print(f"{label:<15} {len(latencies) / elapsed:8.1f} req/s   p50 {percentile(latencies, 50):8.2f} ms   "
+          f"p95 {percentile(latencies, 95):8.2f} ms   p99 {percentile(latencies, 99):8.2f} ms   "
+          f"errors {errors:4d}   {received / len(latencies) / 1024:8.1f} KiB/req")
+
+
+def clear_caches():
+    for name in cache_stats():
+        get_cache(name).invalidate()
+    count_cache.invalidate()
+
+
+async def run_scenario(client, label, make_request, args, seed_value):
+    rng = random.Random(seed_value)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors, received = [], 0, 0
+
+    async def one(i):
+        nonlocal errors, received
+        path, headers = make_request(i, rng)
+        async with semaphore:
+            if args.cold:
+                clear_caches()
+            started = time.perf_counter()
+            resp = await client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+        received += len(resp.content)
+        if resp.status_code >= 400:
+            errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    report(label, latencies, time.perf_counter() - started, errors, received)
+
+
+async def run_cursor_walk(client, args):
+    """next_cursor 를 따라 --cursor-pages 만큼 연속 페이지를 읽는 클라이언트들"""
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors, received = [], 0, 0
+    walks = max(args.requests // args.cursor_pages, 1)
+
+    async def walk(i):
+        nonlocal errors, received
+        cursor = None
+        async with semaphore:
+            for _ in range(args.cursor_pages):
+                path = f"/documents?pagination=cursor&limit={args.limit}" + (f"&cursor={cursor}" if cursor else "")
+                if i % 2:
+                    path += f"&category_id={i % 10 + 1}"
+                started = time.perf_counter()
+                resp = await client.get(path)
+                latencies.append((time.perf_counter() - started) * 1000)
+                received += len(resp.content)
+                if resp.status_code >= 400:
+                    errors += 1
+                    return
+                cursor = resp.json().get("next_cursor")
+                if not cursor:
+                    return
+
+    started = time.perf_counter()
+    await asyncio.gather(*(walk(i) for i in range(walks)))
+    report("cursor", latencies, time.perf_counter() - started, errors, received)
+
+
+async def prime_etags(client, pdfs, pdf_etags):
+    for name in pdfs:
+        resp = await client.get(f"/pdfs/{name}")
+        if "etag" in resp.headers:
+            pdf_etags[name] = resp.headers["etag"]
+
+
+async def drive(client, args, max_id, total_rows, pdfs):
+    scenarios, pdf_etags = build_scenarios(max_id, total_rows, pdfs, args.limit)
+    selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+    unknown = [name for name in selected if name not in scenarios]
+    if unknown:
+        print(f"  사용할 수 없는 시나리오 건너뜀: {', '.join(unknown)}")
+    if "pdf_revalidate" in selected:
+        await prime_etags(client, pdfs, pdf_etags)
+
+    print(f"{total_rows} documents, {args.requests} requests/scenario, concurrency {args.concurrency}"
+          f"{', cold caches' if args.cold else ''}\n")
+    for index, name in enumerate(selected):
+        if name not in scenarios:
+            continue
+        if name == "cursor":
+            await run_cursor_walk(client, args)
+            continue
+        # 워밍업 요청은 집계하지 않음
+        await client.get(scenarios[name](0, random.Random(0))[0])
+        await run_scenario(client, name, scenarios[name], args, seed_value=index)
+
+
+async def main_async(args):
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=60.0) as client:
+            total = (await client.get("/documents?limit=1")).json()["total"]
+            await drive(client, args, max_id=max(total, 1), total_rows=total, pdfs=[])
+        return
+
+    import main as app_module
+
+    # 요청마다 찍히는 INFO 로그가 측정에 섞이지 않도록
+    logging.getLogger().setLevel(logging.WARNING)
+    total_rows, max_id = seed_database(args.rows)
+    pdfs = create_pdfs() if not args.scenarios or "pdf" in args.scenarios else []
+    transport = httpx.ASGITransport(app=app_module.app)
+    try:
+        async with app_module.app.router.lifespan_context(app_module.app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60.0) as client:
+                await drive(client, args, max_id, total_rows, pdfs)
+            if args.show_cache:
+                print(f"\ncache stats: {cache_stats()}")
+    finally:
+        remove_pdfs(pdfs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="DB에 최소 이만큼 문서가 있도록 시드")
+    parser.add_argument("--requests", type=int, default=500, help="시나리오별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20, help="/documents 페이지 크기")
+    parser.add_argument("--cursor-pages", type=int, default=10, help="cursor 시나리오에서 클라이언트당 넘길 페이지 수")
+    parser.add_argument("--scenarios", help="쉼표로 구분한 시나리오 목록 (기본: 전체)")
+    parser.add_argument("--cold", action="store_true", help="요청마다 앱 캐시를 비움")
+    parser.add_argument("--show-cache", action="store_true", help="끝난 뒤 캐시 적중률 출력")
+    parser.add_argument("--url", help="프로세스 안 앱 대신 이 주소의 서버를 측정")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""/documents 검색 벤치마크: LIKE vs FULLTEXT(ngram) vs 프로세스 내 역색인
+
+사용법 (backend 디렉터리에서):
+    python -m benchmarks.search_benchmark --rows 1000000
+    python -m benchmarks.search_benchmark --skip-seed --repeat 50
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+
+from database import SessionLocal, AsyncSessionLocal, Base, engine
+from models import FinancialDocumentTable
+from search import SearchIndex, to_boolean_query, fulltext_match_clause
+
+WORDS = [
+    "기준금리", "물가안정", "한국은행", "금리정책", "디지털화폐", "금융혁신", "은행실적", "순이익",
+    "비대면서비스", "그린본드", "코스피", "증권시장", "개인투자자", "보험료", "텔레매틱스", "연금보험",
+    "펀드시장", "대체투자", "사모펀드", "오픈뱅킹", "블록체인", "스마트계약", "주택담보대출", "부동산시장",
+    "스타트업", "벤처캐피털", "인수합병", "신용카드", "소상공인", "환율변동성", "외국인투자", "국제협력",
+]
+QUERIES = ["기준금리", "블록체인", "오픈뱅킹", "주택담보", "벤처캐피털", "환율", "ESG", "디지털 전환"]
+
+LIKE_QUERY = """SELECT fd.*, c.name as category_name
+    FROM financial_documents fd
+    LEFT JOIN categories c ON fd.category_id = c.id
+    WHERE (fd.title LIKE :search_term OR fd.content LIKE :search_term OR fd.summary LIKE :search_term)
+    ORDER BY fd.created_at DESC LIMIT 20"""
+
+FULLTEXT_QUERY = f"""SELECT fd.*, c.name as category_name, {fulltext_match_clause()} as relevance
+    FROM financial_documents fd
+    LEFT JOIN categories c ON fd.category_id = c.id
+    WHERE {fulltext_match_clause()}
+    ORDER BY relevance DESC, fd.created_at DESC LIMIT 20"""
+
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)) + "."
+
+
+def seed(rows, batch_size=5000, seed_value=42):
+    rng = random.Random(seed_value)
+    now = datetime.now()
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for start in range(0, rows, batch_size):
+            batch = []
+            for i in range(start, min(rows, start + batch_size)):
+                created = now - timedelta(minutes=i)
+                batch.append({
+                    "title": sentence(rng, 4),
+                    "content": " ".join(sentence(rng, 12) for _ in range(4)),
+                    "summary": sentence(rng, 10),
+                    "category_id": rng.randint(1, 10),
+                    "author": "benchmark",
+                    "source": "synthetic",
+                    "tags": ",".join(rng.sample(WORDS, 3)),
+                    "view_count": 0,
+                    "is_featured": rng.random() < 0.1,
+                    "created_at": created,
+                    "updated_at": created,
+                })
+            conn.execute(insert(FinancialDocumentTable), batch)
+            print(f"  seeded {start + len(batch)}/{rows}")
+
+
+async def fulltext_available(index):
+    async with AsyncSessionLocal() as session:
+        return await index.fulltext_available(session)
+
+
+def measure(label, func, repeat):
+    timings = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            started = time.perf_counter()
+            func(query)
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<22} mean {statistics.mean(timings):8.2f} ms   p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="생성할 합성 문서 수")
+    parser.add_argument("--skip-seed", action="store_true", help="데이터 생성을 건너뛰고 기존 데이터로 측정")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if not args.skip_seed:
+        print(f"Seeding {args.rows} synthetic documents ...")
+        seed(args.rows)
+
+    session = SessionLocal()
+    try:
+        total = session.execute(text("SELECT COUNT(*) FROM financial_documents")).scalar()
+        print(f"\nfinancial_documents: {total} rows, {len(QUERIES)} queries x {args.repeat}\n")
+
+        measure("LIKE '%q%'", lambda q: session.execute(text(LIKE_QUERY), {"search_term": f"%{q}%"}).fetchall(), args.repeat)
+
+        index = SearchIndex()
+        if asyncio.run(fulltext_available(index)):
+            measure("FULLTEXT ngram", lambda q: session.execute(text(FULLTEXT_QUERY), {"fulltext_query": to_boolean_query(q)}).fetchall(), args.repeat)
+        else:
+            print("FULLTEXT ngram         (인덱스 없음, 건너뜀)")
+
+        started = time.perf_counter()
+        index.refresh(session, force=True)
+        print(f"\nin-process index built in {time.perf_counter() - started:.2f}s ({len(index)} documents)")
+        measure("in-process index", lambda q: index.search(q), args.repeat)
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""태그 필터 벤치마크: fd.tags LIKE '%태그%' vs document_tags 색인
+
+같은 목록 쿼리(최신순 20건 + COUNT)를 두 방식으로 실행해 지연과 결과 수를 비교한다.
+LIKE 는 '금리' 로 '기준금리', '금리정책' 까지 잡는 부분 일치라 결과 수가 다르게 나올 수 있다.
+
+사용법 (backend 디렉터리에서):
+    python -m benchmarks.tag_benchmark --rows 100000
+    python -m benchmarks.tag_benchmark --skip-seed --repeat 20
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+
+from benchmarks.search_benchmark import seed
+from database import SessionLocal
+from tags import migrate, tag_facet_query, tag_filter_clause
+
+LIST_QUERY = """SELECT fd.*, c.name as category_name
+    FROM financial_documents fd
+    LEFT JOIN categories c ON fd.category_id = c.id
+    WHERE 1=1 AND {condition}"""
+
+CASES = [
+    ("single", ["기준금리"], "all"),
+    ("substring '금리'", ["금리"], "all"),
+    ("AND x2", ["블록체인", "스마트계약"], "all"),
+    ("OR x3", ["코스피", "증권시장", "개인투자자"], "any"),
+]
+
+
+def like_condition(tag_list, mode):
+    params = {f"like{i}": f"%{tag}%" for i, tag in enumerate(tag_list)}
+    joiner = " OR " if mode == "any" else " AND "
+    return "(" + joiner.join(f"fd.tags LIKE :{name}" for name in params) + ")", params
+
+
+def run(session, query, params):
+    count = session.execute(text(f"SELECT COUNT(*) FROM ({query}) as count_query"), params).scalar()
+    session.execute(text(f"{query} ORDER BY fd.created_at DESC LIMIT 20"), params).fetchall()
+    return count
+
+
+def measure(session, condition, params, repeat):
+    query = LIST_QUERY.format(condition=condition)
+    timings, count = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = run(session, query, params)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="생성할 합성 문서 수")
+    parser.add_argument("--skip-seed", action="store_true", help="데이터 생성을 건너뛰고 기존 데이터로 측정")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if not args.skip_seed:
+        print(f"Seeding {args.rows} synthetic documents ...")
+        seed(args.rows)
+
+    started = time.perf_counter()
+    rows = migrate()
+    print(f"\ndocument_tags migrated in {time.perf_counter() - started:.2f}s ({rows} rows)\n")
+
+    session = SessionLocal()
+    try:
+        print(f"{'case':<18} {'LIKE p50':>12} {'rows':>8}   {'index p50':>12} {'rows':>8}")
+        for label, tag_list, mode in CASES:
+            like_ms, like_count = measure(session, *like_condition(tag_list, mode), args.repeat)
+            index_ms, index_count = measure(session, *tag_filter_clause(tag_list, mode), args.repeat)
+            print(f"{label:<18} {like_ms:9.2f} ms {like_count:8d}   {index_ms:9.2f} ms {index_count:8d}")
+
+        condition, params = tag_filter_clause(["기준금리"])
+        started = time.perf_counter()
+        facets = session.execute(text(tag_facet_query(LIST_QUERY.format(condition=condition))), {**params, "facet_limit": 5}).fetchall()
+        print(f"\ntag facets for '기준금리' in {(time.perf_counter() - started) * 1000:.2f} ms: "
+              + ", ".join(f"{row.value}={row.count}" for row in facets))
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""프로세스 내 LRU + TTL 캐시 (backend, mcp_server 공용)
+
+docker-compose 가 서비스마다 자기 디렉터리만 빌드 컨텍스트로 쓰므로 공용 패키지를 둘 수 없어
+backend/cache.py 와 mcp_server/cache.py 에 같은 파일을 둔다. 고칠 때는 두 파일을 함께 고친다.
+"""
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+MISSING = object()
+
+
+class CacheBackend(ABC):
+    """캐시 저장소 인터페이스, Redis 등 외부 저장소로 교체할 때 구현한다"""
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Any:
+        """값이 없거나 만료되었으면 MISSING 반환"""
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, ttl: float):
+        ...
+
+    @abstractmethod
+    def delete(self, key: Hashable):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def __len__(self):
+        ...
+
+
+class LRUBackend(CacheBackend):
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Cache:
+    """이름 단위 read-through 캐시, 적중/실패 횟수를 집계한다"""
+
+    def __init__(self, name: str, ttl: float = 60.0, max_entries: int = 1024, backend: Optional[CacheBackend] = None):
+        self.name = name
+        self.ttl = ttl
+        self.backend = backend or LRUBackend(max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self.backend.get(key)
+        if value is MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self.backend.set(key, value, self.ttl if ttl is None else ttl)
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """캐시에 없으면 loader 결과를 저장 후 반환 (None은 저장하지 않음)"""
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = loader()
+            if value is not None:
+                self.set(key, value, ttl)
+        return value
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = await loader()
+            if value is not None:
+                self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, key: Hashable = MISSING):
+        """key를 지정하면 해당 항목만, 생략하면 전체를 비운다"""
+        if key is MISSING:
+            self.backend.clear()
+        else:
+            self.backend.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self.backend),
+            "ttl": self.ttl,
+        }
+        if isinstance(self.backend, LRUBackend):
+            stats["evictions"] = self.backend.evictions
+        return stats
+
+
+_caches: Dict[str, Cache] = {}
+
+
+def get_cache(name: str, ttl: float = 60.0, max_entries: int = 1024, backend: Optional[CacheBackend] = None) -> Cache:
+    """이름으로 캐시를 생성/조회 (같은 이름은 같은 인스턴스)"""
+    if name not in _caches:
+        _caches[name] = Cache(name, ttl=ttl, max_entries=max_entries, backend=backend)
+    return _caches[name]
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _caches.items()}
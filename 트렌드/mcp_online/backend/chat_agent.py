@@ -0,0 +1,121 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from langgraph.prebuilt import create_react_agent
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+logger = logging.getLogger(__name__)
+
+
+def tools_signature(tools) -> tuple:
+    """도구 이름/설명/인자 스키마로 도구 목록 변경 여부를 판단"""
+    return tuple(sorted(
+        (tool.name, tool.description or "", json.dumps(tool.args, sort_keys=True, default=str))
+        for tool in tools
+    ))
+
+
+class ChatAgent:
+    """MCP 클라이언트, 도구 목록, ReAct 에이전트를 한 번 만들어 요청 간에 재사용
+
+    도구 목록은 refresh_interval 마다 백그라운드에서 다시 조회하고,
+    실제로 바뀐 경우에만 에이전트를 다시 만든다.
+    """
+
+    def __init__(self, model, connections: Dict[str, Dict[str, Any]], system_prompt: str, refresh_interval: float = 60.0):
+        self.model = model
+        self.connections = connections
+        self.system_prompt = system_prompt
+        self.refresh_interval = refresh_interval
+        self.client: Optional[MultiServerMCPClient] = None
+        self.tools = []
+        self.agent = None
+        self.built_at = 0.0
+        self.rebuilds = 0
+        self._signature = None
+        self._lock = asyncio.Lock()
+        self._task = None
+
+    async def refresh(self, force: bool = False):
+        async with self._lock:
+            if self.client is None:
+                self.client = MultiServerMCPClient(self.connections)
+            tools = await self.client.get_tools()
+            signature = tools_signature(tools)
+            if not force and self.agent is not None and signature == self._signature:
+                return
+            self.tools = tools
+            self.agent = create_react_agent(self.model, tools, prompt=self.system_prompt)
+            self._signature = signature
+            self.built_at = time.time()
+            self.rebuilds += 1
+            logger.info(f"Chat agent built with {len(tools)} MCP tools")
+
+    async def get(self):
+        if self.agent is None:
+            await self.refresh()
+        return self.agent
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"MCP tool list refresh failed: {e}")
+
+    async def start(self):
+        # MCP 서버가 아직 떠 있지 않아도 기동은 계속하고, 첫 요청에서 다시 시도
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Chat agent initialisation deferred: {e}")
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def stream_chat_events(agent, messages, tool_results: Optional[list] = None):
+    """에이전트 실행 중 발생하는 토큰/도구 호출 이벤트를 순서대로 생성
+
+    {"type": "token", "content": ...}
+    {"type": "tool_start", "name": ..., "input": ...}
+    {"type": "tool_end", "name": ...}
+    {"type": "done", "reply": ...}
+    tool_results 를 넘기면 도구 호출(name, args, content)을 순서대로 담는다 (응답 캐시용)
+    """
+    reply_parts = []
+    async for event in agent.astream_events({"messages": messages}, version="v2"):
+        kind = event["event"]
+        if kind == "on_chat_model_start":
+            # ReAct 루프의 새 모델 호출마다 최종 답변 버퍼를 초기화
+            reply_parts = []
+        elif kind == "on_chat_model_stream":
+            content = event["data"]["chunk"].content
+            if isinstance(content, str) and content:
+                reply_parts.append(content)
+                yield {"type": "token", "content": content}
+        elif kind == "on_tool_start":
+            yield {"type": "tool_start", "name": event["name"], "input": event["data"].get("input")}
+        elif kind == "on_tool_end":
+            if tool_results is not None:
+                output = event["data"].get("output")
+                content = getattr(output, "content", output)
+                tool_results.append({
+                    "name": event["name"],
+                    "args": event["data"].get("input") or {},
+                    "content": content if isinstance(content, str) else json.dumps(content, ensure_ascii=False, sort_keys=True, default=str),
+                })
+            yield {"type": "tool_end", "name": event["name"]}
+    yield {"type": "done", "reply": "".join(reply_parts)}
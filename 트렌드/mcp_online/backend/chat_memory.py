@@ -0,0 +1,281 @@
+"""/chat 서버 측 대화 세션과 응답 캐시
+
+- ChatSession: 최근 메시지 창 + 창에서 밀려난 이전 대화의 요약
+  창이 window_messages 개나 window_chars 자를 넘으면 오래된 메시지를 요약에 접어
+  매 턴 모델에 보내는 대화 길이를 일정하게 유지한다.
+- ResponseCache: 정규화한 (요약, 최근 대화, 질문) 으로 이전 답변을 찾고, 그 답변을 만들 때
+  호출한 도구를 다시 실행해 결과가 같을 때만 모델 호출 없이 돌려준다.
+  읽기 전용 문서 조회 도구(CACHEABLE_TOOLS)만 쓴 답변만 저장한다.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import secrets
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from cache import MISSING, get_cache
+import metrics
+
+logger = logging.getLogger(__name__)
+
+CACHEABLE_TOOLS = frozenset({
+    "search_financial_documents",
+    "semantic_search_documents",
+    "get_financial_document_by_id",
+    "get_recent_documents",
+})
+SUMMARY_PROMPT = (
+    "다음은 금융정보도서관 어시스턴트와 사용자의 이전 대화입니다. "
+    "이후 대화에 필요한 사실, 사용자가 관심을 보인 문서/주제, 미해결 질문만 한국어로 간결하게 요약하세요."
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION_RE = re.compile(r"[\s?？!！.。~]+$")
+
+
+@dataclass
+class ChatSession:
+    session_id: str
+    messages: List[Tuple[str, str]] = field(default_factory=list)
+    summary: str = ""
+    turns: int = 0
+    updated_at: float = field(default_factory=time.time)
+    # 같은 세션의 동시 요청/요약을 직렬화
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "summary": self.summary,
+            "messages": [{"role": role, "content": content} for role, content in self.messages],
+            "turns": self.turns,
+            "updated_at": self.updated_at,
+        }
+
+
+def extractive_summary(previous: str, messages: Sequence[Tuple[str, str]], max_chars: int) -> str:
+    """모델 없이 만드는 요약: 이전 요약 + 메시지별 첫 문장 (오래된 쪽부터 잘라 max_chars 이내)"""
+    lines = [previous] if previous else []
+    for role, content in messages:
+        first = re.split(r"(?<=[.!?。])\s|\n", content.strip(), maxsplit=1)[0]
+        lines.append(f"{'사용자' if role == 'user' else '어시스턴트'}: {first[:200]}")
+    summary = "\n".join(lines)
+    return summary[-max_chars:] if len(summary) > max_chars else summary
+
+
+class SessionStore:
+    """TTL 이 있는 프로세스 내 세션 저장소 (조회할 때마다 만료 연장)
+
+    summarizer(previous_summary, messages) 는 창에서 밀려난 메시지를 접은 새 요약을 돌려주는
+    코루틴이고, 실패하면 extractive_summary 로 대신한다.
+    """
+
+    def __init__(self, ttl: float = 3600, max_sessions: int = 5000, window_messages: int = 12,
+                 window_chars: int = 8000, summary_chars: int = 1500,
+                 summarizer: Optional[Callable[[str, Sequence[Tuple[str, str]]], Awaitable[str]]] = None):
+        self.cache = get_cache("chat_sessions", ttl=ttl, max_entries=max_sessions)
+        self.window_messages = window_messages
+        self.window_chars = window_chars
+        self.summary_chars = summary_chars
+        self.summarizer = summarizer
+        self._compactions: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self.cache.backend)
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        session = self.cache.get(session_id)
+        if session is not None:
+            self.cache.set(session_id, session)
+        return session
+
+    def create(self, messages: Sequence[Tuple[str, str]] = ()) -> ChatSession:
+        session = ChatSession(secrets.token_urlsafe(16), list(messages))
+        self.cache.set(session.session_id, session)
+        self.schedule_compaction(session)
+        return session
+
+    def delete(self, session_id: str):
+        self.cache.invalidate(session_id)
+
+    def open(self, session_id: Optional[str], messages: Sequence[Tuple[str, str]]) -> Tuple[ChatSession, str]:
+        """(세션, 이번 질문) 반환
+
+        세션이 있으면 요청의 마지막 메시지만 질문으로 쓰고, 없거나 만료되었으면
+        요청에 담긴 이전 메시지로 새 세션을 만든다 (기존 클라이언트 호환).
+        """
+        if not messages:
+            raise ValueError("메시지가 없습니다")
+        question = messages[-1][1]
+        session = self.get(session_id) if session_id else None
+        if session is None:
+            session = self.create(messages[:-1])
+        return session, question
+
+    def record_turn(self, session: ChatSession, question: str, reply: str):
+        session.messages += [("user", question), ("assistant", reply)]
+        session.turns += 1
+        session.updated_at = time.time()
+        self.cache.set(session.session_id, session)
+        self.schedule_compaction(session)
+
+    def _overflow(self, session: ChatSession) -> int:
+        """창 크기를 넘어 요약으로 접어야 할 앞쪽 메시지 수 (user/assistant 짝 단위)"""
+        chars = 0
+        keep = 0
+        for role, content in reversed(session.messages):
+            chars += len(content)
+            if keep >= self.window_messages or (chars > self.window_chars and keep >= 2):
+                break
+            keep += 1
+        drop = len(session.messages) - keep
+        return drop + (drop % 2) if drop > 0 else 0
+
+    def schedule_compaction(self, session: ChatSession):
+        """창이 넘치면 오래된 메시지 절반을 백그라운드에서 요약에 접음 (다음 요청은 세션 락에서 대기)"""
+        if not self._overflow(session) or session.session_id in self._compactions:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self._compact(session))
+        except RuntimeError:
+            return
+        self._compactions[session.session_id] = task
+        task.add_done_callback(lambda _: self._compactions.pop(session.session_id, None))
+
+    async def _compact(self, session: ChatSession):
+        async with session.lock:
+            drop = self._overflow(session)
+            if not drop:
+                return
+            # 매번 요약하지 않도록 창의 절반 정도를 한꺼번에 접음
+            drop = min(len(session.messages) - 2, max(drop, self.window_messages // 4 * 2))
+            folded = session.messages[:drop]
+            method = "model"
+            try:
+                if self.summarizer is None:
+                    raise RuntimeError("summarizer not configured")
+                summary = await self.summarizer(session.summary, folded)
+            except Exception as e:
+                if self.summarizer is not None:
+                    logger.warning(f"Chat history summarisation failed, using extractive summary: {e}")
+                method = "extractive"
+                summary = extractive_summary(session.summary, folded, self.summary_chars)
+            session.summary = summary[:self.summary_chars]
+            session.messages = session.messages[drop:]
+            self.cache.set(session.session_id, session)
+            metrics.chat_history_compactions.inc(method=method)
+
+    async def wait_compactions(self):
+        if self._compactions:
+            await asyncio.gather(*self._compactions.values(), return_exceptions=True)
+
+
+def model_summarizer(model) -> Callable[[str, Sequence[Tuple[str, str]]], Awaitable[str]]:
+    """채팅 모델로 요약하는 SessionStore.summarizer"""
+    async def summarize(previous: str, messages: Sequence[Tuple[str, str]]) -> str:
+        transcript = "\n".join(f"{'사용자' if role == 'user' else '어시스턴트'}: {content}" for role, content in messages)
+        if previous:
+            transcript = f"[기존 요약]\n{previous}\n\n[이어진 대화]\n{transcript}"
+        response = await model.ainvoke([SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content=transcript)])
+        return response.content
+    return summarize
+
+
+def prompt_messages(session: ChatSession, question: str) -> List:
+    """모델에 보낼 메시지: (요약) + 최근 창 + 이번 질문"""
+    messages = []
+    if session.summary:
+        messages.append(SystemMessage(content=f"이전 대화 요약:\n{session.summary}"))
+    for role, content in session.messages:
+        messages.append(HumanMessage(content=content) if role == "user" else AIMessage(content=content))
+    messages.append(HumanMessage(content=question))
+    return messages
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    return _TRAILING_PUNCTUATION_RE.sub("", text)
+
+
+def prompt_key(session: ChatSession, question: str, agent_version: Any = None) -> str:
+    payload = [
+        str(agent_version),
+        normalize_text(session.summary),
+        [(role, normalize_text(content)) for role, content in session.messages],
+        normalize_text(question),
+    ]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode()).hexdigest()
+
+
+def _content_text(content: Any) -> str:
+    return content if isinstance(content, str) else json.dumps(content, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def tool_digest(tool_results: Sequence[Dict[str, Any]]) -> str:
+    payload = [(call["name"], json.dumps(call["args"], ensure_ascii=False, sort_keys=True, default=str), call["content"])
+               for call in tool_results]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode()).hexdigest()
+
+
+def extract_tool_results(messages: Sequence) -> List[Dict[str, Any]]:
+    """에이전트 실행 결과 메시지에서 도구 호출과 결과를 호출 순서대로"""
+    calls, outputs = [], {}
+    for message in messages:
+        if isinstance(message, AIMessage):
+            calls += [{"id": call["id"], "name": call["name"], "args": call["args"]} for call in message.tool_calls]
+        elif isinstance(message, ToolMessage):
+            outputs[message.tool_call_id] = _content_text(message.content)
+    return [{"name": call["name"], "args": call["args"], "content": outputs.get(call["id"], "")} for call in calls]
+
+
+class ResponseCache:
+    """(대화, 질문) 키 -> 답변 + 당시 도구 호출/결과 다이제스트"""
+
+    def __init__(self, ttl: float = 600, max_entries: int = 2048):
+        self.cache = get_cache("chat_responses", ttl=ttl, max_entries=max_entries)
+
+    async def lookup(self, key: str, tools: Sequence) -> Optional[str]:
+        entry = self.cache.get(key, MISSING)
+        if entry is MISSING:
+            metrics.chat_response_cache.inc(outcome="miss")
+            return None
+        if entry["tool_calls"]:
+            tools_by_name = {tool.name: tool for tool in tools}
+            try:
+                results = await asyncio.gather(*(
+                    tools_by_name[call["name"]].ainvoke(
+                        {"type": "tool_call", "id": f"cache_{i}", "name": call["name"], "args": call["args"]})
+                    for i, call in enumerate(entry["tool_calls"])
+                ))
+            except Exception as e:
+                # 도구가 사라졌거나 실패하면 모델을 거쳐 새로 답함
+                logger.info(f"Chat cache revalidation failed: {e}")
+                results = None
+            current = None if results is None else tool_digest([
+                {**call, "content": _content_text(getattr(result, "content", result))}
+                for call, result in zip(entry["tool_calls"], results)
+            ])
+            if current != entry["tool_digest"]:
+                metrics.chat_response_cache.inc(outcome="stale")
+                self.cache.invalidate(key)
+                return None
+        metrics.chat_response_cache.inc(outcome="hit")
+        return entry["reply"]
+
+    def store(self, key: str, tool_results: Sequence[Dict[str, Any]], reply: str):
+        if not reply or any(call["name"] not in CACHEABLE_TOOLS for call in tool_results):
+            metrics.chat_response_cache.inc(outcome="uncacheable")
+            return
+        self.cache.set(key, {
+            "reply": reply,
+            "tool_calls": [{"name": call["name"], "args": call["args"]} for call in tool_results],
+            "tool_digest": tool_digest(tool_results),
+        })
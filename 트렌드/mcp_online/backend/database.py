@@ -1,30 +1,133 @@
 from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError, DisconnectionError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import QueuePool
+from metrics import TimedQueuePool, TimedAsyncQueuePool, instrument_engine, record_retry
 import os
+import logging
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # SQLAlchemy 설정
-DATABASE_URL = f"mysql+pymysql://{os.getenv('DB_USER', 'financialuser')}:{os.getenv('DB_PASSWORD', 'financialpass')}@{os.getenv('DB_HOST', 'mysql')}:{os.getenv('DB_PORT', '3306')}/{os.getenv('DB_NAME', 'financial_library')}?charset=utf8mb4"
-
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={
-        "charset": "utf8mb4",
-        "autocommit": False,
-        "connect_timeout": 60,
-        "read_timeout": 60,
-        "write_timeout": 60,
-    },
-    poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,  # This will test connections before use
-    pool_recycle=3600,   # Recycle connections every hour
-    echo=False
-)
+_DB_LOCATION = f"{os.getenv('DB_USER', 'financialuser')}:{os.getenv('DB_PASSWORD', 'financialpass')}@{os.getenv('DB_HOST', 'mysql')}:{os.getenv('DB_PORT', '3306')}/{os.getenv('DB_NAME', 'financial_library')}?charset=utf8mb4"
+
+# DATABASE_URL / ASYNC_DATABASE_URL 로 덮어쓸 수 있음 (예: 테스트용 sqlite:///bench.db, sqlite+aiosqlite:///bench.db)
+# sqlite+aiosqlite 드라이버는 requirements-dev.txt 에 있음
+DATABASE_URL = os.getenv("DATABASE_URL", f"mysql+pymysql://{_DB_LOCATION}")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", f"mysql+aiomysql://{_DB_LOCATION}")
+
+
+def _is_sqlite(url):
+    return url.startswith("sqlite")
+
+
+if _is_sqlite(DATABASE_URL):
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False}, echo=False)
+else:
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={
+            "charset": "utf8mb4",
+            "autocommit": False,
+            "connect_timeout": 60,
+            "read_timeout": 60,
+            "write_timeout": 60,
+        },
+        poolclass=TimedQueuePool,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,  # This will test connections before use
+        pool_recycle=3600,   # Recycle connections every hour
+        echo=False
+    )
+
+if _is_sqlite(ASYNC_DATABASE_URL):
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+else:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args={
+            "charset": "utf8mb4",
+            "autocommit": False,
+            "connect_timeout": 60,
+        },
+        poolclass=TimedAsyncQueuePool,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        echo=False
+    )
+
+# 문장별 지연/행 수, 느린 쿼리 기록 (/metrics)
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
+
+
+def get_db():
+    db_session = SessionLocal()
+    try:
+        yield db_session
+    except (OperationalError, DisconnectionError) as e:
+        logger.error(f"Database connection error: {e}")
+        db_session.rollback()
+
+        db_session.close()
+        db_session = SessionLocal()
+        yield db_session
+    finally:
+        db_session.close()
+
+def execute_with_retry(session, query, params=None, max_retries=3):
+    for attempt in range(max_retries):
+        try:
+            if params:
+                result = session.execute(text(query), params)
+            else:
+                result = session.execute(text(query))
+            return result
+        except (OperationalError, DisconnectionError) as e:
+            logger.warning(f"Database query attempt {attempt + 1} failed: {e}")
+            if attempt == max_retries - 1:
+                record_retry("failed")
+                raise e
+            record_retry("retried")
+            session.rollback()
+            session.close()
+            session = SessionLocal()
+
+
+# 비동기 세션 (이벤트 루프를 막지 않음)
+async def get_async_db():
+    async with AsyncSessionLocal() as db_session:
+        try:
+            yield db_session
+        except (OperationalError, DisconnectionError) as e:
+            logger.error(f"Database connection error: {e}")
+            await db_session.rollback()
+            raise
+
+async def async_execute_with_retry(session, query, params=None, max_retries=3):
+    for attempt in range(max_retries):
+        try:
+            if params:
+                result = await session.execute(text(query), params)
+            else:
+                result = await session.execute(text(query))
+            return result
+        except (OperationalError, DisconnectionError) as e:
+            logger.warning(f"Database query attempt {attempt + 1} failed: {e}")
+            if attempt == max_retries - 1:
+                record_retry("failed")
+                raise e
+            record_retry("retried")
+            # 끊어진 커넥션은 rollback 시 풀에서 폐기되고, 다음 시도에서 새 커넥션을 받는다
+            await session.rollback()
@@ -0,0 +1,244 @@
+"""문서 대량 수집 (NDJSON / CSV)
+
+한 줄(행)씩 읽어 FinancialDocumentIngest 로 검증하고, 태그 정규화와 요약 생성을 거쳐
+batch_size 행씩 executemany(드라이버가 다중 행 INSERT 로 묶음)로 넣고 태그 색인(document_tags)도 채운다.
+commit_every 행마다 트랜잭션을 나눠 커밋하므로 중간에 실패해도 앞선 청크는 남는다.
+업로드가 끊기면(큐에 INGEST_ABORT) 아직 커밋하지 않은 행은 롤백하고 IngestAborted 로 알린다.
+
+사용법 (backend 디렉터리에서):
+    python -m ingest documents.ndjson
+    python -m ingest documents.csv --format csv --batch-size 2000
+"""
+import argparse
+import codecs
+import csv
+import json
+import queue
+import re
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+
+from database import engine
+from models import CategoryTable, FinancialDocumentIngest, FinancialDocumentTable
+from tags import index_documents, normalize_tags
+
+SUMMARY_MAX_CHARS = 200
+MAX_REPORTED_ERRORS = 100
+# iter_queue_lines 에 넣는 본문 중단 표시 (None 은 정상 종료)
+INGEST_ABORT = object()
+
+_SENTENCE_RE = re.compile(r".+?(?:[.!?。]|다\.|$)(?:\s+|$)", re.S)
+_TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+# VARCHAR 컬럼 길이 (초과 행이 배치 전체 INSERT 를 실패시키지 않도록 미리 거름)
+_STRING_LIMITS = {
+    column.name: column.type.length
+    for column in FinancialDocumentTable.__table__.columns
+    if getattr(column.type, "length", None)
+}
+
+
+class IngestAborted(Exception):
+    """본문이 끝나기 전에 업로드가 중단됨, report 는 중단 전까지 커밋된 결과"""
+
+    def __init__(self, report: Optional[Dict] = None):
+        super().__init__("upload aborted before the end of the body")
+        self.report = report
+
+
+def make_summary(content: str, max_chars: int = SUMMARY_MAX_CHARS) -> str:
+    """본문 앞 문장들을 max_chars 까지 이어 붙인 요약 (첫 문장이 길면 잘라서 말줄임)"""
+    text = " ".join(content.split())
+    summary = ""
+    for match in _SENTENCE_RE.finditer(text):
+        sentence = match.group(0).strip()
+        if not sentence:
+            continue
+        if len(summary) + len(sentence) + 1 > max_chars:
+            break
+        summary = f"{summary} {sentence}".strip()
+    if not summary:
+        summary = text[:max_chars - 1].rstrip() + "…" if len(text) > max_chars else text
+    return summary
+
+
+def iter_ndjson(lines: Iterable[str]) -> Iterator[Tuple[int, Union[Dict, Exception]]]:
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+            continue
+        yield line_no, record if isinstance(record, dict) else ValueError("JSON 객체가 아닙니다")
+
+
+def iter_csv(lines: Iterable[str]) -> Iterator[Tuple[int, Union[Dict, Exception]]]:
+    reader = csv.DictReader(lines)
+    for record in reader:
+        # 빈 칸은 모델 기본값을 쓰도록 키를 뺌
+        record = {key: value for key, value in record.items() if key and value not in ("", None)}
+        if record.get("is_featured") is not None:
+            record["is_featured"] = str(record["is_featured"]).strip().lower() in _TRUE_VALUES
+        yield reader.line_num, record
+
+
+def describe_error(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in error.errors())
+    return str(error) or type(error).__name__
+
+
+def prepare_row(record: Dict, valid_categories: set, now: datetime) -> Dict:
+    """검증 + 정규화된 INSERT 용 dict, 잘못된 행은 ValueError/ValidationError"""
+    record = dict(record)
+    record["tags"] = normalize_tags(record.get("tags"))
+    document = FinancialDocumentIngest.model_validate(record)
+    if not document.title.strip() or not document.content.strip():
+        raise ValueError("title/content 가 비어 있습니다")
+    for column, max_length in _STRING_LIMITS.items():
+        value = getattr(document, column)
+        if value is not None and len(value) > max_length:
+            raise ValueError(f"{column} 길이가 {max_length}자를 넘습니다")
+    if document.category_id is not None and document.category_id not in valid_categories:
+        raise ValueError(f"존재하지 않는 category_id {document.category_id}")
+    row = document.model_dump()
+    row["summary"] = (document.summary or "").strip() or make_summary(document.content)
+    row["view_count"] = 0
+    row["created_at"] = now
+    row["updated_at"] = now
+    return row
+
+
+def ingest(lines: Iterable[str], fmt: str = "ndjson", batch_size: int = 1000, commit_every: int = 10000) -> Dict:
+    """lines 를 읽어 문서를 넣고 IngestReport 형태의 dict 반환"""
+    records = iter_csv(lines) if fmt == "csv" else iter_ndjson(lines)
+    with engine.connect() as conn:
+        valid_categories = set(conn.execute(select(CategoryTable.id)).scalars())
+
+    started = time.perf_counter()
+    inserted, rejected, errors = 0, 0, []
+    batch: List[Dict] = []
+    in_transaction = 0
+    statement = insert(FinancialDocumentTable)
+    now = datetime.now()
+
+    conn = engine.connect()
+    transaction = conn.begin()
+    try:
+        # 이번에 넣은 문서부터 태그 색인에 추가
+        indexed_up_to = conn.execute(select(func.max(FinancialDocumentTable.id))).scalar() or 0
+        for line_no, record in records:
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                batch.append(prepare_row(record, valid_categories, now))
+            except (ValueError, ValidationError) as e:
+                rejected += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line_no, "error": describe_error(e)})
+                continue
+
+            if len(batch) >= batch_size:
+                conn.execute(statement, batch)
+                indexed_up_to = index_documents(conn, indexed_up_to)
+                inserted += len(batch)
+                in_transaction += len(batch)
+                batch = []
+                if in_transaction >= commit_every:
+                    transaction.commit()
+                    transaction = conn.begin()
+                    in_transaction = 0
+                    now = datetime.now()
+        if batch:
+            conn.execute(statement, batch)
+            index_documents(conn, indexed_up_to)
+            inserted += len(batch)
+        transaction.commit()
+    except IngestAborted as e:
+        transaction.rollback()
+        # 마지막 커밋까지 들어간 행만 보고
+        e.report = _report(inserted - in_transaction, rejected, errors, started)
+        raise
+    except Exception:
+        transaction.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return _report(inserted, rejected, errors, started)
+
+
+def _report(inserted: int, rejected: int, errors: List[Dict], started: float) -> Dict:
+    elapsed = time.perf_counter() - started
+    return {
+        "inserted": inserted,
+        "rejected": rejected,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(inserted / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def iter_queue_lines(chunks: "queue.Queue[Optional[bytes]]") -> Iterator[str]:
+    """요청 본문 바이트 청크(None 이 끝)를 줄 단위 문자열로 (줄바꿈 포함, BOM 제거)
+
+    INGEST_ABORT 를 받으면 마지막 줄을 버리고 IngestAborted 를 던진다.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    for chunk in iter(chunks.get, None):
+        if chunk is INGEST_ABORT:
+            raise IngestAborted()
+        # splitlines 는 JSON 문자열 안의 U+2028 등에서도 끊으므로 \n 으로만 나눔
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def ingest_from_queue(chunks: "queue.Queue[Optional[bytes]]", fmt: str, batch_size: int, commit_every: int) -> Dict:
+    """워커 스레드용: 실패해도 큐를 끝까지 비워 본문을 넣는 쪽이 막히지 않게 함"""
+    lines = iter_queue_lines(chunks)
+    try:
+        return ingest(lines, fmt, batch_size, commit_every)
+    finally:
+        try:
+            for _ in lines:
+                pass
+        except IngestAborted:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="입력 파일 (- 이면 표준입력)")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="기본: 확장자로 판단")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--commit-every", type=int, default=10000)
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    source = sys.stdin if args.path == "-" else open(args.path, "r", encoding="utf-8-sig", newline="")
+    try:
+        report = ingest(source, fmt, args.batch_size, args.commit_every)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    print(f"inserted {report['inserted']} rows, rejected {report['rejected']} "
+          f"in {report['elapsed_seconds']}s ({report['rows_per_second']} rows/s)")
+    for error in report["errors"]:
+        print(f"  line {error['line']}: {error['error']}")
+    # 실행 중인 API 서버의 캐시는 TTL(목록 30초) 이후 반영됨
+
+
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,262 @@
-from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, Response, PlainTextResponse
 from typing import List, Optional
 import os
 import pathlib
-from database import SessionLocal, Base, engine
+from database import SessionLocal, AsyncSessionLocal, Base, async_engine, get_async_db, async_execute_with_retry
 from contextlib import asynccontextmanager
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from sqlalchemy.exc import OperationalError, DisconnectionError
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import *
-from langgraph.prebuilt import create_react_agent
-from langchain_core.messages import HumanMessage, AIMessage
+from search import search_index, to_boolean_query, fulltext_match_clause, id_in_clause
+from pagination import count_cache, encode_cursor, decode_cursor, cursor_key, KEYSET_CLAUSE, KEYSET_ORDER
+from view_counter import view_counter
+from cache import get_cache, cache_stats
 from langchain_openai import ChatOpenAI
-from langchain_mcp_adapters.client import MultiServerMCPClient
+from chat_agent import ChatAgent, stream_chat_events
+from chat_memory import SessionStore, ResponseCache, model_summarizer, prompt_messages, prompt_key, extract_tool_results
+from ingest import ingest_from_queue, IngestAborted, INGEST_ABORT
+from starlette.requests import ClientDisconnect
+from tags import split_tags, tag_filter_clause, tag_facet_query, ensure_tag_index, sync_tag_index
+from pdf_files import stat_file, sniff_mime, validator_headers, etag_matches, parse_range, iter_file_range, RangeNotSatisfiable
+import asyncio
+import hmac
+from collections import Counter
+import json
+import queue
 import logging
 import re
-import magic
+import time
+import metrics
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+document_cache = get_cache("documents", ttl=60, max_entries=2048)
+document_list_cache = get_cache("document_lists", ttl=30, max_entries=512)
+category_cache = get_cache("categories", ttl=600, max_entries=1)
+facet_cache = get_cache("facets", ttl=30, max_entries=512)
 
 
-def get_db():
-    db_session = SessionLocal()
+def invalidate_document_lists():
+    # 새 문서가 추가되면 목록/개수 캐시만 비운다 (개별 문서 캐시는 그대로 유효)
+    document_list_cache.invalidate()
+    facet_cache.invalidate()
+    count_cache.invalidate()
+
+def on_view_counts_flushed(document_ids):
+    # 반영된 조회수가 다시 읽히도록 문서 캐시만 비운다
+    for document_id in document_ids:
+        document_cache.invalidate(document_id)
+
+
+org = os.getenv("ORG")
+api_key = os.getenv("API_KEY")
+model = ChatOpenAI(
+    organization=org,
+    api_key=api_key,
+    model="gpt-4.1-mini"
+)
+
+SYSTEM_PROMPT = """
+당신은 금융정보도서관의 전문 AI 어시스턴트입니다.
+
+사용자가 요구하는 기능을 MCP 서버를 사용하여 처리합니다.
+
+다음과 같은 금융 분야에 대해 전문적이고 정확한 정보를 제공해주세요:
+- 금융정책 (한국은행, 금융위원회 정책)
+- 은행업 (예금, 대출, 금융상품)  
+- 증권업 (주식, 채권, 투자)
+- 보험업 (생명보험, 손해보험)
+- 핀테크 (디지털금융, 간편결제)
+- 금융투자 (펀드, 파생상품)
+- 부동산금융 (주택담보대출, 부동산투자)
+- 기업금융 (기업대출, M&A)
+- 소비자금융 (신용카드, 개인대출)
+- 국제금융 (외환, 환율)
+
+
+"""
+
+MCP_CONNECTIONS = {
+    "paperlibrary": {
+        "url": "http://mcp_server:8001/mcp/",
+        "transport": "streamable_http",
+    }
+}
+
+chat_agent = ChatAgent(model, MCP_CONNECTIONS, SYSTEM_PROMPT)
+chat_sessions = SessionStore(
+    ttl=int(os.getenv("CHAT_SESSION_TTL", "3600")),
+    window_messages=int(os.getenv("CHAT_WINDOW_MESSAGES", "12")),
+    window_chars=int(os.getenv("CHAT_WINDOW_CHARS", "8000")),
+    summarizer=model_summarizer(model),
+)
+chat_response_cache = ResponseCache(ttl=int(os.getenv("CHAT_CACHE_TTL", "600")))
+metrics.registry.gauge("chat_sessions", "Server-side chat sessions held in memory", lambda: [({}, len(chat_sessions))])
+
+
+async def count_documents(count_query, params):
+    async with AsyncSessionLocal() as session:
+        row = (await async_execute_with_retry(session, count_query, params)).fetchone()
+        return row.total if row else 0
+
+SUPPORTED_FACETS = ("category", "is_featured", "tags")
+FACET_LIMIT = 20
+
+def group_facets(grouped, names):
+    """((category_id, category_name, is_featured), 개수) 묶음으로 category/is_featured facet 구성"""
+    facets, by_category, by_featured = {}, {}, {}
+    for (category_id, category_name, is_featured), count in grouped:
+        key = (category_id, category_name)
+        by_category[key] = by_category.get(key, 0) + count
+        featured = "true" if is_featured else "false"
+        by_featured[featured] = by_featured.get(featured, 0) + count
+    if "category" in names:
+        facets["category"] = sorted(
+            ({"id": category_id, "value": name or "미분류", "count": count} for (category_id, name), count in by_category.items()),
+            key=lambda facet: -facet["count"]
+        )
+    if "is_featured" in names:
+        facets["is_featured"] = [{"value": value, "count": count} for value, count in sorted(by_featured.items(), key=lambda item: -item[1])]
+    return facets
+
+async def load_facets(matched_query, params, names):
+    """현재 조건에 맞는 문서의 facet 개수와 전체 개수(category/is_featured 요청 시)
+
+    카테고리와 추천 여부는 (category_id, is_featured) GROUP BY 한 번으로 함께 구하고,
+    그 합계를 total 로 써서 별도 COUNT(*) 를 생략한다.
+    """
+    facets, total = {}, None
+    async with AsyncSessionLocal() as session:
+        if "category" in names or "is_featured" in names:
+            grouped_query = (f"SELECT m.category_id, m.category_name, m.is_featured, COUNT(*) AS count "
+                             f"FROM ({matched_query}) AS m GROUP BY m.category_id, m.category_name, m.is_featured")
+            rows = (await async_execute_with_retry(session, grouped_query, params)).fetchall()
+            total = sum(row.count for row in rows)
+            facets.update(group_facets([((row.category_id, row.category_name, row.is_featured), row.count) for row in rows], names))
+        if "tags" in names:
+            result = await async_execute_with_retry(session, tag_facet_query(matched_query), {**params, "facet_limit": FACET_LIMIT})
+            facets["tags"] = [{"value": row.value, "count": row.count} for row in result.fetchall()]
+    return {"facets": facets, "total": total}
+
+async def compute_facets(matched_query, params, names):
+    cache_key = (matched_query, tuple(sorted(params.items())), tuple(sorted(names)))
+    return await facet_cache.get_or_load(cache_key, lambda: load_facets(matched_query, params, names))
+
+# 역색인 검색 결과 id 를 IN 절로 나눠 조회하는 크기 (SQLite 기본 바인드 변수 한도 999 아래)
+RANKED_ID_CHUNK = 900
+# 결과가 이보다 많으면 id 를 바인딩하지 않고 필터 결과를 한 번 훑어 교집합을 구함
+RANKED_SCAN_THRESHOLD = 20 * RANKED_ID_CHUNK
+
+async def load_ranked_matches(session, filter_query, filter_params, ranked_ids):
+    """역색인 검색 결과 중 필터를 통과한 문서의 {id: (id, created_at, category_id, category_name, is_featured)}
+
+    검색 결과 전체를 하나의 IN 목록으로 바인딩하지 않는다.
+    """
+    columns = "m.id, m.created_at, m.category_id, m.category_name, m.is_featured"
+    if len(ranked_ids) > RANKED_SCAN_THRESHOLD:
+        wanted = set(ranked_ids)
+        result = await async_execute_with_retry(session, f"SELECT {columns} FROM ({filter_query}) AS m", filter_params)
+        return {row.id: row for row in result.fetchall() if row.id in wanted}
+    matched = {}
+    for start in range(0, len(ranked_ids), RANKED_ID_CHUNK):
+        id_clause, id_params = id_in_clause(ranked_ids[start:start + RANKED_ID_CHUNK])
+        result = await async_execute_with_retry(session, f"SELECT {columns} FROM ({filter_query} AND {id_clause}) AS m",
+                                                {**filter_params, **id_params})
+        matched.update((row.id, row) for row in result.fetchall())
+    return matched
+
+async def load_ranked_facets(session, matched, names):
+    """load_ranked_matches 결과로 facet 계산 (category/is_featured 는 메모리에서, tags 는 id 묶음별 GROUP BY 합산)"""
+    facets = group_facets(Counter((row.category_id, row.category_name, row.is_featured) for row in matched.values()).items(), names)
+    if "tags" in names:
+        tag_counts = Counter()
+        doc_ids = list(matched)
+        if len(doc_ids) > RANKED_SCAN_THRESHOLD:
+            result = await async_execute_with_retry(session, "SELECT dt.document_id, dt.tag FROM document_tags dt")
+            tag_counts.update(row.tag for row in result.fetchall() if row.document_id in matched)
+        else:
+            for start in range(0, len(doc_ids), RANKED_ID_CHUNK):
+                id_clause, id_params = id_in_clause(doc_ids[start:start + RANKED_ID_CHUNK], column="dt.document_id")
+                result = await async_execute_with_retry(
+                    session, f"SELECT dt.tag AS value, COUNT(*) AS count FROM document_tags dt WHERE {id_clause} GROUP BY dt.tag", id_params)
+                tag_counts.update({row.value: row.count for row in result.fetchall()})
+        top_tags = sorted(tag_counts.items(), key=lambda item: (-item[1], item[0]))[:FACET_LIMIT]
+        facets["tags"] = [{"value": tag, "count": count} for tag, count in top_tags]
+    return facets
+
+def refresh_search_index():
+    # 역색인 구성은 CPU 작업이므로 스레드에서 동기 세션으로 수행
+    session = SessionLocal()
     try:
-        yield db_session
-    except (OperationalError, DisconnectionError) as e:
-        logger.error(f"Database connection error: {e}")
-        db_session.rollback()
-
-        db_session.close()
-        db_session = SessionLocal()
-        yield db_session
+        return search_index.refresh(session)
     finally:
-        db_session.close()
+        session.close()
+
+# 쓰기 경로가 set() 하면 주기를 기다리지 않고 바로 역색인에 반영
+search_index_stale = asyncio.Event()
 
-def execute_with_retry(session, query, params=None, max_retries=3):
-    for attempt in range(max_retries):
+async def search_index_loop():
+    """FULLTEXT 인덱스가 없을 때만 역색인을 백그라운드에서 구성/갱신 (요청 경로에서는 갱신하지 않음)"""
+    async with AsyncSessionLocal() as session:
+        if await search_index.fulltext_available(session):
+            return
+    while True:
+        search_index_stale.clear()
         try:
-            if params:
-                result = session.execute(text(query), params)
-            else:
-                result = session.execute(text(query))
-            return result
-        except (OperationalError, DisconnectionError) as e:
-            logger.warning(f"Database query attempt {attempt + 1} failed: {e}")
-            if attempt == max_retries - 1:
-                raise e
-            session.rollback()
-            session.close()
-            session = SessionLocal()
+            await asyncio.to_thread(refresh_search_index)
+        except Exception as e:
+            logger.error(f"Error refreshing search index: {e}")
+        try:
+            await asyncio.wait_for(search_index_stale.wait(), search_index.refresh_interval)
+        except asyncio.TimeoutError:
+            pass
+
+# document_tags 를 tags 컬럼과 맞추는 주기(초), 대량 등록 외의 경로로 바뀐 태그를 반영
+TAG_SYNC_INTERVAL = float(os.getenv("TAG_SYNC_INTERVAL", "60"))
+
+async def tag_index_loop():
+    """수정 시각 기준으로 바뀐 문서의 태그 색인을 다시 맞추고, 고친 것이 있으면 목록/facet 캐시를 비움"""
+    since = None
+    while True:
+        try:
+            fixed, since = await asyncio.to_thread(sync_tag_index, since)
+            if fixed:
+                logger.info(f"Tag index re-synced for {fixed} documents")
+                invalidate_document_lists()
+        except Exception as e:
+            logger.error(f"Error syncing tag index: {e}")
+        await asyncio.sleep(TAG_SYNC_INTERVAL)
+
+async def cancel_task(task):
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    Base.metadata.create_all(bind=engine)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await asyncio.to_thread(ensure_tag_index)
+    view_counter.on_flush.append(on_view_counts_flushed)
+    view_counter.start()
+    await chat_agent.start()
+    search_index_task = asyncio.create_task(search_index_loop())
+    tag_index_task = asyncio.create_task(tag_index_loop())
     yield
+    await cancel_task(tag_index_task)
+    await cancel_task(search_index_task)
+    # 진행 중인 대화 요약은 채팅 모델을 쓰므로 에이전트를 멈추기 전에 마무리 (오래 걸리면 취소)
+    try:
+        await asyncio.wait_for(chat_sessions.wait_compactions(), timeout=10)
+    except asyncio.TimeoutError:
+        logger.warning("Chat compactions did not finish before shutdown")
+    await chat_agent.stop()
+    await view_counter.stop()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="Financial Library API",
@@ -74,6 +274,21 @@ async def add_charset_middleware(request, call_next):
         response.headers["content-type"] = "application/json; charset=utf-8"
     return response
 
+@app.middleware("http")
+async def record_request_metrics(request, call_next):
+    # 스트리밍 응답은 헤더를 보낼 때까지의 시간만 기록됨
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.http_request_duration.observe(
+            time.perf_counter() - started,
+            method=request.method, route=metrics.route_label(request), status=str(status)
+        )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:80", "http://10.1.1.80", "http://10.1.1.80:80"],
@@ -83,10 +298,13 @@ app.add_middleware(
 )
 
 @app.get("/categories", response_model=List[Category])
-async def get_categories(session: Session = Depends(get_db)):
+async def get_categories(session: AsyncSession = Depends(get_async_db)):
     try:
-        result = execute_with_retry(session, "SELECT * FROM categories ORDER BY name")
-        categories = [{"id": row.id, "name": row.name, "description": row.description, "created_at": row.created_at} for row in result.fetchall()]
+        categories = category_cache.get("all")
+        if categories is None:
+            result = await async_execute_with_retry(session, "SELECT * FROM categories ORDER BY name")
+            categories = [{"id": row.id, "name": row.name, "description": row.description, "created_at": row.created_at} for row in result.fetchall()]
+            category_cache.set("all", categories)
         return categories
     except Exception as e:
         logger.error(f"Error getting categories: {e}")
@@ -97,13 +315,26 @@ async def get_documents(
     query: Optional[str] = Query(None),
     category_id: Optional[str] = Query(None),
     tags: Optional[str] = Query(None),
+    tag_mode: str = Query("all", pattern="^(all|any)$"),
     is_featured: Optional[str] = Query(None),
+    facets: Optional[str] = Query(None),
+    search_mode: Optional[str] = Query(None),
+    pagination: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    session: Session = Depends(get_db)
+    session: AsyncSession = Depends(get_async_db)
 ):
     offset = (page - 1) * limit
     
+    cursor_mode = pagination == "cursor" or bool(cursor)
+    cursor_position = None
+    if cursor:
+        try:
+            cursor_position = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="유효하지 않은 커서입니다")
+    
     if category_id == "":
         category_id = None
     elif category_id is not None:
@@ -117,38 +348,41 @@ async def get_documents(
     elif is_featured is not None:
         is_featured = is_featured.lower() in ('true', '1', 'yes', 'on')
     
-    base_query = """
-        SELECT fd.*, c.name as category_name 
-        FROM financial_documents fd 
-        LEFT JOIN categories c ON fd.category_id = c.id
-        WHERE 1=1
-    """
-    params = []
-    
-    if query:
-        base_query += " AND (fd.title LIKE %s OR fd.content LIKE %s OR fd.summary LIKE %s)"
-        search_term = f"%{query}%"
-        params.extend([search_term, search_term, search_term])
+    # 쉼표로 구분한 태그는 태그 단위로 일치 (tag_mode=all: 모두 포함, any: 하나 이상)
+    tag_list = split_tags(tags)
+    requested_facets = [name for name in (facets or "").split(",") if name in SUPPORTED_FACETS]
     
-    if category_id:
-        base_query += " AND fd.category_id = %s"
-        params.append(category_id)
-    
-    if tags:
-        base_query += " AND fd.tags LIKE %s"
-        params.append(f"%{tags}%")
-    
-    if is_featured is not None:
-        base_query += " AND fd.is_featured = %s"
-        params.append(is_featured)
+    # 검색어가 없는 목록(최신/추천 문서 등)은 짧은 TTL로 캐시
+    list_cache_key = None
+    if not query:
+        list_cache_key = (category_id, tuple(tag_list), tag_mode, is_featured, tuple(requested_facets), cursor_mode, cursor, page, limit)
+        cached_response = document_list_cache.get(list_cache_key)
+        if cached_response is not None:
+            return cached_response
     
     sql_params = {}
     sql_base_query = """SELECT fd.*, c.name as category_name 
         FROM financial_documents fd 
         LEFT JOIN categories c ON fd.category_id = c.id
         WHERE 1=1"""
+    order_by = "fd.created_at DESC"
+    ranked_ids = None
+    
+    fulltext_query = to_boolean_query(query) if query and search_mode == "fulltext" else None
+    if fulltext_query and await search_index.fulltext_available(session):
+        match_clause = fulltext_match_clause()
+        sql_base_query = sql_base_query.replace("SELECT fd.*,", f"SELECT fd.*, {match_clause} as relevance,", 1)
+        sql_base_query += f" AND {match_clause}"
+        sql_params["fulltext_query"] = fulltext_query
+        order_by = "relevance DESC, fd.created_at DESC"
+    elif fulltext_query and search_index.ready:
+        # 역색인이 아직 구성 전이면 아래 LIKE 검색으로 처리
+        try:
+            ranked_ids = [doc_id for doc_id, _ in search_index.search(query)]
+        except Exception as e:
+            logger.error(f"Error searching in-process index: {e}")
     
-    if query:
+    if ranked_ids is None and query:
         sql_base_query += " AND (fd.title LIKE :search_term OR fd.content LIKE :search_term OR fd.summary LIKE :search_term)"
         sql_params["search_term"] = f"%{query}%"
     
@@ -156,131 +390,287 @@ async def get_documents(
         sql_base_query += " AND fd.category_id = :category_id"
         sql_params["category_id"] = category_id
     
-    if tags:
-        sql_base_query += " AND fd.tags LIKE :tags"
-        sql_params["tags"] = f"%{tags}%"
+    if tag_list:
+        tag_clause, tag_params = tag_filter_clause(tag_list, tag_mode)
+        sql_base_query += f" AND {tag_clause}"
+        sql_params.update(tag_params)
     
     if is_featured is not None:
         sql_base_query += " AND fd.is_featured = :is_featured"
         sql_params["is_featured"] = is_featured
     
+    if ranked_ids is not None:
+        # 역색인 검색: 검색 결과 중 필터를 통과한 문서를 구한 뒤 관련도(커서 모드는 생성 시각) 순서로 페이지만 자른다
+        facet_counts, next_cursor = None, None
+        try:
+            matched = await load_ranked_matches(session, sql_base_query, sql_params, ranked_ids)
+            if cursor_mode:
+                ordered = sorted(matched.values(), key=lambda row: cursor_key(row.created_at, row.id), reverse=True)
+                if cursor_position:
+                    ordered = [row for row in ordered if cursor_key(row.created_at, row.id) < cursor_position]
+                page_ids = [row.id for row in ordered[:limit + 1]]
+            else:
+                ordered_ids = [doc_id for doc_id in ranked_ids if doc_id in matched]
+                page_ids = ordered_ids[offset:offset + limit]
+            total = len(matched)
+            documents = []
+            if page_ids:
+                id_clause, id_params = id_in_clause(page_ids, prefix="page_id")
+                result = await async_execute_with_retry(session, f"{sql_base_query} AND {id_clause}", {**sql_params, **id_params})
+                rows = {row.id: dict(row._mapping) for row in result.fetchall()}
+                documents = [rows[doc_id] for doc_id in page_ids if doc_id in rows]
+            if cursor_mode and len(documents) > limit:
+                documents = documents[:limit]
+                next_cursor = encode_cursor(documents[-1]["created_at"], documents[-1]["id"])
+            if requested_facets:
+                facet_counts = await load_ranked_facets(session, matched, requested_facets)
+        except Exception as e:
+            logger.error(f"Error executing search query: {e}")
+            total = 0
+            documents = []
+        return DocumentListResponse(
+            documents=documents,
+            total=total,
+            page=page,
+            limit=limit,
+            total_pages=(total + limit - 1) // limit if total > 0 else 0,
+            next_cursor=next_cursor,
+            facets=facet_counts
+        )
+    
+    facet_counts, facet_total = None, None
+    if requested_facets:
+        try:
+            facet_result = await compute_facets(sql_base_query, sql_params, requested_facets)
+            facet_counts, facet_total = facet_result["facets"], facet_result["total"]
+        except Exception as e:
+            logger.error(f"Error computing facets: {e}")
+    
     count_query = f"SELECT COUNT(*) as total FROM ({sql_base_query}) as count_query"
+    count_params = dict(sql_params)
     try:
-        total_result = execute_with_retry(session, count_query, sql_params)
-        total_row = total_result.fetchone()
-        total = total_row.total if total_row else 0
+        if facet_total is not None:
+            total = facet_total
+        else:
+            total = await count_cache.get(
+                count_query, count_params,
+                lambda: count_documents(count_query, count_params)
+            )
     except Exception as e:
         logger.error(f"Error executing count query: {e}")
         total = 0
     
-    sql_base_query += " ORDER BY fd.created_at DESC LIMIT :limit OFFSET :offset"
-    sql_params.update({"limit": limit, "offset": offset})
+    next_cursor = None
+    if cursor_mode:
+        if cursor_position:
+            sql_base_query += f" AND {KEYSET_CLAUSE}"
+            sql_params["cursor_created_at"], sql_params["cursor_id"] = cursor_position
+        # 다음 페이지 존재 여부를 확인하기 위해 한 건 더 조회
+        sql_base_query += f" ORDER BY {KEYSET_ORDER} LIMIT :limit"
+        sql_params["limit"] = limit + 1
+    else:
+        sql_base_query += f" ORDER BY {order_by} LIMIT :limit OFFSET :offset"
+        sql_params.update({"limit": limit, "offset": offset})
     
     try:
-        result = execute_with_retry(session, sql_base_query, sql_params)
+        result = await async_execute_with_retry(session, sql_base_query, sql_params)
         documents = [dict(row._mapping) for row in result.fetchall()]
     except Exception as e:
         logger.error(f"Error executing documents query: {e}")
         documents = []
+        list_cache_key = None
+    
+    if cursor_mode and len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
     
     if documents is None:
         documents = []
         total = 0
     
-    return DocumentListResponse(
+    response = DocumentListResponse(
         documents=documents,
         total=total,
         page=page,
         limit=limit,
-        total_pages=(total + limit - 1) // limit if total > 0 else 0
+        total_pages=(total + limit - 1) // limit if total > 0 else 0,
+        next_cursor=next_cursor,
+        facets=facet_counts
     )
+    if list_cache_key is not None:
+        document_list_cache.set(list_cache_key, response)
+    return response
 
-@app.get("/documents/{document_id}", response_model=FinancialDocument)
-async def get_document(document_id: int, session: Session = Depends(get_db)):
+INGEST_TOKEN = os.getenv("INGEST_TOKEN")
+
+def require_ingest_token(x_ingest_token: Optional[str] = Header(None)):
+    # INGEST_TOKEN 이 설정된 경우에만 열리는 운영 경로 (대량 등록, 느린 쿼리 기록)
+    if not INGEST_TOKEN or not x_ingest_token or not hmac.compare_digest(x_ingest_token, INGEST_TOKEN):
+        raise HTTPException(status_code=403, detail="권한이 없습니다")
+
+@app.post("/documents/bulk", response_model=IngestReport, dependencies=[Depends(require_ingest_token)])
+async def bulk_ingest_documents(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    batch_size: int = Query(1000, ge=1, le=10000),
+    commit_every: int = Query(10000, ge=1),
+):
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    
+    # 본문을 청크 단위로 워커 스레드에 넘겨 파싱/INSERT 와 업로드 수신을 겹쳐 처리
+    chunks = queue.Queue(maxsize=64)
+    task = asyncio.create_task(asyncio.to_thread(ingest_from_queue, chunks, fmt, batch_size, commit_every))
+    end, report, failed = INGEST_ABORT, None, False
     try:
-        update_query = "UPDATE financial_documents SET view_count = view_count + 1 WHERE id = :document_id"
-        execute_with_retry(session, update_query, {"document_id": document_id})
-        session.commit()
-        
+        async for chunk in request.stream():
+            if chunk:
+                await asyncio.to_thread(chunks.put, chunk)
+        end = None
+    except ClientDisconnect:
+        logger.warning("Bulk ingest client disconnected before the end of the body")
+    finally:
+        # 본문이 끝까지 오지 않았으면(연결 끊김, 취소) 커밋 전 행을 롤백하도록 알리고, 어느 경우든 워커가 끝날 때까지 기다림
+        await asyncio.to_thread(chunks.put, end)
+        try:
+            report = await task
+        except IngestAborted as e:
+            logger.warning(f"Bulk ingest aborted: {e.report['inserted'] if e.report else 0} rows committed before the upload stopped, the rest rolled back")
+        except Exception as e:
+            logger.error(f"Bulk ingest failed: {e}")
+            failed = True
+        finally:
+            # 실패해도 이미 커밋된 청크가 있을 수 있으므로 항상 비움
+            invalidate_document_lists()
+            search_index_stale.set()
+    
+    if failed:
+        raise HTTPException(status_code=500, detail="문서 등록 중 오류가 발생했습니다")
+    if report is None:
+        raise HTTPException(status_code=400, detail="업로드가 중단되어 마지막 커밋 이후의 행은 등록되지 않았습니다")
+    
+    logger.info(f"Bulk ingest: {report['inserted']} inserted, {report['rejected']} rejected, {report['rows_per_second']} rows/s")
+    return report
+
+@app.get("/documents/{document_id}", response_model=FinancialDocument)
+async def get_document(document_id: int, session: AsyncSession = Depends(get_async_db)):
+    async def load_document():
         query = """
             SELECT fd.*, c.name as category_name 
             FROM financial_documents fd 
             LEFT JOIN categories c ON fd.category_id = c.id
             WHERE fd.id = :document_id
         """
-        result = execute_with_retry(session, query, {"document_id": document_id})
+        result = await async_execute_with_retry(session, query, {"document_id": document_id})
         row = result.fetchone()
+        return dict(row._mapping) if row else None
+    
+    try:
+        document = await document_cache.get_or_load(document_id, load_document)
         
-        if not row:
+        if not document:
             raise HTTPException(status_code=404, detail="문서를 찾을 수 없습니다")
         
-        return FinancialDocument(**dict(row._mapping))
+        # 조회수는 view_counter가 모아서 일괄 반영
+        view_counter.increment(document_id)
+        document = dict(document)
+        document["view_count"] = (document["view_count"] or 0) + view_counter.pending(document_id)
+        return FinancialDocument(**document)
     except Exception as e:
         logger.error(f"Error getting document {document_id}: {e}")
         raise HTTPException(status_code=500, detail="문서를 조회하는 중 오류가 발생했습니다")
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
-org = os.getenv("ORG")
-api_key = os.getenv("API_KEY")
-model = ChatOpenAI(
-    organization=org,
-    api_key=api_key,
-    model="gpt-4.1-mini"
-)
+@app.get("/metrics/slow", dependencies=[Depends(require_ingest_token)])
+async def get_slow_queries():
+    return list(metrics.slow_queries)
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return cache_stats()
+
+
+def open_chat_session(Messages: Message):
+    return chat_sessions.open(Messages.session_id, [(msg.role, msg.content) for msg in Messages.messages
+                                                    if msg.role in ("user", "assistant")])
 
 @app.post("/chat")
-async def chat_request(Messages: Message, db: Session = Depends(get_db)):
+async def chat_request(Messages: Message):
     try:
-        # Initialize chat model and tools
-        client = MultiServerMCPClient({
-                "paperlibrary": {
-                    "url": "http://mcp_server:8001/mcp/",
-                    "transport": "streamable_http",
-                }
-        }) 
-        tools = await client.get_tools()
-            
-        system_prompt = """
-당신은 금융정보도서관의 전문 AI 어시스턴트입니다.
+        session, question = open_chat_session(Messages)
+        async with session.lock:
+            agent = await chat_agent.get()
+            key = prompt_key(session, question, chat_agent.built_at)
+            reply = await chat_response_cache.lookup(key, chat_agent.tools)
+            cached = reply is not None
+            if not cached:
+                messages = prompt_messages(session, question)
+                response = await agent.ainvoke({"messages": messages})
+                reply = response["messages"][-1].content
+                chat_response_cache.store(key, extract_tool_results(response["messages"][len(messages):]), reply)
+            chat_sessions.record_turn(session, question, reply)
+        return {"reply": reply, "session_id": session.session_id, "cached": cached}
 
-사용자가 요구하는 기능을 MCP 서버를 사용하여 처리합니다.
 
-다음과 같은 금융 분야에 대해 전문적이고 정확한 정보를 제공해주세요:
-- 금융정책 (한국은행, 금융위원회 정책)
-- 은행업 (예금, 대출, 금융상품)  
-- 증권업 (주식, 채권, 투자)
-- 보험업 (생명보험, 손해보험)
-- 핀테크 (디지털금융, 간편결제)
-- 금융투자 (펀드, 파생상품)
-- 부동산금융 (주택담보대출, 부동산투자)
-- 기업금융 (기업대출, M&A)
-- 소비자금융 (신용카드, 개인대출)
-- 국제금융 (외환, 환율)
+    except Exception as e:
+        print(f"Chat error: {e}")
+        return {"reply": f"죄송합니다. 오류가 발생했습니다: {str(e)}"}
 
+@app.get("/chat/sessions/{session_id}")
+async def get_chat_session(session_id: str):
+    session = chat_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="대화 세션을 찾을 수 없습니다")
+    return session.to_dict()
 
-"""
+@app.delete("/chat/sessions/{session_id}")
+async def delete_chat_session(session_id: str):
+    chat_sessions.delete(session_id)
+    return {"deleted": session_id}
 
-        agent = create_react_agent(model, tools, prompt=system_prompt)
-        
-        langchain_messages = []
-        for msg in Messages.messages:
-            if msg.role == "user":
-                langchain_messages.append(HumanMessage(content=msg.content))
-            elif msg.role == "assistant":
-                langchain_messages.append(AIMessage(content=msg.content))
 
-        response = await agent.ainvoke({"messages": langchain_messages})
-        reply = response["messages"][-1].content
-        return {"reply": reply}
+def sse_event(payload):
+    return f"event: {payload['type']}\ndata: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n"
 
+@app.post("/chat/stream")
+async def chat_stream_request(Messages: Message):
+    # 토큰과 도구 호출 진행 상황을 Server-Sent Events로 즉시 전달
+    async def event_stream():
+        try:
+            session, question = open_chat_session(Messages)
+            async with session.lock:
+                yield sse_event({"type": "session", "session_id": session.session_id})
+                agent = await chat_agent.get()
+                key = prompt_key(session, question, chat_agent.built_at)
+                reply = await chat_response_cache.lookup(key, chat_agent.tools)
+                if reply is not None:
+                    yield sse_event({"type": "token", "content": reply})
+                    yield sse_event({"type": "done", "reply": reply, "cached": True})
+                else:
+                    tool_results = []
+                    async for payload in stream_chat_events(agent, prompt_messages(session, question), tool_results):
+                        if payload["type"] == "done":
+                            reply = payload["reply"]
+                            chat_response_cache.store(key, tool_results, reply)
+                        yield sse_event(payload)
+                if reply is not None:
+                    chat_sessions.record_turn(session, question, reply)
+        except Exception as e:
+            print(f"Chat error: {e}")
+            yield sse_event({"type": "error", "reply": f"죄송합니다. 오류가 발생했습니다: {str(e)}"})
 
-    except Exception as e:
-        print(f"Chat error: {e}")
-        return {"reply": f"죄송합니다. 오류가 발생했습니다: {str(e)}"}
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @app.get("/pdfs/{file_path:path}")
-async def download_pdf(file_path: str):
+async def download_pdf(file_path: str, request: Request):
     safe_filename = re.sub(r'[\.]{2,}[\/\\]', '', file_path)
     safe_filename = safe_filename.replace('..', '').replace('\\', '/')
     
@@ -298,24 +688,51 @@ async def download_pdf(file_path: str):
     if not os.path.abspath(resolved_file_path).startswith(os.path.abspath(pdfs_dir)):
         raise HTTPException(status_code=403, detail="접근이 금지된 경로입니다")
     
-    if not os.path.exists(resolved_file_path):
+    stat_result = stat_file(resolved_file_path)
+    if stat_result is None:
         logger.warning(f"PDF download attempt for non-existent file: {filename}")
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다")
-    logger.info(f"PDF download: {filename}")
     
-    mime_type = magic.from_file(resolved_file_path, mime=True)
+    # MIME 검사는 파일 버전(mtime, 크기)마다 한 번만 수행
+    mime_type = sniff_mime(resolved_file_path, stat_result)
     if mime_type != 'application/pdf':
         raise HTTPException(status_code=400, detail="유효하지 않은 PDF 파일입니다")
     
+    headers = validator_headers(stat_result)
+    headers['X-Content-Type-Options'] = 'nosniff'
+    
+    if etag_matches(request.headers.get('if-none-match'), headers['ETag']):
+        return Response(status_code=304, headers=headers)
+    
+    logger.info(f"PDF download: {filename}")
+    headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    
+    # If-Range 가 현재 ETag 와 다르면 파일이 바뀐 것이므로 전체 전송
+    if_range = request.headers.get('if-range')
+    byte_range = None
+    if not if_range or if_range == headers['ETag']:
+        try:
+            byte_range = parse_range(request.headers.get('range'), stat_result.st_size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={**headers, 'Content-Range': f'bytes */{stat_result.st_size}'})
+    
+    if byte_range is not None:
+        start, end = byte_range
+        headers['Content-Range'] = f'bytes {start}-{end}/{stat_result.st_size}'
+        headers['Content-Length'] = str(end - start + 1)
+        return StreamingResponse(
+            iter_file_range(resolved_file_path, start, end),
+            status_code=206,
+            media_type='application/pdf',
+            headers=headers
+        )
     
     return FileResponse(
         resolved_file_path, 
         filename=filename,
         media_type='application/pdf',
-        headers={
-            'Content-Disposition': f'attachment; filename="{filename}"',
-            'X-Content-Type-Options': 'nosniff'
-        }
+        stat_result=stat_result,
+        headers=headers
     )
 
 if __name__ == "__main__":
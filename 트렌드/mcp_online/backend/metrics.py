@@ -0,0 +1,253 @@
+"""백엔드 계측: 요청/SQL 지연 히스토그램, 풀 대기, 재시도 횟수, 느린 쿼리 EXPLAIN, 챗 응답 캐시
+
+외부 의존성 없이 Prometheus 텍스트 포맷(/metrics)으로 내보낸다.
+- instrument_engine(engine): SQLAlchemy 이벤트 훅으로 문장별 지연/행 수 기록
+- TimedQueuePool / TimedAsyncQueuePool: 커넥션 체크아웃 대기 시간 기록
+- SLOW_QUERY_SECONDS 를 넘는 문장은 경고 로그, EXPLAIN_SLOW_QUERIES=1 이면 실행 계획도 수집
+"""
+import bisect
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "0.5"))
+EXPLAIN_SLOW_QUERIES = os.getenv("EXPLAIN_SLOW_QUERIES", "0").lower() in ("1", "true", "yes")
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 조합 -> [버킷별 개수..., +Inf 개수], 합계
+        self._series: Dict[Tuple, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: (list(counts), total[0]) for key, (counts, total) in self._series.items()}
+        for key, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        # 렌더링 시점에 값을 읽는 게이지 (이름, 설명, 값 목록을 돌려주는 함수)
+        self._gauges: List[Tuple[str, str, Callable[[], Iterable[Tuple[Dict[str, str], float]]]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help: str, collect: Callable[[], Iterable[Tuple[Dict[str, str], float]]]):
+        self._gauges.append((name, help, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for name, help, collect in self._gauges:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+            for labels, value in collect():
+                lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")))
+db_statement_duration = registry.register(Histogram(
+    "db_statement_duration_seconds", "SQL statement latency by normalised statement", ("engine", "statement")))
+db_statement_rows = registry.register(Counter(
+    "db_statement_rows_total", "Rows returned or affected by normalised statement", ("engine", "statement")))
+db_slow_statements = registry.register(Counter(
+    "db_slow_statements_total", "Statements slower than SLOW_QUERY_SECONDS", ("engine", "statement")))
+db_pool_checkout_wait = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ("pool",)))
+db_query_retries = registry.register(Counter(
+    "db_query_retries_total", "execute_with_retry attempts that failed", ("outcome",)))
+chat_response_cache = registry.register(Counter(
+    "chat_response_cache_total", "/chat response cache lookups (hit, miss, stale, uncacheable)", ("outcome",)))
+chat_history_compactions = registry.register(Counter(
+    "chat_history_compactions_total", "Chat sessions whose older messages were folded into the summary", ("method",)))
+
+# 최근 느린 쿼리 (/metrics/slow)
+slow_queries: deque = deque(maxlen=50)
+
+
+_PARAM_RE = re.compile(r"(:\w+|%\(\w+\)s|%s|\?)")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+_CASE_RE = re.compile(r"(?:WHEN \? THEN \?\s*)+", re.IGNORECASE)
+
+
+def statement_fingerprint(statement: str, max_length: int = 160) -> str:
+    """라벨 수가 늘지 않도록 파라미터/리터럴/IN 목록을 접은 SQL"""
+    text = " ".join(statement.split())
+    text = _PARAM_RE.sub("?", text)
+    text = _LITERAL_RE.sub("?", text)
+    text = _LIST_RE.sub("?...", text)
+    text = _CASE_RE.sub("WHEN ... ", text)
+    return text if len(text) <= max_length else text[:max_length - 3] + "..."
+
+
+def _parameter_shape(parameters) -> str:
+    """느린 쿼리 기록용 파라미터 요약 (값은 남기지 않고 개수/이름/타입만)"""
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"{len(parameters)} rows of {_parameter_shape(parameters[0])}"
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def _explain(conn, statement, parameters) -> Optional[List]:
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    try:
+        explain_cursor = conn.connection.cursor()
+        try:
+            explain_cursor.execute(prefix + statement, parameters)
+            return [list(row) for row in explain_cursor.fetchall()]
+        finally:
+            explain_cursor.close()
+    except Exception as e:
+        logger.debug(f"EXPLAIN failed: {e}")
+        return None
+
+
+def instrument_engine(engine, name: str):
+    """동기 Engine(비동기 엔진은 .sync_engine)에 문장 계측 훅을 건다"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        fingerprint = statement_fingerprint(statement)
+        db_statement_duration.observe(elapsed, engine=name, statement=fingerprint)
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            db_statement_rows.inc(cursor.rowcount, engine=name, statement=fingerprint)
+        if elapsed < SLOW_QUERY_SECONDS:
+            return
+        db_slow_statements.inc(engine=name, statement=fingerprint)
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {fingerprint}")
+        plan = None
+        if EXPLAIN_SLOW_QUERIES and not executemany and statement.lstrip()[:6].upper() == "SELECT":
+            plan = _explain(conn, statement, parameters)
+        slow_queries.append({
+            "engine": name,
+            # 리터럴과 파라미터 값은 접거나 빼서 문서 내용/검색어가 남지 않게 한다
+            "statement": statement_fingerprint(statement, max_length=2000),
+            "parameters": _parameter_shape(parameters)[:500],
+            "duration_ms": round(elapsed * 1000, 3),
+            "plan": plan,
+            "at": time.time(),
+        })
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    registry.gauge("db_pool_checked_out", "Connections currently checked out",
+                   lambda: [({"pool": name}, engine.pool.checkedout())] if hasattr(engine.pool, "checkedout") else [])
+
+
+class _TimedCheckout:
+    """풀 _do_get 호출(빈 커넥션이 없을 때의 대기 포함) 시간을 기록"""
+    pool_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started, pool=self.pool_label)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pool_label = "sync"
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pool_label = "async"
+
+
+def record_retry(outcome: str):
+    db_query_retries.inc(outcome=outcome)
+
+
+def route_label(request) -> str:
+    """경로 파라미터가 들어간 실제 URL 대신 라우트 템플릿 (/documents/{document_id})"""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def render() -> str:
+    return registry.render()
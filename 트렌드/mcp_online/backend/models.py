@@ -1,7 +1,7 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime, date
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Date, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from database import Base
@@ -33,6 +33,15 @@ class FinancialDocumentTable(Base):
     created_at = Column(DateTime)
     updated_at = Column(DateTime)
 
+class DocumentTagTable(Base):
+    # financial_documents.tags 를 태그 단위로 나눈 색인 (tags.py)
+    __tablename__ = "document_tags"
+    
+    tag = Column(String(100), primary_key=True)
+    document_id = Column(Integer, ForeignKey("financial_documents.id", ondelete="CASCADE"), primary_key=True)
+    
+    __table_args__ = (Index("idx_document_tags_document", "document_id"),)
+
 
 # 카테고리 관련 모델
 class CategoryBase(BaseModel):
@@ -62,6 +71,21 @@ class FinancialDocumentBase(BaseModel):
 class FinancialDocumentCreate(FinancialDocumentBase):
     category_id: Optional[int] = None
 
+class FinancialDocumentIngest(FinancialDocumentCreate):
+    # 비어 있으면 수집 파이프라인에서 본문으로 요약 생성
+    summary: Optional[str] = None
+
+class IngestError(BaseModel):
+    line: int
+    error: str
+
+class IngestReport(BaseModel):
+    inserted: int
+    rejected: int
+    errors: List[IngestError]
+    elapsed_seconds: float
+    rows_per_second: float
+
 class FinancialDocumentUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
@@ -91,6 +115,8 @@ class AtomicMsg(BaseModel):
 
 class Message(BaseModel):
     messages: List[AtomicMsg]
+    # 서버 측 대화 세션, 지정하면 messages 에는 이번 질문만 보내도 됨
+    session_id: Optional[str] = None
 
 
 # 검색 및 필터링 모델
@@ -102,9 +128,18 @@ class DocumentSearch(BaseModel):
     page: int = 1
     limit: int = 20
 
+class FacetCount(BaseModel):
+    value: str
+    count: int
+    # category facet 의 카테고리 id
+    id: Optional[int] = None
+
 class DocumentListResponse(BaseModel):
     documents: List[FinancialDocument]
     total: int
     page: int
     limit: int
     total_pages: int
+    next_cursor: Optional[str] = None
+    # facets=category,is_featured,tags 요청 시 현재 조건에 맞는 문서의 항목별 개수
+    facets: Optional[Dict[str, List[FacetCount]]] = None
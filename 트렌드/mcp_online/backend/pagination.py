@@ -0,0 +1,101 @@
+import asyncio
+import base64
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (created_at, id) 기준 keyset 페이지네이션 조건
+KEYSET_CLAUSE = "(fd.created_at < :cursor_created_at OR (fd.created_at = :cursor_created_at AND fd.id < :cursor_id))"
+KEYSET_ORDER = "fd.created_at DESC, fd.id DESC"
+
+
+def cursor_key(created_at, doc_id: int) -> Tuple[datetime, int]:
+    """KEYSET_ORDER 와 같은 순서로 비교할 수 있는 (created_at, id)"""
+    if isinstance(created_at, str):
+        # SQLite 드라이버는 DATETIME을 문자열로 돌려준다
+        created_at = datetime.fromisoformat(created_at)
+    return created_at, doc_id
+
+
+def encode_cursor(created_at: datetime, doc_id: int) -> str:
+    created_at, doc_id = cursor_key(created_at, doc_id)
+    payload = json.dumps({"c": created_at.isoformat(), "i": doc_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """커서 토큰을 (created_at, id)로 복원, 잘못된 토큰이면 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["c"]), int(payload["i"])
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {cursor!r}") from e
+
+
+class CountCache:
+    """COUNT(*) 결과 캐시
+
+    TTL이 지난 값은 그대로 반환하고 백그라운드에서 새로 계산해 두므로
+    요청 경로에서는 최초 1회를 제외하고 COUNT 쿼리를 기다리지 않는다.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, Tuple[int, float]]" = OrderedDict()
+        self._refreshing = set()
+        # 이벤트 루프는 태스크를 약하게만 참조하므로 끝날 때까지 여기서 잡아 둔다
+        self._tasks = set()
+
+    @staticmethod
+    def _key(query: str, params: Dict[str, Any]):
+        return query, tuple(sorted((k, str(v)) for k, v in params.items()))
+
+    def _store(self, key, total: int):
+        self._entries[key] = (total, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _refresh(self, key, count_func: Callable[[], Awaitable[int]]):
+        try:
+            self._store(key, await count_func())
+        except Exception as e:
+            logger.warning(f"Background count refresh failed: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    async def get(self, query: str, params: Dict[str, Any], count_func: Callable[[], Awaitable[int]]) -> int:
+        key = self._key(query, params)
+        entry = self._entries.get(key)
+        if entry is None:
+            total = await count_func()
+            self._store(key, total)
+            return total
+
+        total, computed_at = entry
+        self._entries.move_to_end(key)
+        if time.monotonic() - computed_at > self.ttl and key not in self._refreshing:
+            self._refreshing.add(key)
+            task = asyncio.create_task(self._refresh(key, count_func))
+            self._tasks.add(task)
+            task.add_done_callback(self._refresh_done)
+        return total
+
+    def _refresh_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        # _refresh 가 Exception 은 직접 기록하므로 여기에는 취소 등만 남는다
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background count refresh crashed: {task.exception()!r}")
+
+    def invalidate(self):
+        self._entries.clear()
+
+
+count_cache = CountCache()
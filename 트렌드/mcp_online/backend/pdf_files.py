@@ -0,0 +1,100 @@
+"""PDF 다운로드 응답 처리
+
+- 파일 MIME 검사(magic) 결과를 (경로, mtime, 크기) 키로 캐시해 파일 버전마다 한 번만 검사
+- ETag / If-None-Match 로 변경 없는 파일은 304
+- Range / If-Range 로 이어받기와 부분 전송
+"""
+import os
+import re
+from email.utils import formatdate
+from typing import Iterator, Optional, Tuple
+
+import magic
+
+from cache import get_cache
+
+# 파일이 바뀌면 mtime/크기가 바뀌어 키가 달라지므로 TTL은 길게 둬도 됨
+mime_cache = get_cache("pdf_mime", ttl=3600, max_entries=4096)
+
+CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def stat_file(path: str) -> Optional[os.stat_result]:
+    """일반 파일이면 stat 결과, 없으면 None"""
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return st if os.path.isfile(path) else None
+
+
+def sniff_mime(path: str, st: os.stat_result) -> str:
+    key = (path, st.st_mtime_ns, st.st_size)
+    return mime_cache.get_or_set(key, lambda: magic.from_file(path, mime=True))
+
+
+def make_etag(st: os.stat_result) -> str:
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def validator_headers(st: os.stat_result) -> dict:
+    return {
+        "ETag": make_etag(st),
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match 비교 (약한 비교, '*' 허용)"""
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """단일 바이트 범위만 처리, (시작, 끝) 포함 구간 반환
+
+    헤더가 없거나 해석할 수 없으면(다중 범위, 끝 < 시작 포함) None 으로 전체 전송,
+    시작이 파일 크기 이상이면 RangeNotSatisfiable.
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N : 마지막 N 바이트
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        # RFC 7233 2.1: 끝이 시작보다 앞이면 문법 오류이므로 헤더를 무시
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def iter_file_range(path: str, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
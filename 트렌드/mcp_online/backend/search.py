@@ -0,0 +1,229 @@
+import math
+import re
+import time
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# MySQL ngram 파서(ngram_token_size=2)와 동일한 단위로 토큰화
+NGRAM_SIZE = 2
+# 제목 > 요약 > 본문 순으로 가중치 부여
+FIELD_WEIGHTS = {"title": 3.0, "summary": 2.0, "content": 1.0}
+
+FULLTEXT_COLUMNS = "fd.title, fd.summary, fd.content"
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def ngrams(value: Optional[str], n: int = NGRAM_SIZE) -> List[str]:
+    """텍스트를 n-gram 토큰으로 분리 (한글은 띄어쓰기와 무관하게 부분 일치 가능)"""
+    if not value:
+        return []
+    grams = []
+    for term in _TERM_RE.findall(value.lower()):
+        if len(term) <= n:
+            grams.append(term)
+        else:
+            grams.extend(term[i:i + n] for i in range(len(term) - n + 1))
+    return grams
+
+
+def to_boolean_query(query: str) -> Optional[str]:
+    """사용자 검색어를 MySQL BOOLEAN MODE 구문으로 변환
+
+    각 단어를 필수 구문(+"단어")으로 감싸 LIKE 검색과 비슷한 결과를 내도록 한다.
+    ngram 크기보다 짧은 단어가 있으면 FULLTEXT로 찾을 수 없으므로 None을 반환한다.
+    """
+    terms = _TERM_RE.findall(query)
+    if not terms or any(len(term) < NGRAM_SIZE for term in terms):
+        return None
+    return " ".join(f'+"{term}"' for term in terms)
+
+
+def id_in_clause(ids: List[int], prefix: str = "doc_id", column: str = "fd.id") -> Tuple[str, Dict[str, int]]:
+    """id 목록을 바인딩 파라미터를 사용하는 IN 절로 변환"""
+    params = {f"{prefix}_{i}": doc_id for i, doc_id in enumerate(ids)}
+    if not params:
+        return "1=0", {}
+    return f"{column} IN ({', '.join(':' + name for name in params)})", params
+
+
+def fulltext_match_clause(param: str = "fulltext_query") -> str:
+    return f"MATCH({FULLTEXT_COLUMNS}) AGAINST (:{param} IN BOOLEAN MODE)"
+
+
+class SearchIndex:
+    """MySQL FULLTEXT 인덱스를 쓸 수 없을 때 사용하는 프로세스 내 역색인
+
+    처음에는 전체 문서로 구성하고, 이후 refresh 는 updated_at/id 로 바뀐 문서만 다시 넣고
+    지워진 문서를 뺀다. 검색과 갱신은 _lock 으로 문서 단위로 번갈아 실행된다.
+    """
+
+    def __init__(self, refresh_interval: float = 60.0):
+        self.refresh_interval = refresh_interval
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._doc_grams: Dict[int, List[str]] = {}
+        self._built = False
+        self._since = None
+        self._max_id = 0
+        self._fulltext: Optional[bool] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._doc_grams)
+
+    @property
+    def ready(self) -> bool:
+        return self._built
+
+    async def fulltext_available(self, session: AsyncSession) -> bool:
+        """financial_documents 테이블에 FULLTEXT 인덱스가 있는지 확인 (결과는 캐시)"""
+        if self._fulltext is None:
+            try:
+                row = (await session.execute(text("""
+                    SELECT COUNT(*) AS total FROM information_schema.STATISTICS
+                    WHERE TABLE_SCHEMA = DATABASE()
+                      AND TABLE_NAME = 'financial_documents'
+                      AND INDEX_TYPE = 'FULLTEXT'
+                """))).fetchone()
+                self._fulltext = bool(row and row.total)
+            except Exception as e:
+                logger.info(f"FULLTEXT index unavailable, using in-process index: {e}")
+                await session.rollback()
+                self._fulltext = False
+        return self._fulltext
+
+    @staticmethod
+    def _index(postings, doc_grams, doc_id: int, title: Optional[str], summary: Optional[str], content: Optional[str]):
+        weights: Dict[str, float] = defaultdict(float)
+        for field, value in (("title", title), ("summary", summary), ("content", content)):
+            for gram in ngrams(value):
+                weights[gram] += FIELD_WEIGHTS[field]
+        for gram, weight in weights.items():
+            postings[gram][doc_id] = 1.0 + math.log(weight)
+        doc_grams[doc_id] = list(weights)
+
+    def _remove(self, doc_id: int):
+        for gram in self._doc_grams.pop(doc_id, []):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[gram]
+
+    def add(self, doc_id: int, title: Optional[str], summary: Optional[str], content: Optional[str]):
+        with self._lock:
+            self._remove(doc_id)
+            self._index(self._postings, self._doc_grams, doc_id, title, summary, content)
+
+    def remove(self, doc_id: int):
+        with self._lock:
+            self._remove(doc_id)
+
+    def clear(self):
+        with self._lock:
+            self._postings, self._doc_grams = defaultdict(dict), {}
+        self._built = False
+
+    def build(self, rows: Iterable):
+        # 새 자료구조에 만든 뒤 교체하므로 구성 중에도 기존 색인으로 검색 가능
+        postings, doc_grams = defaultdict(dict), {}
+        for row in rows:
+            self._index(postings, doc_grams, row.id, row.title, row.summary, row.content)
+        with self._lock:
+            self._postings, self._doc_grams = postings, doc_grams
+        self._built = True
+
+    def refresh(self, session: Session, force: bool = False) -> int:
+        """처음(또는 force)에는 전체 구성, 이후에는 바뀐 문서만 반영 (스레드에서 호출), 반영한 문서 수 반환"""
+        with self._refresh_lock:
+            # 읽기 전에 기준점을 잡아 두어 읽는 동안 바뀐 문서는 다음 refresh 에서 다시 읽음
+            mark = session.execute(text(
+                "SELECT MAX(id) AS max_id, MAX(updated_at) AS updated FROM financial_documents"
+            )).fetchone()
+            started = time.perf_counter()
+            if force or not self._built:
+                result = session.execute(text("SELECT id, title, summary, content FROM financial_documents"))
+                self.build(_iter_batches(result))
+                changed = len(self)
+                logger.info(f"Search index built: {changed} documents in {time.perf_counter() - started:.2f}s")
+            else:
+                changed = self._update(session)
+                if changed:
+                    logger.info(f"Search index updated: {changed} documents in {time.perf_counter() - started:.2f}s")
+            self._since = mark.updated if mark.updated is not None else self._since
+            self._max_id = mark.max_id or self._max_id
+            return changed
+
+    def _update(self, session: Session) -> int:
+        # 같은 시각(초 단위)에 뒤늦게 바뀐 문서를 놓치지 않도록 >= 로 읽음 (다시 넣어도 결과는 같음)
+        result = session.execute(
+            text("SELECT id, title, summary, content FROM financial_documents WHERE updated_at >= :since OR id > :max_id"),
+            {"since": self._since, "max_id": self._max_id},
+        )
+        changed = 0
+        for row in _iter_batches(result):
+            self.add(row.id, row.title, row.summary, row.content)
+            changed += 1
+
+        # 지워진 문서: 개수와 id 합이 다를 때만 전체 id 를 읽어 비교
+        row = session.execute(text("SELECT COUNT(*) AS total, SUM(id) AS id_sum FROM financial_documents")).fetchone()
+        with self._lock:
+            indexed = (len(self._doc_grams), sum(self._doc_grams))
+        if (row.total, row.id_sum or 0) != indexed:
+            existing = {row.id for row in _iter_batches(session.execute(text("SELECT id FROM financial_documents")))}
+            with self._lock:
+                removed = [doc_id for doc_id in self._doc_grams if doc_id not in existing]
+                for doc_id in removed:
+                    self._remove(doc_id)
+            changed += len(removed)
+        return changed
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """모든 n-gram을 포함하는 문서를 tf-idf 점수 순으로 반환 (limit 이 없으면 전부)"""
+        grams = set(ngrams(query))
+        if not grams:
+            return []
+        with self._lock:
+            postings = []
+            for gram in grams:
+                posting = self._postings.get(gram)
+                if not posting:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+
+            total_docs = len(self._doc_grams)
+            idf = [math.log(1.0 + total_docs / len(posting)) for posting in postings]
+            scores = []
+            for doc_id, weight in postings[0].items():
+                score = weight * idf[0]
+                for posting, gram_idf in zip(postings[1:], idf[1:]):
+                    other = posting.get(doc_id)
+                    if other is None:
+                        break
+                    score += other * gram_idf
+                else:
+                    scores.append((doc_id, score))
+        # 점수가 같으면 최신 문서(큰 id)를 우선
+        scores.sort(key=lambda item: (-item[1], -item[0]))
+        return scores if limit is None else scores[:limit]
+
+
+def _iter_batches(result, size: int = 5000):
+    while True:
+        batch = result.fetchmany(size)
+        if not batch:
+            return
+        yield from batch
+
+
+search_index = SearchIndex()
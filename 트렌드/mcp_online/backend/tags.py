@@ -0,0 +1,182 @@
+"""정규화된 태그 색인 (document_tags)
+
+financial_documents.tags 는 "a,b,c" 형태의 표시용 원본으로 두고, 검색/필터용으로
+(tag, document_id) 행을 document_tags 에 따로 유지한다.
+- 태그 필터는 부분 문자열이 아니라 태그 단위로 일치 (all: AND, any: OR)
+- 현재 조건에 맞는 문서의 태그별 개수(facet)
+- 기존 쉼표 구분 컬럼에서 색인을 채우는 마이그레이션
+- 대량 등록 외의 경로(직접 UPDATE 등)로 바뀐 tags 를 updated_at 기준으로 다시 맞추는 동기화
+
+사용법 (backend 디렉터리에서):
+    python -m tags migrate          # document_tags 전체 재구성
+    python -m tags sync             # tags 컬럼과 다른 문서만 다시 색인
+"""
+import argparse
+import logging
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import delete, func, insert, or_, select, text
+
+from database import Base, SessionLocal, engine
+from models import DocumentTagTable, FinancialDocumentTable
+
+logger = logging.getLogger(__name__)
+
+MAX_TAGS = 20
+MAX_TAG_LENGTH = 100
+MIGRATION_BATCH_SIZE = 5000
+
+_TAG_SPLIT_RE = re.compile(r"[,;|\n]+")
+
+
+def split_tags(tags: Union[str, List[str], None]) -> List[str]:
+    """쉼표/세미콜론/파이프로 나뉜 태그를 공백 정리, '#' 제거, 대소문자 무시 중복 제거"""
+    if not tags:
+        return []
+    parts = tags if isinstance(tags, list) else _TAG_SPLIT_RE.split(str(tags))
+    seen, normalized = set(), []
+    for part in parts:
+        tag = " ".join(str(part).strip().lstrip("#").split())
+        if tag and len(tag) <= MAX_TAG_LENGTH and tag.lower() not in seen:
+            seen.add(tag.lower())
+            normalized.append(tag)
+    return normalized[:MAX_TAGS]
+
+
+def normalize_tags(tags: Union[str, List[str], None]) -> Optional[str]:
+    return ",".join(split_tags(tags)) or None
+
+
+def tag_filter_clause(tag_list: List[str], mode: str = "all") -> Tuple[str, Dict]:
+    """fd.id 에 거는 태그 조건과 바인드 파라미터 (mode: all=모든 태그, any=하나 이상)"""
+    params = {f"tag{i}": tag for i, tag in enumerate(tag_list)}
+    placeholders = ", ".join(f":{name}" for name in params)
+    if mode == "any":
+        clause = f"fd.id IN (SELECT dt.document_id FROM document_tags dt WHERE dt.tag IN ({placeholders}))"
+    else:
+        clause = (f"fd.id IN (SELECT dt.document_id FROM document_tags dt WHERE dt.tag IN ({placeholders}) "
+                  f"GROUP BY dt.document_id HAVING COUNT(*) = :tag_count)")
+        params["tag_count"] = len(tag_list)
+    return clause, params
+
+
+def tag_facet_query(matched_query: str, limit_param: str = "facet_limit") -> str:
+    """matched_query(fd.id 를 돌려주는 조회)에 걸린 문서들의 태그별 개수"""
+    return (f"SELECT dt.tag AS value, COUNT(*) AS count FROM document_tags dt "
+            f"JOIN (SELECT id FROM ({matched_query}) AS matched_docs) AS matched ON matched.id = dt.document_id "
+            f"GROUP BY dt.tag ORDER BY count DESC, dt.tag LIMIT :{limit_param}")
+
+
+def _tag_rows(documents: Iterable[Tuple[int, Optional[str]]]) -> List[Dict]:
+    return [{"document_id": document_id, "tag": tag} for document_id, tags in documents for tag in split_tags(tags)]
+
+
+def index_documents(conn, after_id: int) -> int:
+    """after_id 보다 큰 id 중 아직 색인되지 않은 문서의 태그를 넣고 마지막 id 반환 (같은 트랜잭션에서 호출)"""
+    indexed = select(DocumentTagTable.document_id).where(DocumentTagTable.document_id == FinancialDocumentTable.id)
+    documents = conn.execute(
+        select(FinancialDocumentTable.id, FinancialDocumentTable.tags)
+        .where(FinancialDocumentTable.id > after_id, ~indexed.exists())
+        .order_by(FinancialDocumentTable.id)
+    ).all()
+    rows = _tag_rows(documents)
+    if rows:
+        conn.execute(insert(DocumentTagTable), rows)
+    return documents[-1][0] if documents else after_id
+
+
+def migrate(batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """financial_documents.tags 로 document_tags 를 처음부터 다시 채움, 넣은 행 수 반환"""
+    Base.metadata.create_all(bind=engine, tables=[DocumentTagTable.__table__])
+    inserted, last_id = 0, 0
+    with engine.begin() as conn:
+        conn.execute(delete(DocumentTagTable))
+    while True:
+        with engine.begin() as conn:
+            documents = conn.execute(
+                select(FinancialDocumentTable.id, FinancialDocumentTable.tags)
+                .where(FinancialDocumentTable.id > last_id)
+                .order_by(FinancialDocumentTable.id)
+                .limit(batch_size)
+            ).all()
+            if not documents:
+                return inserted
+            rows = _tag_rows(documents)
+            if rows:
+                conn.execute(insert(DocumentTagTable), rows)
+            inserted += len(rows)
+            last_id = documents[-1][0]
+
+
+def sync_tag_index(since: Optional[datetime] = None,
+                   batch_size: int = MIGRATION_BATCH_SIZE) -> Tuple[int, Optional[datetime]]:
+    """updated_at >= since 인 문서(since 가 None 이면 전체)의 document_tags 를 tags 컬럼과 맞춤
+
+    색인이 이미 맞는 문서는 건드리지 않는다. (고친 문서 수, 다음 호출에 넘길 since) 반환
+    """
+    # 훑는 도중 바뀐 문서는 다음 호출에서 다시 보도록 시작 전에 기준 시각을 잡는다
+    with engine.connect() as conn:
+        mark = conn.execute(select(func.max(FinancialDocumentTable.updated_at))).scalar()
+    conditions = []
+    if since is not None:
+        # updated_at 이 없는 문서는 기준 시각으로 거를 수 없으므로 매번 확인
+        conditions.append(or_(FinancialDocumentTable.updated_at >= since, FinancialDocumentTable.updated_at.is_(None)))
+    fixed, last_id = 0, 0
+    while True:
+        with engine.begin() as conn:
+            documents = conn.execute(
+                select(FinancialDocumentTable.id, FinancialDocumentTable.tags)
+                .where(FinancialDocumentTable.id > last_id, *conditions)
+                .order_by(FinancialDocumentTable.id)
+                .limit(batch_size)
+            ).all()
+            if not documents:
+                return fixed, mark if mark is not None else since
+            last_id = documents[-1][0]
+            indexed = defaultdict(set)
+            for document_id, tag in conn.execute(
+                select(DocumentTagTable.document_id, DocumentTagTable.tag)
+                .where(DocumentTagTable.document_id.in_([document_id for document_id, _ in documents]))
+            ):
+                indexed[document_id].add(tag)
+            stale = [(document_id, tags) for document_id, tags in documents
+                     if set(split_tags(tags)) != indexed.get(document_id, set())]
+            if not stale:
+                continue
+            conn.execute(delete(DocumentTagTable)
+                         .where(DocumentTagTable.document_id.in_([document_id for document_id, _ in stale])))
+            rows = _tag_rows(stale)
+            if rows:
+                conn.execute(insert(DocumentTagTable), rows)
+            fixed += len(stale)
+
+
+def ensure_tag_index():
+    """document_tags 가 비어 있고 문서는 있으면(기존 DB, init.sql 시드) 한 번 채움"""
+    session = SessionLocal()
+    try:
+        has_tags = session.execute(select(DocumentTagTable.document_id).limit(1)).first()
+        has_documents = session.execute(text("SELECT 1 FROM financial_documents WHERE tags IS NOT NULL AND tags <> '' LIMIT 1")).first()
+    finally:
+        session.close()
+    if not has_tags and has_documents:
+        rows = migrate()
+        logger.info(f"Tag index built from financial_documents.tags: {rows} rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["migrate", "sync"])
+    parser.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE)
+    args = parser.parse_args()
+    if args.command == "sync":
+        print(f"document_tags: {sync_tag_index(batch_size=args.batch_size)[0]} documents fixed")
+        return
+    print(f"document_tags: {migrate(args.batch_size)} rows")
+
+
+if __name__ == "__main__":
+    main()
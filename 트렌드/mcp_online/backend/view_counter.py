@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+from database import AsyncSessionLocal, async_execute_with_retry
+
+logger = logging.getLogger(__name__)
+
+# 한 UPDATE 문에 묶을 최대 문서 수
+FLUSH_CHUNK_SIZE = 500
+
+
+class ViewCounter:
+    """문서 조회수 write-behind 집계기
+
+    조회 요청마다 UPDATE 하는 대신 메모리에서 문서별로 합산해 두었다가
+    주기적으로(또는 누적 건수가 임계치를 넘으면) 한 번에 반영한다.
+    """
+
+    def __init__(self, flush_interval: float = 5.0, flush_threshold: int = 1000):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._pending: Dict[int, int] = defaultdict(int)
+        self._pending_total = 0
+        self._flush_lock = asyncio.Lock()
+        self._task = None
+        self._threshold_flush = None
+        # flush 후 반영된 문서 id 목록을 받는 콜백 (캐시 무효화 등)
+        self.on_flush: List[Callable[[List[int]], None]] = []
+
+    def increment(self, document_id: int, count: int = 1):
+        self._pending[document_id] += count
+        self._pending_total += count
+        if self._pending_total >= self.flush_threshold and (self._threshold_flush is None or self._threshold_flush.done()):
+            self._threshold_flush = asyncio.create_task(self.flush())
+
+    def pending(self, document_id: int) -> int:
+        """아직 DB에 반영되지 않은 조회수"""
+        return self._pending.get(document_id, 0)
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, defaultdict(int)
+            self._pending_total = 0
+            try:
+                await self._write(pending)
+            except Exception as e:
+                logger.error(f"Error flushing view counts: {e}")
+                # 실패한 증가분은 다음 flush 때 다시 시도
+                for document_id, count in pending.items():
+                    self._pending[document_id] += count
+                    self._pending_total += count
+                return
+        for callback in self.on_flush:
+            callback(list(pending))
+
+    async def _write(self, pending: Dict[int, int]):
+        # id 순서로 갱신해 다른 트랜잭션과의 락 순서를 일정하게 유지.
+        # 조회수는 내용 변경이 아니므로 updated_at(ON UPDATE CURRENT_TIMESTAMP)은 그대로 둔다
+        items = sorted(pending.items())
+        async with AsyncSessionLocal() as session:
+            for start in range(0, len(items), FLUSH_CHUNK_SIZE):
+                chunk = items[start:start + FLUSH_CHUNK_SIZE]
+                params = {}
+                cases = []
+                for i, (document_id, count) in enumerate(chunk):
+                    params[f"id_{i}"] = document_id
+                    params[f"count_{i}"] = count
+                    cases.append(f"WHEN :id_{i} THEN :count_{i}")
+                id_list = ", ".join(f":id_{i}" for i in range(len(chunk)))
+                query = f"""
+                    UPDATE financial_documents
+                    SET view_count = view_count + CASE id {' '.join(cases)} ELSE 0 END,
+                        updated_at = updated_at
+                    WHERE id IN ({id_list})
+                """
+                await async_execute_with_retry(session, query, params)
+            await session.commit()
+        logger.info(f"Flushed view counts for {len(items)} documents")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+view_counter = ViewCounter()
@@ -33,11 +33,22 @@ CREATE TABLE financial_documents (
     FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE SET NULL
 );
 
+-- 태그 단위 색인 (financial_documents.tags 에서 백엔드가 채움, backend/tags.py)
+CREATE TABLE document_tags (
+    tag VARCHAR(100) NOT NULL,
+    document_id INT NOT NULL,
+    PRIMARY KEY (tag, document_id),
+    FOREIGN KEY (document_id) REFERENCES financial_documents(id) ON DELETE CASCADE
+);
+
 
 -- 인덱스 생성
 CREATE INDEX idx_financial_documents_category ON financial_documents(category_id);
 CREATE INDEX idx_financial_documents_title ON financial_documents(title);
 CREATE INDEX idx_financial_documents_created_at ON financial_documents(created_at);
+CREATE INDEX idx_document_tags_document ON document_tags(document_id);
+-- 한글 검색용 n-gram 전문 인덱스 (/documents?search_mode=fulltext)
+CREATE FULLTEXT INDEX ft_financial_documents_search ON financial_documents(title, summary, content) WITH PARSER ngram;
 
 -- 기본 카테고리 데이터 삽입 (UTF-8 인코딩)
 INSERT INTO categories (name, description) VALUES
@@ -37,13 +37,16 @@ const ChatBot = () => {
     setIsLoading(true);
 
     try {
-      // 백엔드 API 형식에 맞게 메시지 배열 생성
-      const apiMessages = updatedMessages.map(msg => ({
+      // 백엔드 API 형식에 맞게 메시지 배열 생성 (세션이 있으면 이번 질문만, 오류 메시지는 제외)
+      const apiMessages = (sessionId ? [userMessage] : updatedMessages.filter(msg => !msg.isError)).map(msg => ({
         role: msg.type === 'user' ? 'user' : 'assistant',
         content: msg.content
       }));
 
-      const response = await chatService.sendMessage(apiMessages);
+      const response = await chatService.sendMessage(apiMessages, sessionId);
+      if (response.session_id) {
+        setSessionId(response.session_id);
+      }
       
       const botMessage = {
         id: Date.now() + 1,
@@ -1,10 +1,12 @@
 import api from './api';
 
 export const chatService = {
-  sendMessage: async (messages) => {
+  // sessionId 가 있으면 서버가 이전 대화를 보관하므로 새 메시지만 보내도 됨
+  sendMessage: async (messages, sessionId = null) => {
     try {
       const response = await api.post('/chat', {
-        messages: messages
+        messages: messages,
+        session_id: sessionId
       });
       return response.data;
     } catch (error) {
@@ -21,6 +23,6 @@ export const chatService = {
         content: message
       }
     ];
-    return await chatService.sendMessage(messages);
+    return await chatService.sendMessage(messages, sessionId);
   }
 };
@@ -0,0 +1,132 @@
+"""get_page_content_from_url 벤치마크: 매번 전체 다운로드 vs PageFetcher
+
+ETag/Last-Modified 를 주고 If-None-Match 에 304 로 답하는 로컬 HTTP 서버에
+--page-kb 크기의 HTML(스크립트/스타일 포함)을 올려 두고 같은 URL을 반복 요청한다.
+전송 바이트, 도구가 돌려주는 글자 수, 지연을 비교하고 크기 제한/캐시 동작도 확인한다.
+
+사용법 (mcp_server 디렉터리에서):
+    python -m benchmarks.fetch_benchmark --requests 50 --page-kb 512
+"""
+import argparse
+import asyncio
+import hashlib
+import statistics
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from page_fetcher import PageFetcher, FetchError
+
+
+def build_page(size_kb):
+    paragraph = "<p>한국은행 금융통화위원회는 기준금리를 연 3.50%로 동결했다.</p>\n"
+    script = "<script>var tracking = {" + "'k': 'v'," * 200 + "};</script>\n"
+    style = "<style>" + ".c{color:#000}" * 200 + "</style>\n"
+    body = []
+    while sum(map(len, body)) < size_kb * 1024:
+        body.extend([paragraph * 5, script, style])
+    return ("<html><head><title>기준금리</title>" + style + "</head><body>" + "".join(body) + "</body></html>").encode()
+
+
+def start_page_server(page):
+    etag = '"' + hashlib.sha256(page).hexdigest()[:16] + '"'
+    sent = {"bytes": 0}
+
+    class PageHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/no-etag":
+                body = b"<html><body><p>no validators</p></body></html>"
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(page)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", "Mon, 01 Jan 2024 00:00:00 GMT")
+            self.end_headers()
+            try:
+                self.wfile.write(page)
+                sent["bytes"] += len(page)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, sent
+
+
+def report(label, timings, sent_bytes, chars):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<14} mean {statistics.mean(timings):7.2f} ms   p50 {statistics.median(timings):7.2f} ms   "
+          f"p95 {p95:7.2f} ms   sent {sent_bytes / 1024:9.1f} KiB   returned {chars:8d} chars")
+
+
+async def main_async(args):
+    page = build_page(args.page_kb)
+    server, sent = start_page_server(page)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        timings, chars = [], 0
+        for _ in range(args.requests):
+            started = time.perf_counter()
+            resp = await client.get(base + "/")
+            chars = len(resp.text)
+            timings.append((time.perf_counter() - started) * 1000)
+        report("full download", timings, sent["bytes"], chars)
+
+        sent["bytes"] = 0
+        fetcher = PageFetcher(client, cache_dir=tempfile.mkdtemp(prefix="page_cache_"), max_bytes=len(page) + 1)
+        timings = []
+        for _ in range(args.requests):
+            started = time.perf_counter()
+            text = await fetcher.fetch(base + "/")
+            timings.append((time.perf_counter() - started) * 1000)
+        report("PageFetcher", timings, sent["bytes"], len(text))
+        assert "기준금리" in text and "tracking" not in text and ".c{" not in text
+        stats = fetcher.stats()
+        assert stats["fetched"] == 1 and stats["revalidated"] == args.requests - 1, stats
+
+        limited = PageFetcher(client, cache_dir=tempfile.mkdtemp(prefix="page_cache_"), max_bytes=16 * 1024)
+        await limited.fetch(base + "/")
+        assert limited.stats()["truncated"] == 1 and limited.stats()["bytes_downloaded"] == 16 * 1024
+        await limited.fetch(base + "/no-etag")
+        assert limited.stats()["cache"]["entries"] == 1
+
+        try:
+            await fetcher.fetch("http://127.0.0.1:1/")
+        except FetchError:
+            pass
+        else:
+            raise AssertionError("connection error not reported")
+
+    print(f"\nfetcher stats: {stats}")
+    server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--page-kb", type=int, default=512)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
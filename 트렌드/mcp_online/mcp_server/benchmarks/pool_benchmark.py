@@ -0,0 +1,95 @@
+"""MCP 도구 DB 호출 지연 벤치마크: 호출마다 새 연결 vs ConnectionPool
+
+기본값은 SQLite 파일을 로컬 DB 대체로 쓰고, 연결 시 --connect-latency-ms 만큼 지연을 넣어
+TCP 연결 + MySQL 인증 핸드셰이크 비용을 흉내낸다. --mysql 을 주면 DB_CONFIG 로 실제 MySQL에 연결한다.
+
+사용법 (mcp_server 디렉터리에서):
+    python -m benchmarks.pool_benchmark --calls 2000 --threads 8
+    python -m benchmarks.pool_benchmark --mysql
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from db_pool import ConnectionPool
+
+QUERY = "SELECT id, title FROM financial_documents WHERE category_id = {placeholder} ORDER BY id DESC LIMIT 10"
+
+
+def sqlite_stand_in(connect_latency):
+    path = os.path.join(tempfile.gettempdir(), "mcp_pool_benchmark.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS financial_documents (id INTEGER PRIMARY KEY, title TEXT, category_id INTEGER)")
+        if not conn.execute("SELECT COUNT(*) FROM financial_documents").fetchone()[0]:
+            conn.executemany("INSERT INTO financial_documents (title, category_id) VALUES (?, ?)",
+                             [(f"문서 {i}", i % 10 + 1) for i in range(10000)])
+
+    def connect():
+        time.sleep(connect_latency)
+        return sqlite3.connect(path, check_same_thread=False)
+
+    return connect, QUERY.format(placeholder="?")
+
+
+def mysql_target():
+    import pymysql
+    from mcp_server import DB_CONFIG
+
+    return (lambda: pymysql.connect(**DB_CONFIG, autocommit=True)), QUERY.format(placeholder="%s")
+
+
+def run(label, call, calls, threads):
+    def timed(i):
+        started = time.perf_counter()
+        call(i)
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        timings = sorted(executor.map(timed, range(calls)))
+    elapsed = time.perf_counter() - started
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<10} {calls / elapsed:9.1f} calls/s   mean {statistics.mean(timings):7.2f} ms   p50 {statistics.median(timings):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--connect-latency-ms", type=float, default=5.0)
+    parser.add_argument("--mysql", action="store_true", help="DB_CONFIG 의 MySQL 사용")
+    args = parser.parse_args()
+
+    connect, query = mysql_target() if args.mysql else sqlite_stand_in(args.connect_latency_ms / 1000)
+
+    def unpooled(i):
+        conn = connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, (i % 10 + 1,))
+            cursor.fetchall()
+        finally:
+            conn.close()
+
+    pool = ConnectionPool(connect, max_size=args.pool_size)
+
+    def pooled(i):
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (i % 10 + 1,))
+            cursor.fetchall()
+
+    print(f"{args.calls} calls, {args.threads} threads, pool size {args.pool_size}\n")
+    run("unpooled", unpooled, args.calls, args.threads)
+    run("pooled", pooled, args.calls, args.threads)
+    print(f"\npool stats: {pool.stats()}")
+    pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""MCP 검색 결과 크기 벤치마크: 전체 컬럼(fd.*) vs 기본 projection + snippet
+
+SQLite 파일을 MySQL 대체로 쓰고(LOCATE/GREATEST/CHAR_LENGTH/SUBSTRING 은 파이썬 함수로 등록)
+fastmcp 인메모리 Client 로 도구를 호출해 호출당 응답 바이트, JSON 직렬화 시간, 호출 지연을 비교한다.
+
+사용법 (mcp_server 디렉터리에서):
+    python -m benchmarks.projection_benchmark --docs 2000 --content-kb 8 --calls 100
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from fastmcp import Client
+
+import mcp_server
+
+TOPICS = ["기준금리", "가계부채", "환율", "CBDC", "물가", "국채", "부동산", "ESG"]
+
+
+def sqlite_stand_in(docs, content_kb):
+    path = os.path.join(tempfile.gettempdir(), f"mcp_projection_benchmark_{docs}_{content_kb}.db")
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS categories (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE IF NOT EXISTS financial_documents (
+            id INTEGER PRIMARY KEY, title TEXT, content TEXT, summary TEXT, category_id INTEGER,
+            author TEXT, source TEXT, publication_date TEXT, tags TEXT, view_count INTEGER,
+            is_featured INTEGER, created_at TEXT, updated_at TEXT);
+    """)
+    if not conn.execute("SELECT COUNT(*) FROM financial_documents").fetchone()[0]:
+        rng = random.Random(0)
+        conn.executemany("INSERT INTO categories (id, name) VALUES (?, ?)", [(i + 1, t) for i, t in enumerate(TOPICS)])
+        sentence = "금융통화위원회는 대내외 여건을 점검하고 통화정책 방향을 결정하였다. "
+        rows = []
+        for i in range(docs):
+            topic = rng.choice(TOPICS)
+            body = sentence * (content_kb * 1024 // len(sentence.encode()) // 2)
+            at = rng.randrange(len(body))
+            content = body[:at] + f" {topic} 관련 주요 결정 사항이 발표되었다. " + body[at:]
+            stamp = f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d} 09:00:00"
+            rows.append((f"{topic} 동향 보고서 {i}", content, f"{topic} 동향 요약", TOPICS.index(topic) + 1,
+                         "조사국", "한국은행", stamp[:10], f"{topic},금융", i, i % 7 == 0, stamp, stamp))
+        conn.executemany("""INSERT INTO financial_documents (title, content, summary, category_id, author, source,
+                            publication_date, tags, view_count, is_featured, created_at, updated_at)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", rows)
+        conn.commit()
+
+    conn.create_function("LOCATE", 2, lambda needle, hay: (hay or "").find(needle) + 1)
+    conn.create_function("GREATEST", 2, max)
+    conn.create_function("CHAR_LENGTH", 1, lambda s: len(s or ""))
+    conn.create_function("SUBSTRING", 3, lambda s, start, length: (s or "")[start - 1:start - 1 + length])
+    conn.row_factory = lambda cursor, row: {col[0]: value for col, value in zip(cursor.description, row)}
+
+    def execute_query(query, params=None):
+        return conn.execute(query.replace("%s", "?"), params or ()).fetchall()
+
+    return execute_query
+
+
+def report(label, sizes, serialise_ms, call_ms):
+    print(f"{label:<22} {statistics.mean(sizes) / 1024:8.1f} KiB/call   "
+          f"serialise {statistics.mean(serialise_ms):7.3f} ms   call p50 {statistics.median(call_ms):7.2f} ms")
+
+
+async def measure(client, tool, arguments, calls):
+    sizes, serialise_ms, call_ms = [], [], []
+    for i in range(calls):
+        args = {key: (value(i) if callable(value) else value) for key, value in arguments.items()}
+        started = time.perf_counter()
+        result = await client.call_tool(tool, args)
+        call_ms.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        payload = json.dumps(result.structured_content, ensure_ascii=False, default=str)
+        serialise_ms.append((time.perf_counter() - started) * 1000)
+        sizes.append(len(payload.encode()))
+    return sizes, serialise_ms, call_ms, result.structured_content
+
+
+async def main_async(args):
+    mcp_server.execute_query = sqlite_stand_in(args.docs, args.content_kb)
+    topic = lambda i: TOPICS[i % len(TOPICS)]
+
+    async with Client(mcp_server.mcp) as client:
+        runs = [
+            ("search fd.*", "search_financial_documents", {"query": topic, "limit": args.limit, "fields": ["*"], "snippet": False}),
+            ("search projected", "search_financial_documents", {"query": topic, "limit": args.limit}),
+            ("search title+snippet", "search_financial_documents", {"query": topic, "limit": args.limit, "fields": ["id", "title"]}),
+            ("recent fd.*", "get_recent_documents", {"limit": args.limit, "fields": ["*"]}),
+            ("recent projected", "get_recent_documents", {"limit": args.limit}),
+        ]
+        print(f"{args.docs} docs, ~{args.content_kb} KiB content, limit {args.limit}, {args.calls} calls each\n")
+        for label, tool, arguments in runs:
+            sizes, serialise_ms, call_ms, last = await measure(client, tool, arguments, args.calls)
+            report(label, sizes, serialise_ms, call_ms)
+
+        sizes, _, _, last = await measure(client, "search_financial_documents", {"query": "기준금리", "limit": 1}, 1)
+        print(f"\nexample snippet: {last['result'][0]['snippet']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--content-kb", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--calls", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
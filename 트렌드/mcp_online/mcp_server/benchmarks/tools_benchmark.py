@@ -0,0 +1,80 @@
+"""MCP 도구 동시 호출 벤치마크: 동기(블로킹) 도구 vs 비동기 도구
+
+응답을 --delay-ms 만큼 늦추는 로컬 HTTP 서버를 띄우고 get_page_content_from_url 을
+동시에 여러 번 호출한다. 동기 도구는 이벤트 루프를 막아 호출이 직렬화된다.
+
+사용법 (mcp_server 디렉터리에서):
+    python -m benchmarks.tools_benchmark --calls 50 --delay-ms 200
+"""
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from fastmcp import Client, FastMCP
+
+import mcp_server
+
+
+def start_slow_http_server(delay):
+    class SlowHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = "<html><body><h1>기준금리 동결</h1></body></html>".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def blocking_server():
+    """변경 전과 같은 동기 구현"""
+    server = FastMCP("blocking")
+
+    @server.tool()
+    def get_page_content_from_url(url: str) -> str:
+        resp = httpx.get(url)
+        if resp.status_code != 200:
+            return "URL 페이지 내용을 추출할 수 없습니다."
+        return resp.text
+
+    return server
+
+
+async def measure(label, server, url, calls):
+    async with Client(server) as client:
+        await client.call_tool("get_page_content_from_url", {"url": url})
+        started = time.perf_counter()
+        await asyncio.gather(*(client.call_tool("get_page_content_from_url", {"url": url}) for _ in range(calls)))
+        elapsed = time.perf_counter() - started
+    print(f"{label:<8} {calls} concurrent calls in {elapsed * 1000:8.1f} ms   ({calls / elapsed:7.1f} calls/s)")
+
+
+async def main_async(args):
+    http_server = start_slow_http_server(args.delay_ms / 1000)
+    url = f"http://127.0.0.1:{http_server.server_address[1]}/"
+    await measure("sync", blocking_server(), url, args.calls)
+    await measure("async", mcp_server.mcp, url, args.calls)
+    http_server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--delay-ms", type=float, default=200)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""의미 검색 색인 벤치마크: IVF(nprobe 별) recall@k 와 지연, 색인 생성/증분 추가/재오픈 시간
+
+주제별 어휘로 만든 합성 문서를 HashingEmbedder 로 임베딩해 VectorIndex 에 배치로 넣고
+(중간에 자동 재학습 포함), 양자화 전 float32 벡터의 전체 스캔 결과를 정답으로 recall 을 잰다.
+
+사용법 (mcp_server 디렉터리에서):
+    python -m benchmarks.vector_benchmark --docs 100000 --queries 200
+    python -m benchmarks.vector_benchmark --docs 20000 --nprobe 8,16,32
+"""
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from vector_index import HashingEmbedder, VectorIndex
+
+SYLLABLES = "가나다라마바사아자차카타파하금리채권환율물가주식부동산은행보험증권예금대출투자시장정책통화재정"
+PARTICLES = ["", "", "", "는", "를", "의", "에", "와", "로", "가"]
+
+
+def make_corpus(docs, topics, seed=0):
+    rng = random.Random(seed)
+    word = lambda: "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    general = [word() for _ in range(400)]
+    vocab = [[word() for _ in range(40)] for _ in range(topics)]
+
+    def sentence(topic, n):
+        words = []
+        for _ in range(n):
+            roll = rng.random()
+            pool = vocab[topic] if roll < 0.6 else vocab[rng.randrange(topics)] if roll < 0.75 else general
+            words.append(rng.choice(pool) + rng.choice(PARTICLES))
+        return " ".join(words)
+
+    corpus = []
+    for i in range(docs):
+        topic = rng.randrange(topics)
+        corpus.append({"id": i + 1, "title": sentence(topic, 4), "summary": sentence(topic, 12),
+                       "content": sentence(topic, 120), "topic": topic})
+    return corpus
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(max(int(round(pct / 100 * len(values))) - 1, 0), len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", default="4,8,16,32,64")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=256)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="vector_index_bench_")
+    try:
+        corpus = make_corpus(args.docs, args.topics)
+        embedder = HashingEmbedder(dim=args.dim)
+
+        started = time.perf_counter()
+        vectors = embedder.embed_documents(corpus)
+        embed_seconds = time.perf_counter() - started
+        print(f"embedded {args.docs} docs in {embed_seconds:.1f}s ({args.docs / embed_seconds:.0f} docs/s), dim {args.dim}")
+
+        index = VectorIndex(directory, dim=args.dim)
+        ids = np.array([doc["id"] for doc in corpus])
+        started = time.perf_counter()
+        for start in range(0, args.docs, args.batch_size):
+            index.add(ids[start:start + args.batch_size], vectors[start:start + args.batch_size])
+        stats = index.stats()
+        print(f"indexed in {time.perf_counter() - started:.1f}s: nlist {stats['nlist']}, "
+              f"{stats['bytes'] / 1024 / 1024:.1f} MiB on disk ({stats['bytes'] / args.docs:.0f} B/doc)")
+
+        started = time.perf_counter()
+        index = VectorIndex(directory, dim=args.dim)
+        print(f"reopened (memmap) in {(time.perf_counter() - started) * 1000:.1f} ms\n")
+
+        rng = random.Random(1)
+        queries = []
+        for doc in rng.sample(corpus, args.queries):
+            words = doc["content"].split()
+            queries.append(" ".join(rng.sample(words, 5)))
+        query_vectors = [embedder.embed_query(query) for query in queries]
+        truth = []
+        for query in query_vectors:
+            scores = vectors @ query
+            truth.append(set(ids[np.argpartition(-scores, args.k)[:args.k]].tolist()))
+
+        print(f"{'method':<16} {'recall@' + str(args.k):>10} {'p50':>10} {'p95':>10}")
+        runs = [(f"ivf nprobe={n}", lambda q, n=int(n): index.search(q, args.k, nprobe=n)) for n in args.nprobe.split(",")]
+        runs.append(("int8 full scan", lambda q: index.exact_search(q, args.k)))
+        for label, search in runs:
+            latencies, recalls = [], []
+            for query, expected in zip(query_vectors, truth):
+                started = time.perf_counter()
+                hits = search(query)
+                latencies.append((time.perf_counter() - started) * 1000)
+                recalls.append(len(expected & {doc_id for doc_id, _ in hits}) / args.k)
+            print(f"{label:<16} {statistics.mean(recalls):10.3f} {percentile(latencies, 50):7.2f} ms "
+                  f"{percentile(latencies, 95):7.2f} ms")
+
+        extra = make_corpus(1000, args.topics, seed=2)
+        for doc in extra:
+            doc["id"] += args.docs
+        started = time.perf_counter()
+        extra_vectors = embedder.embed_documents(extra)
+        index.add([doc["id"] for doc in extra], extra_vectors)
+        add_ms = (time.perf_counter() - started) * 1000
+        found = sum(index.search(vector, 1)[0][0] == doc["id"] for doc, vector in zip(extra, extra_vectors))
+        print(f"\nincremental add of 1000 docs (embed + append) in {add_ms:.0f} ms, "
+              f"self-hit@1 {found / len(extra):.3f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""MCP 도구가 공유하는 DB 커넥션 풀"""
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class _PooledConnection:
+    __slots__ = ("raw", "created_at", "last_used")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """크기 제한이 있는 커넥션 풀
+
+    - max_size 개를 넘는 동시 체크아웃은 checkout_timeout 동안 대기
+    - recycle 초보다 오래된 커넥션은 폐기 후 새로 연결
+    - health_check_interval 초 이상 쉬었던 커넥션은 ping 으로 확인 후 사용
+    """
+
+    def __init__(self, connect: Callable[[], Any], max_size: int = 10, recycle: float = 3600,
+                 health_check_interval: float = 30, checkout_timeout: float = 10):
+        self._connect = connect
+        self.max_size = max_size
+        self.recycle = recycle
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._metrics = {
+            "checkouts": 0,
+            "connections_created": 0,
+            "connections_recycled": 0,
+            "health_check_failures": 0,
+            "checkout_timeouts": 0,
+            "checkout_wait_ms_total": 0.0,
+            "checkout_wait_ms_max": 0.0,
+        }
+
+    def _count(self, name: str, value: float = 1):
+        with self._lock:
+            self._metrics[name] += value
+
+    def _new_connection(self) -> _PooledConnection:
+        conn = _PooledConnection(self._connect())
+        self._count("connections_created")
+        return conn
+
+    def _is_healthy(self, conn: _PooledConnection) -> bool:
+        try:
+            if hasattr(conn.raw, "ping"):
+                conn.raw.ping(reconnect=False)
+            else:
+                conn.raw.cursor().execute("SELECT 1")
+            return True
+        except Exception:
+            self._count("health_check_failures")
+            return False
+
+    @staticmethod
+    def _close(conn: _PooledConnection):
+        try:
+            conn.raw.close()
+        except Exception:
+            pass
+
+    def checkout(self) -> _PooledConnection:
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            self._count("checkout_timeouts")
+            raise PoolTimeout(f"no free connection after {self.checkout_timeout}s (max_size={self.max_size})")
+        try:
+            conn = None
+            while conn is None:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self._new_connection()
+                    break
+                now = time.monotonic()
+                if now - conn.created_at > self.recycle:
+                    self._close(conn)
+                    self._count("connections_recycled")
+                    conn = None
+                elif now - conn.last_used > self.health_check_interval and not self._is_healthy(conn):
+                    self._close(conn)
+                    conn = None
+        except Exception:
+            self._slots.release()
+            raise
+
+        wait_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._in_use += 1
+            self._metrics["checkouts"] += 1
+            self._metrics["checkout_wait_ms_total"] += wait_ms
+            self._metrics["checkout_wait_ms_max"] = max(self._metrics["checkout_wait_ms_max"], wait_ms)
+        return conn
+
+    def release(self, conn: _PooledConnection, discard: bool = False):
+        with self._lock:
+            self._in_use -= 1
+        if discard:
+            self._close(conn)
+        else:
+            conn.last_used = time.monotonic()
+            self._idle.put(conn)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """with pool.connection() as conn: ... 오류가 나면 커넥션을 폐기"""
+        conn = self.checkout()
+        try:
+            yield conn.raw
+        except Exception:
+            self.release(conn, discard=True)
+            raise
+        else:
+            self.release(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._metrics)
+            stats["in_use"] = self._in_use
+        stats["idle"] = self._idle.qsize()
+        stats["max_size"] = self.max_size
+        checkouts = stats["checkouts"]
+        stats["checkout_wait_ms_avg"] = round(stats["checkout_wait_ms_total"] / checkouts, 3) if checkouts else 0.0
+        stats["checkout_wait_ms_total"] = round(stats["checkout_wait_ms_total"], 3)
+        stats["checkout_wait_ms_max"] = round(stats["checkout_wait_ms_max"], 3)
+        return stats
@@ -5,10 +5,17 @@ from pymysql import Error
 from pymysql.cursors import DictCursor
 import openai
 from dotenv import load_dotenv
-import pdfkit
-import requests
+import httpx
+import asyncio
 import os
-import uuid
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from cache import get_cache, cache_stats
+from db_pool import ConnectionPool, PoolTimeout
+from pdf_renderer import PdfRenderQueue, RenderJob, QueueFull
+from page_fetcher import PageFetcher, FetchError
+from projection import resolve_fields, select_clause, snippet_columns, shape_rows
+from vector_index import HashingEmbedder, VectorIndex, sync_documents
 
 load_dotenv()
 
@@ -27,50 +34,113 @@ DB_CONFIG = {
 
 mcp = FastMCP("Financial Library MCP Server")
 
+# 이 서버는 문서를 읽기만 하므로 backend 에서의 변경은 TTL 이 지나면 반영된다
+document_cache = get_cache("documents", ttl=60, max_entries=2048)
+recent_documents_cache = get_cache("recent_documents", ttl=30, max_entries=64)
+
+
 def get_db_connection():
-    """데이터베이스 연결"""
-    try:
-        connection = pymysql.connect(**DB_CONFIG)
-        return connection
-    except Error as e:
-        print(f"데이터베이스 연결 오류: {e}")
-        return None
+    """데이터베이스 연결 (커넥션 풀에서 사용)"""
+    # 풀의 커넥션이 이전 트랜잭션 스냅샷을 재사용하지 않도록 autocommit 사용
+    return pymysql.connect(**DB_CONFIG, autocommit=True)
+
+db_pool = ConnectionPool(
+    get_db_connection,
+    max_size=int(os.getenv("DB_POOL_SIZE", "10")),
+    recycle=int(os.getenv("DB_POOL_RECYCLE", "3600")),
+    health_check_interval=30,
+    checkout_timeout=10,
+)
 
 def execute_query(query: str, params: tuple = None):
     """데이터베이스 쿼리 실행"""
-    connection = get_db_connection()
-    if not connection:
-        return None
-    
     try:
-        cursor = connection.cursor(DictCursor)
-        cursor.execute(query, params)
-        
-        if query.strip().upper().startswith('SELECT'):
-            result = cursor.fetchall()
-        else:
-            connection.commit()
-            result = cursor.lastrowid
-        
-        cursor.close()
-        connection.close()
-        return result
-    except Error as e:
+        with db_pool.connection() as connection:
+            with connection.cursor(DictCursor) as cursor:
+                cursor.execute(query, params)
+                
+                if query.strip().upper().startswith('SELECT'):
+                    result = cursor.fetchall()
+                else:
+                    connection.commit()
+                    result = cursor.lastrowid
+            return result
+    except (Error, PoolTimeout) as e:
         print(f"쿼리 실행 오류: {e}")
-        if connection:
-            connection.close()
         return None
 
+async def execute_query_async(query: str, params: tuple = None):
+    """커넥션 풀 쿼리를 워커 스레드에서 실행해 이벤트 루프를 막지 않음"""
+    return await asyncio.to_thread(execute_query, query, params)
+
+pdf_queue = PdfRenderQueue(
+    output_dir="/pdfs",
+    workers=int(os.getenv("PDF_WORKERS", "2")),
+    max_pending=int(os.getenv("PDF_MAX_PENDING", "16")),
+    name_secret=os.getenv("PDF_NAME_SECRET"),
+)
+# 도구 호출 안에서 PDF 완성을 기다리는 최대 시간(초), 넘으면 작업 ID 반환
+PDF_WAIT_TIMEOUT = 60
+
+# 도구 호출 간에 커넥션을 재사용하는 비동기 HTTP 클라이언트
+http_client = httpx.AsyncClient(timeout=30.0, follow_redirects=True)
+page_fetcher = PageFetcher(
+    http_client,
+    cache_dir=os.getenv("PAGE_CACHE_DIR", "/tmp/page_cache"),
+    max_bytes=int(os.getenv("PAGE_MAX_BYTES", str(2 * 1024 * 1024))),
+    max_chars=int(os.getenv("PAGE_MAX_CHARS", "20000")),
+    cache_max_bytes=int(os.getenv("PAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+
+# 의미 검색 색인 (mcp_server 재시작 후에도 유지되도록 볼륨 경로를 지정)
+vector_index = VectorIndex(os.getenv("VECTOR_INDEX_DIR", "/tmp/vector_index"), dim=int(os.getenv("VECTOR_DIM", "256")))
+embedder = HashingEmbedder(dim=vector_index.dim)
+# 검색 도구 호출 시 이 간격(초)이 지났으면 DB의 새/수정 문서를 백그라운드로 색인
+VECTOR_SYNC_INTERVAL = float(os.getenv("VECTOR_SYNC_INTERVAL", "60"))
+_vector_sync = {"task": None, "finished_at": 0.0}
+
+def _sync_vector_index() -> int:
+    # execute_query 오류(None)는 빈 결과로 처리되어 다음 주기에 다시 시도
+    return sync_documents(vector_index, embedder, lambda query, params: execute_query(query, params) or [])
+
+async def refresh_vector_index():
+    """동기화가 필요하면 시작하고, 색인이 비어 있으면 첫 동기화가 끝날 때까지 기다림"""
+    loop = asyncio.get_running_loop()
+    task = _vector_sync["task"]
+    if task is None and loop.time() - _vector_sync["finished_at"] >= VECTOR_SYNC_INTERVAL:
+        task = _vector_sync["task"] = asyncio.create_task(asyncio.to_thread(_sync_vector_index))
+
+        def done(finished):
+            _vector_sync["task"] = None
+            _vector_sync["finished_at"] = loop.time()
+            if not finished.cancelled() and finished.exception():
+                print(f"의미 검색 색인 동기화 오류: {finished.exception()}")
+        task.add_done_callback(done)
+    if task is not None and not len(vector_index):
+        await asyncio.shield(task)
+
 @mcp.tool()
-def search_financial_documents(query: str, category_id: Optional[int] = None, limit: int = 10) -> List[Dict[str, Any]]:
-    """금융 정보 문서 검색"""
-    base_query = """
-        SELECT fd.*, c.name as category_name 
+async def search_financial_documents(query: str, category_id: Optional[int] = None, limit: int = 10,
+                                     fields: Optional[List[str]] = None, snippet: bool = True) -> List[Dict[str, Any]]:
+    """금융 정보 문서 검색
+
+    fields: 반환할 필드 목록 (기본 id, title, summary, category_name, tags, created_at / ["*"] 이면 본문 포함 전체)
+    snippet: True 이면 본문에서 검색어 주변을 잘라 **강조** 표시한 snippet 필드를 추가
+    """
+    columns = resolve_fields(fields)
+    select = select_clause(columns)
+    params = []
+    if snippet:
+        select += ", " + snippet_columns()
+        params += [query, query]
+    
+    base_query = f"""
+        SELECT {select}
         FROM financial_documents fd 
         LEFT JOIN categories c ON fd.category_id = c.id
         WHERE (fd.title LIKE %s OR fd.content LIKE %s OR fd.summary LIKE %s)
     """
-    params = [f"%{query}%", f"%{query}%", f"%{query}%"]
+    params += [f"%{query}%", f"%{query}%", f"%{query}%"]
     
     if category_id:
         base_query += " AND fd.category_id = %s"
@@ -79,11 +149,52 @@ def search_financial_documents(query: str, category_id: Optional[int] = None, li
     base_query += " ORDER BY fd.created_at DESC LIMIT %s"
     params.append(limit)
     
-    results = execute_query(base_query, tuple(params))
-    return results or []
+    results = await execute_query_async(base_query, tuple(params))
+    return shape_rows(results or [], query)
+
+@mcp.tool()
+async def semantic_search_documents(query: str, k: int = 10, category_id: Optional[int] = None,
+                                    fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """의미 기반 문서 검색 (정확히 같은 단어가 없어도 내용이 비슷한 문서를 유사도 순으로 반환)
+
+    k: 반환할 문서 수 (최대 50)
+    fields: 반환할 필드 목록 (기본 id, title, summary, category_name, tags, created_at / ["*"] 이면 본문 포함 전체)
+    각 문서에 질의와의 코사인 유사도 score 필드가 붙음
+    """
+    k = max(1, min(k, 50))
+    columns = resolve_fields(fields)
+    await refresh_vector_index()
+    # 카테고리 조건과 DB에서 지워진 문서로 빠지는 몫을 고려해 넉넉히 가져옴
+    hits = await asyncio.to_thread(vector_index.search, embedder.embed_query(query), k * 4 if category_id else k * 2)
+    if not hits:
+        return []
+    scores = dict(hits)
+
+    select = select_clause(columns if "id" in columns else ["id"] + columns)
+    placeholders = ", ".join(["%s"] * len(scores))
+    sql = f"""
+        SELECT {select}
+        FROM financial_documents fd 
+        LEFT JOIN categories c ON fd.category_id = c.id
+        WHERE fd.id IN ({placeholders})
+    """
+    params = list(scores)
+    if category_id:
+        sql += " AND fd.category_id = %s"
+        params.append(category_id)
+
+    rows = await execute_query_async(sql, tuple(params)) or []
+    rows.sort(key=lambda row: scores[row["id"]], reverse=True)
+    results = []
+    for row in rows[:k]:
+        score = round(scores[row["id"]], 4)
+        if "id" not in columns:
+            row.pop("id")
+        results.append({**row, "score": score})
+    return results
 
 @mcp.tool()
-def get_financial_document_by_id(document_id: int) -> Optional[Dict[str, Any]]:
+async def get_financial_document_by_id(document_id: int) -> Optional[Dict[str, Any]]:
     """ID로 금융 정보 문서 조회"""
     query = """
         SELECT fd.*, c.name as category_name 
@@ -91,47 +202,86 @@ def get_financial_document_by_id(document_id: int) -> Optional[Dict[str, Any]]:
         LEFT JOIN categories c ON fd.category_id = c.id
         WHERE fd.id = %s
     """
-    results = execute_query(query, (document_id,))
-    return results[0] if results else None
+    async def load():
+        results = await execute_query_async(query, (document_id,))
+        return results[0] if results else None
+    return await document_cache.get_or_load(document_id, load)
 
 @mcp.tool()
-def get_recent_documents(limit: int = 10) -> List[Dict[str, Any]]:
-    """최신 금융 정보 문서 조회"""
-    query = """
-        SELECT fd.*, c.name as category_name 
+async def get_recent_documents(limit: int = 10, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """최신 금융 정보 문서 조회
+
+    fields: 반환할 필드 목록 (기본 id, title, summary, category_name, tags, created_at / ["*"] 이면 본문 포함 전체)
+    """
+    columns = resolve_fields(fields)
+    query = f"""
+        SELECT {select_clause(columns)}
         FROM financial_documents fd 
         LEFT JOIN categories c ON fd.category_id = c.id
         ORDER BY fd.created_at DESC
         LIMIT %s
     """
-    results = execute_query(query, (limit,))
-    return results or []
+    cache_key = (limit, tuple(columns))
+    return await recent_documents_cache.get_or_load(cache_key, lambda: execute_query_async(query, (limit,))) or []
 
 @mcp.tool()
-def get_page_content_from_url(url: str) -> str:
-    """주어진 URL의 페이지 내용을 추출"""
-    resp = requests.get(url)
-    if resp.status_code != 200:
+async def get_page_content_from_url(url: str) -> str:
+    """주어진 URL의 페이지 본문 텍스트를 추출"""
+    try:
+        return await page_fetcher.fetch(url)
+    except FetchError:
         return "URL 페이지 내용을 추출할 수 없습니다."
-    return resp.text
 
 @mcp.tool()
-def generate_document_to_pdf(source_html: str, output_path: str = None) -> str:
-    """주어진 HTML 페이지를 PDF로 생성"""
+async def generate_document_to_pdf(source_html: str, output_path: str = None, wait: bool = True) -> str:
+    """주어진 HTML 페이지를 PDF로 생성 (wait=False 이면 작업 ID를 바로 반환)"""
     content = source_html
     if not content:
         return "문서 내용이 없습니다."
     
-    file_name = f"{uuid.uuid4().hex[:16]}.pdf"
-    if not output_path:
-        output_path = f"/pdfs/{file_name}"
-    
     try:
-        pdfkit.from_string(content, output_path)
-        
-        return f"PDF가 성공적으로 생성되었습니다, 다운로드 주소: `{server_url}pdfs/{file_name}`"
-    except Exception as e:
-        return f"PDF 생성 중 오류가 발생했습니다: {str(e)}"
+        job = pdf_queue.submit(content, output_path)
+    except QueueFull:
+        return "PDF 생성 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요."
+    
+    if wait:
+        await pdf_queue.wait(job, timeout=PDF_WAIT_TIMEOUT)
+    return pdf_job_message(job)
+
+@mcp.tool()
+def get_pdf_job_status(job_id: str) -> str:
+    """PDF 생성 작업 상태 조회"""
+    job = pdf_queue.get(job_id)
+    if not job:
+        return "해당 PDF 작업을 찾을 수 없습니다."
+    return pdf_job_message(job)
+
+def pdf_job_message(job: RenderJob) -> str:
+    if job.status == "done":
+        return f"PDF가 성공적으로 생성되었습니다, 다운로드 주소: `{server_url}pdfs/{job.file_name}`"
+    if job.status == "failed":
+        return f"PDF 생성 중 오류가 발생했습니다: {job.error}"
+    return f"PDF를 생성하고 있습니다. 작업 ID `{job.job_id}` 로 get_pdf_job_status 도구에서 진행 상황을 확인하세요."
+
+@mcp.custom_route("/cache/stats", methods=["GET"])
+async def get_cache_stats(request: Request) -> JSONResponse:
+    return JSONResponse(cache_stats())
+
+@mcp.custom_route("/pool/stats", methods=["GET"])
+async def get_pool_stats(request: Request) -> JSONResponse:
+    return JSONResponse(db_pool.stats())
+
+@mcp.custom_route("/pdf/stats", methods=["GET"])
+async def get_pdf_stats(request: Request) -> JSONResponse:
+    return JSONResponse(pdf_queue.stats())
+
+@mcp.custom_route("/fetch/stats", methods=["GET"])
+async def get_fetch_stats(request: Request) -> JSONResponse:
+    return JSONResponse(page_fetcher.stats())
+
+@mcp.custom_route("/vector/stats", methods=["GET"])
+async def get_vector_stats(request: Request) -> JSONResponse:
+    return JSONResponse({**vector_index.stats(), "syncing": _vector_sync["task"] is not None})
 
 if __name__ == "__main__":
     mcp.run(transport="streamable-http", host="0.0.0.0", port=8001, path="/mcp")
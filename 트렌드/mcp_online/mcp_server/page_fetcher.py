@@ -0,0 +1,215 @@
+"""get_page_content_from_url 용 웹 페이지 수집기
+
+- 공유 httpx.AsyncClient 로 커넥션 재사용
+- 응답을 max_bytes 까지만 스트리밍으로 읽음
+- HTML은 본문 텍스트만 추출해 LLM 컨텍스트에 넣기 좋게 줄임
+- 추출 결과와 ETag/Last-Modified 를 디스크 LRU 캐시에 저장하고 다음 요청은 조건부 요청으로 재검증
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import Dict, Optional
+
+import httpx
+
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe"}
+_BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "tr", "table", "section", "article", "header", "footer",
+    "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "hr", "title", "main", "nav",
+}
+
+
+class FetchError(Exception):
+    pass
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    """태그/스크립트/스타일을 걷어내고 줄 단위로 공백을 정리한 본문 텍스트"""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    lines = (re.sub(r"\s+", " ", line).strip() for line in "".join(parser.parts).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class DiskLRU:
+    """키마다 JSON 파일 하나, 전체 크기가 max_bytes 를 넘으면 가장 오래 안 쓴 항목부터 삭제"""
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            st = os.stat(os.path.join(self.directory, name))
+            entries.append((st.st_mtime, name[:-5], st.st_size))
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+            self._total += size
+
+    def get(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            # 재시작 후에도 사용 순서가 유지되도록 mtime 갱신 (그 사이 축출되었으면 무시)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            if key in self._sizes:
+                self._sizes.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: Dict):
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        evicted = []
+        with self._lock:
+            self._total += len(data) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(data)
+            while self._total > self.max_bytes and len(self._sizes) > 1:
+                old_key, old_size = self._sizes.popitem(last=False)
+                self._total -= old_size
+                self.evictions += 1
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._sizes), "bytes": self._total, "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+
+class PageFetcher:
+    def __init__(self, client: httpx.AsyncClient, cache_dir: str, max_bytes: int = 2 * 1024 * 1024,
+                 max_chars: int = 20000, cache_max_bytes: int = 64 * 1024 * 1024):
+        self.client = client
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.cache = DiskLRU(cache_dir, cache_max_bytes)
+        self._metrics = {"requests": 0, "fetched": 0, "revalidated": 0, "truncated": 0, "bytes_downloaded": 0}
+
+    @staticmethod
+    def cache_key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    async def _read_limited(self, resp: httpx.Response):
+        chunks, size = [], 0
+        async for chunk in resp.aiter_bytes():
+            remaining = self.max_bytes - size
+            if len(chunk) >= remaining:
+                chunks.append(chunk[:remaining])
+                self._metrics["bytes_downloaded"] += remaining
+                return b"".join(chunks), True
+            chunks.append(chunk)
+            size += len(chunk)
+            self._metrics["bytes_downloaded"] += len(chunk)
+        return b"".join(chunks), False
+
+    def _to_text(self, resp: httpx.Response, body: bytes) -> str:
+        content_type = resp.headers.get("content-type", "text/html").split(";")[0].strip().lower()
+        if not (content_type.startswith("text/") or content_type in ("application/xhtml+xml", "application/json", "application/xml")):
+            raise FetchError(f"unsupported content type {content_type}")
+        try:
+            text = body.decode(resp.charset_encoding or "utf-8", errors="replace")
+        except LookupError:
+            # 서버가 알 수 없는 charset 을 보낸 경우
+            text = body.decode("utf-8", errors="replace")
+        if content_type in ("text/html", "application/xhtml+xml"):
+            text = html_to_text(text)
+        return text
+
+    async def fetch(self, url: str) -> str:
+        """페이지 본문 텍스트, 실패하면 FetchError"""
+        self._metrics["requests"] += 1
+        key = self.cache_key(url)
+        cached = await asyncio.to_thread(self.cache.get, key)
+
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            async with self.client.stream("GET", url, headers=headers) as resp:
+                if resp.status_code == 304 and cached:
+                    self._metrics["revalidated"] += 1
+                    return cached["text"]
+                if resp.status_code != 200:
+                    raise FetchError(f"HTTP {resp.status_code}")
+                body, truncated = await self._read_limited(resp)
+                text = self._to_text(resp, body)
+        except httpx.HTTPError as e:
+            raise FetchError(str(e)) from e
+
+        self._metrics["fetched"] += 1
+        if truncated:
+            self._metrics["truncated"] += 1
+        text = text[:self.max_chars]
+
+        etag, last_modified = resp.headers.get("etag"), resp.headers.get("last-modified")
+        if (etag or last_modified) and "no-store" not in resp.headers.get("cache-control", ""):
+            entry = {"url": url, "etag": etag, "last_modified": last_modified, "text": text, "fetched_at": time.time()}
+            await asyncio.to_thread(self.cache.set, key, entry)
+        return text
+
+    def stats(self) -> Dict:
+        return {**self._metrics, "cache": self.cache.stats()}
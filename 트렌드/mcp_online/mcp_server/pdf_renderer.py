@@ -0,0 +1,167 @@
+"""wkhtmltopdf 렌더링 작업 큐
+
+- 프로세스 풀(workers 개)에서만 렌더링해 동시 wkhtmltopdf 수를 제한
+- 대기 작업이 max_pending 을 넘으면 QueueFull 로 거절 (backpressure)
+- 결과 파일명을 HTML 내용의 HMAC 으로 정해, 같은 HTML은 이미 만든 PDF를 그대로 반환
+  (/pdfs 는 공개 경로이므로 HTML 을 아는 사람도 비밀 키 없이는 파일명을 알 수 없게 한다)
+"""
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import pdfkit
+
+
+class QueueFull(Exception):
+    pass
+
+
+def _render(html: str, output_path: str, atomic: bool) -> str:
+    """프로세스 풀에서 실행되는 렌더링 함수"""
+    if not atomic:
+        pdfkit.from_string(html, output_path)
+        return output_path
+    # 렌더링 도중의 파일이 캐시 적중으로 노출되지 않도록 임시 파일에 쓴 뒤 교체
+    directory, name = os.path.split(output_path)
+    tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}.{name}")
+    try:
+        pdfkit.from_string(html, tmp_path)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output_path
+
+
+@dataclass
+class RenderJob:
+    job_id: str
+    file_name: str
+    output_path: str
+    status: str = "rendering"  # rendering | done | failed
+    cached: bool = False
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    future: Optional[asyncio.Future] = field(default=None, repr=False)
+
+
+class PdfRenderQueue:
+    def __init__(self, output_dir: str = "/pdfs", workers: int = 2, max_pending: int = 16, max_jobs: int = 1000,
+                 name_secret: Optional[str] = None):
+        self.output_dir = output_dir
+        self._name_key = name_secret.encode("utf-8") if name_secret else None
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, RenderJob]" = OrderedDict()
+        self._in_flight: Dict[str, RenderJob] = {}
+        self._pending = 0
+        self.cache_hits = 0
+        self.renders = 0
+
+    def _load_name_key(self) -> bytes:
+        """비밀 키가 주어지지 않으면 output_dir 에 한 번 만들어 두고 재시작 후에도 같은 키를 사용"""
+        key_path = os.path.join(self.output_dir, ".pdf_name_key")
+        try:
+            with open(key_path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+        key = secrets.token_bytes(32)
+        try:
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            # 다른 프로세스가 먼저 만들었으면 그 키를 사용
+            with open(key_path, "rb") as f:
+                return f.read()
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+        return key
+
+    def content_hash(self, html: str) -> str:
+        if self._name_key is None:
+            self._name_key = self._load_name_key()
+        return hmac.new(self._name_key, html.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def _remember(self, job: RenderJob) -> RenderJob:
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: str) -> Optional[RenderJob]:
+        return self._jobs.get(job_id)
+
+    def submit(self, html: str, output_path: Optional[str] = None) -> RenderJob:
+        """렌더링 작업 등록, 같은 HTML이 이미 있거나 렌더링 중이면 그 결과를 재사용"""
+        job_id = uuid.uuid4().hex[:16]
+        digest = None
+        if output_path:
+            file_name = os.path.basename(output_path)
+        else:
+            digest = self.content_hash(html)
+            file_name = f"{digest[:32]}.pdf"
+            output_path = os.path.join(self.output_dir, file_name)
+
+            if os.path.exists(output_path):
+                self.cache_hits += 1
+                return self._remember(RenderJob(job_id, file_name, output_path, status="done", cached=True, finished_at=time.time()))
+            if digest in self._in_flight:
+                self.cache_hits += 1
+                return self._in_flight[digest]
+
+        if self._pending >= self.max_pending:
+            raise QueueFull(f"{self._pending} PDF jobs pending")
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        job = self._remember(RenderJob(job_id, file_name, output_path))
+        loop = asyncio.get_running_loop()
+        job.future = loop.run_in_executor(self._executor, _render, html, output_path, digest is not None)
+        self._pending += 1
+        self.renders += 1
+        if digest:
+            self._in_flight[digest] = job
+
+        def finished(future):
+            self._pending -= 1
+            if digest:
+                self._in_flight.pop(digest, None)
+            job.finished_at = time.time()
+            if future.cancelled():
+                job.status = "failed"
+                job.error = "cancelled"
+            elif future.exception() is not None:
+                job.status = "failed"
+                job.error = str(future.exception())
+            else:
+                job.status = "done"
+
+        job.future.add_done_callback(finished)
+        return job
+
+    async def wait(self, job: RenderJob, timeout: float) -> RenderJob:
+        """작업 완료를 timeout 초까지 기다림 (작업 자체는 취소하지 않음)"""
+        if job.future is not None and not job.future.done():
+            await asyncio.wait({job.future}, timeout=timeout)
+        return job
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "renders": self.renders,
+            "cache_hits": self.cache_hits,
+            "jobs_tracked": len(self._jobs),
+        }
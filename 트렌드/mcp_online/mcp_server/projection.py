@@ -0,0 +1,95 @@
+"""MCP 문서 조회 결과의 필드 선택(projection)과 검색어 주변 스니펫 생성
+
+검색/목록 도구가 content 전체를 돌려주면 응답과 LLM 토큰이 크게 늘어나므로
+기본은 요약 필드만 반환하고, 본문은 검색어 주변 일부(snippet)만 잘라 강조 표시한다.
+"""
+import re
+from typing import Dict, List, Optional, Sequence
+
+# 도구 인자로 받을 수 있는 필드 -> SELECT 식 (화이트리스트)
+DOCUMENT_FIELDS = {
+    "id": "fd.id",
+    "title": "fd.title",
+    "summary": "fd.summary",
+    "content": "fd.content",
+    "category_id": "fd.category_id",
+    "category_name": "c.name",
+    "author": "fd.author",
+    "source": "fd.source",
+    "publication_date": "fd.publication_date",
+    "tags": "fd.tags",
+    "view_count": "fd.view_count",
+    "is_featured": "fd.is_featured",
+    "created_at": "fd.created_at",
+    "updated_at": "fd.updated_at",
+}
+DEFAULT_FIELDS = ("id", "title", "summary", "category_name", "tags", "created_at")
+
+# 스니펫: 첫 일치 위치 앞 SNIPPET_BEFORE 글자부터 SNIPPET_LENGTH 글자를 DB에서 잘라 옴
+SNIPPET_BEFORE = 80
+SNIPPET_LENGTH = 240
+HIGHLIGHT = ("**", "**")
+
+
+def resolve_fields(fields: Optional[Sequence[str]]) -> List[str]:
+    """요청 필드 검증, None 이면 DEFAULT_FIELDS, "*" 이면 전체"""
+    if not fields:
+        return list(DEFAULT_FIELDS)
+    if "*" in fields:
+        return list(DOCUMENT_FIELDS)
+    unknown = [field for field in fields if field not in DOCUMENT_FIELDS]
+    if unknown:
+        raise ValueError(f"알 수 없는 필드: {', '.join(unknown)} (사용 가능: {', '.join(DOCUMENT_FIELDS)})")
+    return list(dict.fromkeys(fields))
+
+
+def select_clause(fields: Sequence[str]) -> str:
+    return ", ".join(f"{DOCUMENT_FIELDS[field]} AS {field}" for field in fields)
+
+
+def snippet_columns() -> str:
+    """스니펫용 SELECT 식, 검색어 파라미터 2개(%s)를 받음"""
+    return (
+        "LOCATE(%s, fd.content) AS _match_pos, "
+        f"SUBSTRING(fd.content, GREATEST(LOCATE(%s, fd.content) - {SNIPPET_BEFORE}, 1), {SNIPPET_LENGTH}) AS _snippet_source, "
+        "CHAR_LENGTH(fd.content) AS _content_length"
+    )
+
+
+def _highlight_pattern(query: str) -> Optional[re.Pattern]:
+    terms = {query.strip()} | {term for term in query.split() if len(term) >= 2}
+    terms = sorted((term for term in terms if term), key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+
+
+def make_snippet(source: Optional[str], query: str, match_pos: int, content_length: int) -> str:
+    """DB에서 잘라 온 본문 조각에 말줄임표와 검색어 강조를 붙임
+
+    match_pos 는 1부터 시작하는 첫 일치 위치(LOCATE 결과, 본문에 없으면 0).
+    """
+    if not source:
+        return ""
+    start = max(match_pos - SNIPPET_BEFORE, 1) if match_pos else 1
+    text = re.sub(r"\s+", " ", source).strip()
+    pattern = _highlight_pattern(query)
+    if pattern:
+        text = pattern.sub(lambda m: f"{HIGHLIGHT[0]}{m.group(0)}{HIGHLIGHT[1]}", text)
+    if start > 1:
+        text = "…" + text
+    if start - 1 + len(source) < content_length:
+        text += "…"
+    return text
+
+
+def shape_rows(rows: List[Dict], query: Optional[str] = None) -> List[Dict]:
+    """스니펫 계산용 내부 컬럼(_ 접두사)을 snippet 필드로 바꿈"""
+    shaped = []
+    for row in rows:
+        row = dict(row)
+        if "_snippet_source" in row:
+            row["snippet"] = make_snippet(row.pop("_snippet_source"), query or "", row.pop("_match_pos") or 0,
+                                          row.pop("_content_length") or 0)
+        shaped.append(row)
+    return shaped
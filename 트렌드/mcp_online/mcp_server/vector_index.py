@@ -0,0 +1,446 @@
+"""문서 임베딩과 디스크 ANN 색인 (의미 기반 검색)
+
+외부 모델 없이 해시 임베딩(HashingEmbedder)으로 문서를 고정 길이 벡터로 만들고,
+IVF(역색인 + k-means 중심) 방식으로 memmap 파일에 저장한다.
+- vectors.<gen>.i8: L2 정규화 벡터를 int8 로 양자화 (문서당 dim 바이트)
+- ids.<gen>.i64 / lists.<gen>.i32: 행별 문서 id(삭제 시 -1)와 배정된 클러스터
+- digests.<gen>.h64: 행별 제목/요약/본문 해시 (내용이 그대로면 다시 임베딩하지 않음)
+- centroids.<gen>.f32: 클러스터 중심, meta.json: 행 수/세대/동기화 위치
+추가는 파일 끝에 이어 쓰고 meta.json 을 마지막에 교체하므로 중간에 죽어도 이전 상태로 열린다.
+행 수가 학습 시점의 REBUILD_GROWTH 배를 넘거나 삭제 행이 살아 있는 행의 COMPACT_RATIO 배를
+넘으면 rebuild() 가 중심을 다시 학습해 새 세대로 쓰고 삭제 행을 정리한다.
+
+DB에서 지워진 문서는 색인에 남지만, 도구가 결과 id 로 DB를 다시 조회하므로 응답에는 나오지 않는다.
+
+사용법 (mcp_server 디렉터리에서):
+    python -m vector_index sync      # DB 에서 새/수정 문서 임베딩
+    python -m vector_index rebuild   # 클러스터 재학습 + 삭제 행 정리
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_DIM = 256
+DEFAULT_NPROBE = 32
+# 이 행 수 전에는 클러스터 없이 전체 스캔
+MIN_TRAIN_ROWS = 2048
+REBUILD_GROWTH = 2.0
+# 삭제(덮어쓰기 포함) 행이 살아 있는 행의 이 비율을 넘으면 정리
+COMPACT_RATIO = 0.5
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 65536
+SCAN_CHUNK_ROWS = 16384
+EMBED_MAX_CHARS = 2000
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+|[가-힣]+")
+# 겹치는 글자 bigram (같은 단어 안에서만)
+_BIGRAM_RE = re.compile(r"(?=([0-9a-z]{2}|[가-힣]{2}))")
+
+
+class HashingEmbedder:
+    """단어 + 단어 안 글자 bigram 의 부호 있는 feature hashing (sublinear TF, L2 정규화)
+
+    해시는 crc32 라 프로세스가 달라도 같은 벡터가 나오고, 조사가 붙은 한국어 단어
+    ("기준금리를")도 bigram 으로 "기준금리" 와 겹친다.
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM, title_weight: float = 2.0, bigram_weight: float = 0.5,
+                 max_chars: int = EMBED_MAX_CHARS):
+        self.dim = dim
+        self.title_weight = title_weight
+        self.bigram_weight = bigram_weight
+        self.max_chars = max_chars
+        # 토큰 -> 부호 있는 차원 코드 (양수면 차원, 음수면 차원 + dim), crc32 재계산을 피하는 캐시
+        self._codes: Dict[str, int] = {}
+
+    def _code(self, token: str) -> int:
+        if len(self._codes) >= 500000:
+            self._codes.clear()
+        h = zlib.crc32(token.encode())
+        code = self._codes[token] = h % self.dim + (self.dim if h & 0x80000000 else 0)
+        return code
+
+    def _accumulate(self, tokens: List[str], weight: float, totals: np.ndarray):
+        if not tokens:
+            return
+        counts = Counter(tokens)
+        codes = list(map(self._codes.get, counts))
+        if None in codes:
+            codes = [code if code is not None else self._code(token) for token, code in zip(counts, codes)]
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        # sublinear TF
+        totals += weight * np.bincount(codes, weights=1.0 + np.log(tf), minlength=2 * self.dim)
+
+    def _add_text(self, text: str, weight: float, totals: np.ndarray):
+        text = text[:self.max_chars].lower()
+        self._accumulate(_TOKEN_RE.findall(text), weight, totals)
+        # bigram 은 "#" 를 붙여 단어와 다른 feature 로
+        self._accumulate(["#" + bigram for bigram in _BIGRAM_RE.findall(text)], weight * self.bigram_weight, totals)
+
+    def embed(self, title: Optional[str] = "", summary: Optional[str] = "", content: Optional[str] = "") -> np.ndarray:
+        totals = np.zeros(2 * self.dim, dtype=np.float64)
+        self._add_text(title or "", self.title_weight, totals)
+        self._add_text(summary or "", 1.0, totals)
+        self._add_text(content or "", 1.0, totals)
+        vector = (totals[:self.dim] - totals[self.dim:]).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_query(self, query: str) -> np.ndarray:
+        return self.embed(content=query)
+
+    def embed_documents(self, rows: Sequence[Dict]) -> np.ndarray:
+        return np.stack([self.embed(row.get("title"), row.get("summary"), row.get("content")) for row in rows]) \
+            if rows else np.zeros((0, self.dim), dtype=np.float32)
+
+
+def content_digest(row: Dict) -> int:
+    """임베딩 입력(제목/요약/본문)의 64비트 해시, 0 은 '모름'으로 예약"""
+    h = hashlib.blake2b(digest_size=8)
+    for field in ("title", "summary", "content"):
+        h.update((row.get(field) or "").encode())
+        h.update(b"\0")
+    return int.from_bytes(h.digest(), "little", signed=True) or 1
+
+
+def _quantize(vectors: np.ndarray) -> np.ndarray:
+    return np.clip(np.rint(vectors * 127.0), -127, 127).astype(np.int8)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """구면 k-means (코사인), 빈 클러스터는 이전 중심 유지"""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > KMEANS_SAMPLE:
+        vectors = vectors[rng.choice(len(vectors), KMEANS_SAMPLE, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = assign_clusters(vectors, centroids)
+        order = np.argsort(assign, kind="stable")
+        clusters, starts = np.unique(assign[order], return_index=True)
+        centroids[clusters] = np.add.reduceat(vectors[order], starts, axis=0)
+        centroids = _normalize(centroids)
+    return centroids.astype(np.float32)
+
+
+def assign_clusters(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), SCAN_CHUNK_ROWS):
+        chunk = vectors[start:start + SCAN_CHUNK_ROWS]
+        assign[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return assign
+
+
+def default_nlist(rows: int) -> int:
+    return int(min(max(math.sqrt(rows), 16), 4096))
+
+
+class VectorIndex:
+    """int8 벡터를 memmap 으로 여는 IVF 색인 (add/remove/search 는 스레드 안전)"""
+
+    _FILES = {"vectors": np.int8, "ids": np.int64, "lists": np.int32, "digests": np.int64}
+
+    def __init__(self, directory: str, dim: int = DEFAULT_DIM):
+        self.directory = directory
+        self.dim = dim
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _path(self, name: str, generation: Optional[int] = None) -> str:
+        generation = self.meta["generation"] if generation is None else generation
+        suffix = {"vectors": "i8", "ids": "i64", "lists": "i32", "digests": "h64", "centroids": "f32"}[name]
+        return os.path.join(self.directory, f"{name}.{generation}.{suffix}")
+
+    def _map(self, name: str, rows: int, writable: bool = False) -> np.ndarray:
+        dtype = self._FILES[name]
+        shape = (rows, self.dim) if name == "vectors" else (rows,)
+        if rows == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self._path(name), dtype=dtype, mode="r+" if writable else "r", shape=shape)
+
+    def _write_meta(self, meta: Dict):
+        tmp_path = os.path.join(self.directory, "meta.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.directory, "meta.json"))
+        self.meta = meta
+
+    def _load(self):
+        meta_path = os.path.join(self.directory, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+            if self.meta["dim"] != self.dim:
+                raise ValueError(f"색인 차원 {self.meta['dim']} 이 요청한 {self.dim} 과 다릅니다")
+        else:
+            self.meta = {"dim": self.dim, "generation": 0, "rows": 0, "nlist": 0, "trained_rows": 0, "state": {}}
+        rows = self.meta["rows"]
+        for name, dtype in self._FILES.items():
+            path = self._path(name)
+            expected = rows * np.dtype(dtype).itemsize * (self.dim if name == "vectors" else 1)
+            # 추가 도중 죽어서 남은 꼬리는 버림
+            if not os.path.exists(path):
+                open(path, "wb").close()
+            if os.path.getsize(path) > expected:
+                os.truncate(path, expected)
+            elif name == "digests" and os.path.getsize(path) < expected:
+                # 해시 도입 전 색인: 0(모름)으로 채워 두고, 문서가 다음에 수정될 때 한 번 다시 임베딩
+                os.truncate(path, expected)
+        self._remap()
+
+    def _remap(self, reindex: bool = True):
+        rows = self.meta["rows"]
+        vectors, ids, lists, digests = (self._map(name, rows) for name in self._FILES)
+        centroids = None
+        if self.meta["nlist"]:
+            centroids = np.fromfile(self._path("centroids"), dtype=np.float32).reshape(self.meta["nlist"], self.dim)
+        # 역색인: 클러스터 순으로 정렬한 행 번호 + 클러스터별 시작 위치
+        order = np.argsort(lists, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(lists[order], np.arange(max(self.meta["nlist"], 1) + 1))
+        self._view = (vectors, ids, centroids, order, offsets)
+        self._digests = digests
+        if reindex:
+            self._row_of = {doc_id: row for row, doc_id in enumerate(ids.tolist()) if doc_id >= 0}
+
+    @property
+    def state(self) -> Dict:
+        """add(state=...) 로 저장한 동기화 위치"""
+        return dict(self.meta.get("state", {}))
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def digest(self, doc_id: int) -> int:
+        """색인된 문서의 content_digest (없거나 모르면 0)"""
+        row = self._row_of.get(int(doc_id))
+        return 0 if row is None else int(self._digests[row])
+
+    def _tombstone(self, doc_ids: Sequence[int]):
+        rows = [self._row_of.pop(int(doc_id)) for doc_id in doc_ids if int(doc_id) in self._row_of]
+        if rows:
+            ids = self._map("ids", self.meta["rows"], writable=True)
+            ids[rows] = -1
+            ids.flush()
+
+    def add(self, doc_ids: Sequence[int], vectors: np.ndarray, state: Optional[Dict] = None,
+            digests: Optional[Sequence[int]] = None):
+        """문서 추가 (이미 있는 id 는 이전 행을 지우고 새로 씀)"""
+        with self._lock:
+            if len(doc_ids):
+                digests = np.zeros(len(doc_ids), dtype=np.int64) if digests is None \
+                    else np.asarray(digests, dtype=np.int64)
+                self._tombstone(doc_ids)
+                vectors = np.asarray(vectors, dtype=np.float32)
+                _, _, centroids, _, _ = self._view
+                lists = assign_clusters(vectors, centroids) if centroids is not None \
+                    else np.zeros(len(vectors), dtype=np.int32)
+                for name, data in (("vectors", _quantize(vectors)),
+                                   ("ids", np.asarray(doc_ids, dtype=np.int64)),
+                                   ("lists", lists),
+                                   ("digests", digests)):
+                    with open(self._path(name), "ab") as f:
+                        f.write(np.ascontiguousarray(data).tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+            first_row = self.meta["rows"]
+            meta = dict(self.meta, rows=first_row + len(doc_ids))
+            if state is not None:
+                meta["state"] = state
+            self._write_meta(meta)
+            self._row_of.update((int(doc_id), first_row + i) for i, doc_id in enumerate(doc_ids))
+            self._remap(reindex=False)
+            if self._needs_rebuild():
+                self.rebuild()
+
+    def remove(self, doc_ids: Sequence[int]):
+        with self._lock:
+            self._tombstone(doc_ids)
+            if self._needs_rebuild():
+                self.rebuild()
+
+    def _needs_rebuild(self) -> bool:
+        live = len(self._row_of)
+        # 삭제 행도 memmap 과 스캔 비용을 차지하므로 쌓이면 정리
+        if self.meta["rows"] - live > max(live, MIN_TRAIN_ROWS) * COMPACT_RATIO:
+            return True
+        if not self.meta["nlist"]:
+            return live >= MIN_TRAIN_ROWS
+        return live > self.meta["trained_rows"] * REBUILD_GROWTH
+
+    def rebuild(self, nlist: Optional[int] = None):
+        """살아 있는 행으로 중심을 재학습하고 클러스터 순서로 새 세대 파일에 다시 씀"""
+        with self._lock:
+            vectors, ids, _, _, _ = self._view
+            digests = self._digests
+            live = np.flatnonzero(ids >= 0)
+            live_vectors = _normalize(vectors[live].astype(np.float32))
+            generation = self.meta["generation"] + 1
+            if len(live) >= MIN_TRAIN_ROWS or (nlist and nlist < len(live)):
+                nlist = min(nlist or default_nlist(len(live)), len(live))
+                centroids = train_centroids(live_vectors, nlist)
+                lists = assign_clusters(live_vectors, centroids)
+            else:
+                centroids, nlist = None, 0
+                lists = np.zeros(len(live), dtype=np.int32)
+            order = np.argsort(lists, kind="stable")
+            new_meta = dict(self.meta, generation=generation, rows=len(live), nlist=nlist, trained_rows=len(live))
+            for name, data in (("vectors", vectors[live][order]), ("ids", ids[live][order]), ("lists", lists[order]),
+                               ("digests", digests[live][order]), ("centroids", centroids)):
+                if data is None:
+                    continue
+                path = self._path(name, generation)
+                data.tofile(path)
+                with open(path, "rb+") as f:
+                    os.fsync(f.fileno())
+            old_generation = self.meta["generation"]
+            self._write_meta(new_meta)
+            self._remap()
+            for name in ("vectors", "ids", "lists", "digests", "centroids"):
+                try:
+                    os.remove(self._path(name, old_generation))
+                except OSError:
+                    pass
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: int = DEFAULT_NPROBE) -> List[Tuple[int, float]]:
+        """질의와 가까운 nprobe 개 클러스터 안에서 (문서 id, 코사인 유사도) 상위 k 개"""
+        vectors, ids, centroids, order, offsets = self._view
+        if not len(ids) or k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        if centroids is None:
+            rows = np.arange(len(ids))
+        else:
+            nprobe = min(nprobe, len(centroids))
+            probe = np.argpartition(-(centroids @ query), nprobe - 1)[:nprobe]
+            rows = np.concatenate([order[offsets[c]:offsets[c + 1]] for c in probe])
+            rows.sort()
+        return self._top_k(vectors, ids, rows, query, k)
+
+    def exact_search(self, query: np.ndarray, k: int = 10) -> List[Tuple[int, float]]:
+        """클러스터 없이 전체 행을 스캔 (recall 측정 기준)"""
+        vectors, ids, _, _, _ = self._view
+        return self._top_k(vectors, ids, np.arange(len(ids)), np.asarray(query, dtype=np.float32), k)
+
+    @staticmethod
+    def _top_k(vectors, ids, rows, query, k):
+        best_ids, best_scores = [], []
+        for start in range(0, len(rows), SCAN_CHUNK_ROWS):
+            chunk = rows[start:start + SCAN_CHUNK_ROWS]
+            scores = vectors[chunk].astype(np.float32) @ query / 127.0
+            chunk_ids = ids[chunk]
+            scores[chunk_ids < 0] = -np.inf
+            if len(scores) > k:
+                keep = np.argpartition(-scores, k - 1)[:k]
+                scores, chunk_ids = scores[keep], chunk_ids[keep]
+            best_ids.append(chunk_ids)
+            best_scores.append(scores)
+        if not best_ids:
+            return []
+        all_ids, all_scores = np.concatenate(best_ids), np.concatenate(best_scores)
+        top = np.argsort(-all_scores, kind="stable")[:k]
+        return [(int(all_ids[i]), float(all_scores[i])) for i in top if np.isfinite(all_scores[i])]
+
+    def stats(self) -> Dict:
+        return {
+            "documents": len(self),
+            "rows": self.meta["rows"],
+            "deleted_rows": self.meta["rows"] - len(self),
+            "nlist": self.meta["nlist"],
+            "trained_rows": self.meta["trained_rows"],
+            "dim": self.dim,
+            "bytes": sum(os.path.getsize(self._path(name)) for name in self._FILES),
+            "state": self.state,
+        }
+
+
+SYNC_COLUMNS = "fd.id, fd.title, fd.summary, fd.content, fd.updated_at"
+
+
+def _add_changed(index: VectorIndex, embedder: HashingEmbedder, rows: List[Dict], state: Dict) -> int:
+    digests = [content_digest(row) for row in rows]
+    changed = [(row, digest) for row, digest in zip(rows, digests) if index.digest(row["id"]) != digest]
+    # 바뀐 문서가 없어도 동기화 위치는 저장
+    index.add([row["id"] for row, _ in changed], embedder.embed_documents([row for row, _ in changed]),
+              state=state, digests=[digest for _, digest in changed])
+    return len(changed)
+
+
+def sync_documents(index: VectorIndex, embedder: HashingEmbedder, execute_query: Callable,
+                   batch_size: int = 500) -> int:
+    """마지막 동기화 이후 추가/수정된 문서를 임베딩해 색인에 넣고 임베딩한 문서 수 반환
+
+    새 문서는 id, 수정 문서는 (updated_at, id) 순으로 읽고, 위치는 배치마다 meta.json 에
+    함께 저장되므로 중간에 끊겨도 이어서 동기화한다. updated_at 은 조회수 같은 다른 컬럼
+    변경에도 바뀌므로, 제목/요약/본문 해시가 색인과 같은 문서는 다시 임베딩하지 않는다.
+    """
+    synced = 0
+    state = index.state
+    last_id = state.get("last_id", 0)
+    # 첫 동기화는 새 문서 단계에서 전부 읽으므로 수정 문서 단계를 건너뜀
+    watermark = (state.get("updated_at") or "", state.get("updated_id", 0))
+    initial = not state
+    max_updated = watermark
+
+    while True:
+        rows = execute_query(f"SELECT {SYNC_COLUMNS} FROM financial_documents fd WHERE fd.id > %s "
+                             f"ORDER BY fd.id LIMIT %s", (last_id, batch_size))
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+        for row in rows:
+            max_updated = max(max_updated, (str(row["updated_at"] or ""), row["id"]))
+        state = {"last_id": last_id, "updated_at": watermark[0], "updated_id": watermark[1]}
+        if initial:
+            state["updated_at"], state["updated_id"] = max_updated
+        synced += _add_changed(index, embedder, rows, state)
+
+    if initial:
+        return synced
+    while True:
+        rows = execute_query(f"SELECT {SYNC_COLUMNS} FROM financial_documents fd "
+                             f"WHERE fd.id <= %s AND (fd.updated_at > %s OR (fd.updated_at = %s AND fd.id > %s)) "
+                             f"ORDER BY fd.updated_at, fd.id LIMIT %s",
+                             (last_id, watermark[0], watermark[0], watermark[1], batch_size))
+        if not rows:
+            break
+        watermark = (str(rows[-1]["updated_at"]), rows[-1]["id"])
+        synced += _add_changed(index, embedder, rows,
+                               {"last_id": last_id, "updated_at": watermark[0], "updated_id": watermark[1]})
+    return synced
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["sync", "rebuild", "stats"])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    # 서버와 같은 색인 위치/차원/DB 연결을 사용
+    import mcp_server
+
+    if args.command == "sync":
+        print(f"synced {sync_documents(mcp_server.vector_index, mcp_server.embedder, mcp_server.execute_query, args.batch_size)} documents")
+    elif args.command == "rebuild":
+        mcp_server.vector_index.rebuild()
+    print(mcp_server.vector_index.stats())
+
+
+if __name__ == "__main__":
+    main()